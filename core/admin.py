@@ -1,15 +1,38 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import DatabaseError
 
-from .models import PressRelease, HomeCard, TabSettings, EditableElement
+from . import search
+from .models import CitizenshipBadge, PressRelease, HomeCard, TabSettings, EditableElement
 
 
 @admin.register(PressRelease)
 class PressReleaseAdmin(admin.ModelAdmin):
-    list_display = ("title", "published_at", "is_published", "is_pinned", "highlight")
+    list_display = ("title", "published_at", "unpublish_at", "is_published", "is_pinned", "highlight")
     list_filter = ("is_published", "is_pinned", "highlight", "published_at")
     search_fields = ("title", "header", "body", "footer")
     ordering = ("-is_pinned", "-published_at")
 
+    # Best-ranked matches the changelist search considers; more are dropped.
+    SEARCH_LIMIT = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS index instead of four LIKE '%term%' scans; fall back to
+        # the stock search if the index is missing (e.g. before migrating).
+        if search_term.strip():
+            try:
+                ids = search.search_ids(search_term, search.KIND_POST, published_only=False, limit=self.SEARCH_LIMIT)
+            except DatabaseError:
+                pass
+            else:
+                if len(ids) == self.SEARCH_LIMIT:
+                    self.message_user(
+                        request,
+                        f"Only the {self.SEARCH_LIMIT} best matches are listed; refine the search to see others.",
+                        messages.WARNING,
+                    )
+                return queryset.filter(pk__in=ids), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 @admin.register(HomeCard)
 class HomeCardAdmin(admin.ModelAdmin):
@@ -33,3 +56,11 @@ class EditableElementAdmin(admin.ModelAdmin):
     ordering = ("key",)
 
 
+
+
+@admin.register(CitizenshipBadge)
+class CitizenshipBadgeAdmin(admin.ModelAdmin):
+    list_display = ("username", "origin", "created_at")
+    list_filter = ("origin",)
+    search_fields = ("username",)
+    ordering = ("-created_at",)
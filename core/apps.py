@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        from . import instrumentation
+        from .signals import connect_content_signals, connect_search_signals
+
+        connect_content_signals()
+        connect_search_signals()
+        instrumentation.install()
@@ -0,0 +1,222 @@
+"""Citizenship badge images.
+
+A badge is drawn from its row alone (name, origin, colors and the pattern
+seed in ``data``), so the rendered file is keyed by a hash of those values
+and kept under ``settings.BADGE_CACHE_DIR``::
+
+    .cache/badges/9c/9c41...e0.png
+
+A badge is drawn once per format and then served from disk until one of its
+fields changes. The flag artwork, gradient mask and fonts are loaded once per
+process. ``manage.py render_badges`` pre-renders every badge in parallel.
+"""
+
+import colorsys
+import hashlib
+import json
+import os
+import random
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+
+from .page_cache import GenerationMemo, bump_generation, generation
+
+# Bump when the drawing code changes so every badge is redrawn.
+RENDER_VERSION = 1
+FORMATS = {"png": "image/png", "webp": "image/webp"}
+WIDTH, HEIGHT = 1200, 630
+FLAG_PATH = settings.BASE_DIR / "assets" / "Flag_Nomashae.png"
+FLAG_HEIGHT = 300
+PATTERN_SHAPES = 14
+WEBP_QUALITY = 85
+
+# Badges are created by visitors and appear on no cached page, so they have
+# their own generation instead of invalidating the whole page cache. Like the
+# content generation it is a token, so a culled key can't revive old memos.
+GENERATION_KEY = "core:badge-generation"
+KEY_MEMO_SIZE = 1024
+
+# badge pk -> (badge generation, render key); missing pks aren't remembered
+_key_memo = GenerationMemo(KEY_MEMO_SIZE)
+
+
+def new_design(rng: "random.Random | None" = None) -> dict:
+    """Random colors and pattern seed for a new badge, as model field values."""
+    rng = rng or random.Random()
+    hue = rng.random()
+    colors = []
+    for offset in (0.0, rng.uniform(0.25, 0.5)):
+        r, g, b = colorsys.hls_to_rgb((hue + offset) % 1.0, rng.uniform(0.35, 0.55), rng.uniform(0.55, 0.85))
+        colors.append("#%02X%02X%02X" % (round(r * 255), round(g * 255), round(b * 255)))
+    return {"color1_hex": colors[0], "color2_hex": colors[1], "data": {"seed": rng.getrandbits(32)}}
+
+
+def render_key(badge) -> str:
+    """Hash of everything that affects the drawing of ``badge``."""
+    values = [
+        RENDER_VERSION,
+        badge.pk,
+        badge.username,
+        badge.origin,
+        badge.color1_hex,
+        badge.color2_hex,
+        badge.data or {},
+    ]
+    raw = json.dumps(values, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def bump_badge_generation() -> None:
+    bump_generation(GENERATION_KEY)
+
+
+def render_key_for(pk: int) -> "str | None":
+    """``render_key`` of badge ``pk``, memoized until a badge changes."""
+    from .models import CitizenshipBadge
+
+    current = generation(GENERATION_KEY)
+    cached = _key_memo.get(pk)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    badge = CitizenshipBadge.objects.filter(pk=pk).first()
+    if badge is None:
+        return None
+    key = render_key(badge)
+    _key_memo[pk] = (current, key)
+    return key
+
+
+def cache_path(key: str, fmt: str) -> Path:
+    return Path(settings.BADGE_CACHE_DIR) / key[:2] / f"{key}.{fmt}"
+
+
+@lru_cache(maxsize=None)
+def _font(size: int):
+    from PIL import ImageFont
+
+    if settings.BADGE_FONT:
+        try:
+            return ImageFont.truetype(str(settings.BADGE_FONT), size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=1)
+def _flag():
+    from PIL import Image
+
+    with Image.open(FLAG_PATH) as source:
+        flag = source.convert("RGBA")
+    width = round(flag.width * FLAG_HEIGHT / flag.height)
+    return flag.resize((width, FLAG_HEIGHT), Image.LANCZOS)
+
+
+@lru_cache(maxsize=1)
+def _gradient_mask():
+    from PIL import Image
+
+    # Diagonal blend from the top-left to the bottom-right corner.
+    mask = Image.linear_gradient("L").rotate(45, resample=Image.BICUBIC, expand=True)
+    side = mask.width // 2
+    left = (mask.width - side) // 2
+    return mask.crop((left, left, left + side, left + side)).resize((WIDTH, HEIGHT), Image.BICUBIC)
+
+
+def _color(value: str, default: str) -> tuple:
+    from PIL import ImageColor
+
+    try:
+        return ImageColor.getrgb(value)
+    except ValueError:
+        return ImageColor.getrgb(default)
+
+
+def draw(badge):
+    """The badge as an RGB ``PIL.Image``."""
+    from PIL import Image, ImageDraw
+
+    start = _color(badge.color1_hex, "#2F2F2F")
+    end = _color(badge.color2_hex, "#6B6B6B")
+    image = Image.composite(
+        Image.new("RGB", (WIDTH, HEIGHT), end), Image.new("RGB", (WIDTH, HEIGHT), start), _gradient_mask()
+    )
+
+    overlay = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
+    canvas = ImageDraw.Draw(overlay)
+    rng = random.Random((badge.data or {}).get("seed", badge.pk))
+    for _ in range(PATTERN_SHAPES):
+        x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        radius = rng.uniform(40, 220)
+        outline = (255, 255, 255, rng.randint(25, 70))
+        canvas.ellipse((x - radius, y - radius, x + radius, y + radius), outline=outline, width=rng.randint(2, 10))
+    canvas.rounded_rectangle((40, 40, WIDTH - 40, HEIGHT - 40), radius=28, fill=(0, 0, 0, 90))
+
+    flag = _flag()
+    overlay.alpha_composite(flag, (80, (HEIGHT - flag.height) // 2))
+    text_x = 80 + flag.width + 50
+    white, muted = (255, 255, 255, 255), (255, 255, 255, 200)
+    canvas.text((text_x, 120), "DMN NOMASHAE", font=_font(34), fill=muted)
+    canvas.text((text_x, 165), "Certificate of Citizenship", font=_font(30), fill=muted)
+    name_size = 72 if len(badge.username) <= 14 else 52
+    canvas.text((text_x, 250), badge.username, font=_font(name_size), fill=white)
+    canvas.text((text_x, 360), badge.origin, font=_font(40), fill=white)
+    canvas.text((text_x, 470), f"Citizen No. {badge.pk:05d}", font=_font(28), fill=muted)
+
+    image.paste(overlay, (0, 0), overlay)
+    return image
+
+
+def encode(image, fmt: str) -> bytes:
+    buf = BytesIO()
+    if fmt == "webp":
+        image.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".badge-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def render_cached(badge, formats=tuple(FORMATS), force: bool = False) -> dict:
+    """Make sure every format of ``badge`` is on disk; return {format: path}.
+
+    The image is drawn at most once however many formats are missing.
+    """
+    key = render_key(badge)
+    paths = {fmt: cache_path(key, fmt) for fmt in formats}
+    image = None
+    for fmt, path in paths.items():
+        if force or not path.exists():
+            if image is None:
+                image = draw(badge)
+            _write(path, encode(image, fmt))
+    return paths
+
+
+def prune(keep: set) -> int:
+    """Delete cached files whose key is not in ``keep``; return how many."""
+    root = Path(settings.BADGE_CACHE_DIR)
+    if not root.is_dir():
+        return 0
+    removed = 0
+    for path in root.glob("*/*.*"):
+        if not path.name.startswith(".") and path.stem not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,258 @@
+"""Fixtures and measurements for ``manage.py benchmark_views`` and ``benchmark_servers``.
+
+``seed()`` fills an empty database with deterministic, realistically sized
+rows for one data-size tier; ``ENDPOINTS`` lists the requests measured
+against it; ``compare()`` flags regressions against a stored baseline run.
+``start_gunicorn()`` serves the seeded database for measurements over HTTP.
+"""
+
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.utils import timezone
+
+# Rows seeded per tier.
+TIERS = {
+    "small": {"posts": 50, "elements": 100, "pages": 10, "media": 50},
+    "medium": {"posts": 1000, "elements": 1000, "pages": 100, "media": 1000},
+    "large": {"posts": 10000, "elements": 5000, "pages": 1000, "media": 10000},
+}
+
+EDITED_KEY = "benchmark_edited"
+
+_WORDS = (
+    "nation avatar water earth fire air council decree citizen harvest festival spirit balance "
+    "river mountain village lantern treaty season archive ember current stone wind garden scroll "
+    "ceremony harbour ledger assembly volunteer market bridge library anthem charter"
+).split()
+
+
+def _sentence(rng: random.Random, low: int = 8, high: int = 20) -> str:
+    words = rng.choices(_WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _markdown_body(rng: random.Random) -> str:
+    # Roughly 4-8 KB: a few sections with paragraphs, a list and a link.
+    parts = []
+    for section in range(rng.randint(3, 5)):
+        parts.append(f"## {_sentence(rng, 2, 5)[:-1]}")
+        parts.extend(_paragraph(rng, rng.randint(3, 6)) for _ in range(rng.randint(1, 3)))
+        if section % 2 == 0:
+            parts.append("\n".join(f"- **{rng.choice(_WORDS)}**: {_sentence(rng, 4, 10)}" for _ in range(4)))
+        parts.append(f"[Read the {rng.choice(_WORDS)} archive](https://example.org/{rng.choice(_WORDS)})")
+    return "\n\n".join(parts)
+
+
+def _html_body(rng: random.Random, paragraphs: int) -> str:
+    return "".join(f"<p>{_paragraph(rng, rng.randint(2, 5))}</p>" for _ in range(paragraphs))
+
+
+def seed(tier: str, seed: int = 0) -> dict:
+    """Populate the current (empty, migrated) database for ``tier``.
+
+    Returns what the endpoint specs need to address the seeded rows.
+    """
+    from django.contrib.auth import get_user_model
+
+    from . import search
+    from .models import DynamicPage, EditableElement, EditorMedia, PressRelease
+    from .views import _encode_cursor
+
+    sizes = TIERS[tier]
+    rng = random.Random(f"{tier}:{seed}")
+    now = timezone.now()
+
+    posts = []
+    for i in range(sizes["posts"]):
+        post = PressRelease(
+            title=_sentence(rng, 3, 9)[:-1],
+            header=_sentence(rng),
+            body=_markdown_body(rng),
+            footer=_sentence(rng, 4, 8),
+            published_at=now - timedelta(hours=i * 7),
+            is_published=rng.random() > 0.05,
+            is_pinned=i < 2,
+            highlight=rng.random() < 0.1,
+        )
+        post.render_markdown_fields()
+        posts.append(post)
+    PressRelease.objects.bulk_create(posts, batch_size=500)
+
+    pages = [
+        DynamicPage(slug=f"page-{i}", title=_sentence(rng, 2, 5)[:-1], created_at=now - timedelta(days=i))
+        for i in range(sizes["pages"])
+    ]
+    DynamicPage.objects.bulk_create(pages, batch_size=500)
+
+    elements = [
+        EditableElement(key=f"benchmark_{i}", content=_html_body(rng, rng.randint(1, 4)))
+        for i in range(sizes["elements"])
+    ]
+    elements.append(EditableElement(key=EDITED_KEY, content=_html_body(rng, 3)))
+    for page in pages:
+        elements.append(EditableElement(key=f"page_{page.slug}_title", content=page.title))
+        elements.append(EditableElement(key=f"page_{page.slug}_content", content=_html_body(rng, rng.randint(4, 12))))
+    EditableElement.objects.bulk_create(elements, batch_size=500)
+
+    media = []
+    for i in range(sizes["media"]):
+        name = f"editor_uploads/benchmark_{i}.jpg"
+        variants = [[w, f"editor_uploads/benchmark_{i}.w{w}.webp"] for w in (320, 640, 960, 1280, 1920)]
+        media.append(
+            EditorMedia(
+                file=name,
+                uploaded_at=now - timedelta(minutes=i * 13),
+                image_variants={"source": name, "width": 2400, "height": 1600, "variants": variants},
+            )
+        )
+    EditorMedia.objects.bulk_create(media, batch_size=500)
+
+    # bulk_create sends no signals, so the search index is built in one go.
+    search.rebuild()
+
+    user, _ = get_user_model().objects.get_or_create(
+        username="benchmark-staff", defaults={"is_staff": True, "is_active": True}
+    )
+
+    published = PressRelease.objects.visible()
+    deep = published[published.count() // 2 : published.count() // 2 + 1].first()
+    return {
+        "staff_id": user.pk,
+        "post_id": published.first().pk,
+        "deep_cursor": _encode_cursor(deep) if deep else None,
+        "slug": pages[len(pages) // 2].slug,
+    }
+
+
+@dataclass
+class Endpoint:
+    name: str
+    path: str
+    staff: bool = False
+    method: str = "GET"
+
+    def url(self, fixtures: dict) -> "str | None":
+        try:
+            return self.path.format(**fixtures)
+        except KeyError:
+            return None
+
+    def body(self, n: int) -> "bytes | None":
+        if self.method != "POST":
+            return None
+        # Different content every time, so each request really writes.
+        return json.dumps({"key": EDITED_KEY, "content": f"<p>Benchmark edit {n}</p>"}).encode("utf-8")
+
+
+ENDPOINTS = [
+    Endpoint("home", "/"),
+    Endpoint("culture", "/culture/"),
+    Endpoint("blog_feed", "/blog/"),
+    Endpoint("blog_feed_deep", "/blog/after/{deep_cursor}/"),
+    Endpoint("blog_post", "/blog/{post_id}/"),
+    Endpoint("feed_atom", "/blog/feed.atom"),
+    Endpoint("feed_json", "/blog/feed.json"),
+    Endpoint("dynamic_page", "/{slug}/"),
+    Endpoint("search", "/search/?q=festival+harvest"),
+    Endpoint("get_media_library", "/api/editor/library/", staff=True),
+    Endpoint("editable_element_update", "/editable-element/update/", staff=True, method="POST"),
+]
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 <= q <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list) -> dict:
+    ms = [v * 1000 for v in latencies]
+    return {
+        "n": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def compare(results: list, baseline: list, threshold: float = 0.2, noise_ms: float = 1.0) -> list:
+    """Regressions of ``results`` against ``baseline`` as readable strings.
+
+    Latency must be both ``threshold`` (relative) and ``noise_ms`` (absolute)
+    worse to count; any increase in query count does.
+    """
+    previous = {(r["tier"], r["mode"], r["endpoint"]): r for r in baseline}
+    regressions = []
+    for row in results:
+        base = previous.get((row["tier"], row["mode"], row["endpoint"]))
+        if base is None:
+            continue
+        label = f"{row['tier']}/{row['mode']}/{row['endpoint']}"
+        for metric in ("p50_ms", "p90_ms"):
+            old, new = base[metric], row[metric]
+            if new > old * (1 + threshold) and new - old > noise_ms:
+                regressions.append(f"{label}: {metric} {old:.2f} -> {new:.2f}")
+        if row.get("queries") is not None and base.get("queries") is not None and row["queries"] > base["queries"]:
+            regressions.append(f"{label}: queries {base['queries']} -> {row['queries']}")
+        if row["bytes"] > base["bytes"] * (1 + threshold):
+            regressions.append(f"{label}: bytes {base['bytes']} -> {row['bytes']}")
+        if row.get("peak_kib") and base.get("peak_kib") and row["peak_kib"] > base["peak_kib"] * (1 + threshold):
+            regressions.append(f"{label}: peak memory {base['peak_kib']} KiB -> {row['peak_kib']} KiB")
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_kib(parent_pid: int) -> "int | None":
+    """Largest VmHWM among ``parent_pid``'s children (Linux /proc only)."""
+    peak = None
+    for status in Path("/proc").glob("[0-9]*/status"):
+        try:
+            fields = dict(line.split(":", 1) for line in status.read_text().splitlines() if ":" in line)
+        except OSError:
+            continue
+        if fields.get("PPid", "").strip() == str(parent_pid) and "VmHWM" in fields:
+            value = int(fields["VmHWM"].split()[0])
+            peak = value if peak is None else max(peak, value)
+    return peak
+
+
+def start_gunicorn(args: list, port: int, env: dict, cwd) -> subprocess.Popen:
+    """Run ``gunicorn <args>`` on ``port``; return once it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *args, "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        cwd=cwd,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                server.kill()
+                raise RuntimeError(f"gunicorn {' '.join(args)} did not start")
+            time.sleep(0.1)
@@ -0,0 +1,155 @@
+"""Streaming JSON Lines export and import of the site's content.
+
+One line per row, in the same shape as ``dumpdata``::
+
+    {"model": "core.editableelement", "pk": 17, "fields": {"key": "news.page_title", ...}}
+
+Export walks each table in primary-key order through a ``values_list()``
+iterator, so memory stays flat however many rows there are. Import groups
+consecutive lines of one model into chunks and writes each chunk with a
+single ``bulk_create(update_conflicts=True)`` in its own transaction. Rows
+are matched on the model's natural key (``MODELS``): a row whose ``key`` or
+``slug`` already exists updates it whatever its primary key, the other
+models keep the exported primary keys. Within a chunk the last line for a
+key wins, since one upsert can't touch a row twice. EditorMedia rows are metadata only;
+the files themselves are not copied.
+"""
+
+import json
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from uuid import UUID
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+# Model label -> field rows are matched on, in export (and import) order.
+MODELS = {
+    "core.pressrelease": "id",
+    "core.homecard": "id",
+    "core.tabsettings": "slug",
+    "core.dynamicpage": "slug",
+    "core.editableelement": "key",
+    "core.editormedia": "id",
+}
+DEFAULT_CHUNK_SIZE = 5000
+PROGRESS_INTERVAL = 1.0
+
+
+class ContentImportError(Exception):
+    """A line of an import that can't be applied."""
+
+
+def _default(value):
+    # Unlike DjangoJSONEncoder, keep microseconds: feed cursors and ETags use them.
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def resolve(names=None) -> list:
+    """Model classes for ``names`` (labels or bare model names), in ``MODELS`` order."""
+    labels = list(MODELS)
+    if names:
+        wanted = {name.lower() if "." in name else f"core.{name.lower()}" for name in names}
+        unknown = wanted - set(labels)
+        if unknown:
+            raise LookupError(", ".join(sorted(unknown)))
+        labels = [label for label in labels if label in wanted]
+    return [apps.get_model(label) for label in labels]
+
+
+def _fields(model) -> list:
+    return [f for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def export_lines(model, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield one JSON line (with its newline) per row of ``model``."""
+    label = model._meta.label_lower
+    names = [f.attname for f in _fields(model)]
+    rows = model._default_manager.order_by("pk").values_list("pk", *names).iterator(chunk_size=chunk_size)
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default).encode
+    for pk, *values in rows:
+        yield dumps({"model": label, "pk": pk, "fields": dict(zip(names, values))}) + "\n"
+
+
+class Importer:
+    """Upserts JSON lines chunk by chunk; ``counts`` holds rows written per label."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, on_progress=None):
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.counts = {}
+        self.started = time.perf_counter()
+        self._model = None
+        self._chunk = []
+        self._lines = None  # (first, last) line numbers of the chunk
+        self._reported = self.started
+
+    def feed(self, line: str, line_number: int = 0) -> None:
+        if not line.strip():
+            return
+        try:
+            row = json.loads(line)
+            label = row["model"]
+            fields = row["fields"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ContentImportError(f"line {line_number}: not a content row ({e})")
+        if label not in MODELS:
+            raise ContentImportError(f"line {line_number}: unsupported model {label!r}")
+
+        if self._model is None or self._model._meta.label_lower != label:
+            self.flush()
+            self._model = apps.get_model(label)
+        pk = row.get("pk") if MODELS[label] == "id" else None
+        try:
+            self._chunk.append(self._model(pk=pk, **fields))
+        except TypeError as e:
+            raise ContentImportError(f"line {line_number}: {e}")
+        self._lines = (self._lines[0] if self._lines else line_number, line_number)
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._chunk:
+            return
+        model, match = self._model, MODELS[self._model._meta.label_lower]
+        # PostgreSQL rejects an upsert that hits one row twice; keep the last.
+        chunk, latest = [], {}
+        for obj in self._chunk:
+            key = getattr(obj, match)
+            if key is None:
+                chunk.append(obj)  # no pk given: always a new row
+            else:
+                latest[key] = obj
+        chunk += latest.values()
+        update = [f.name for f in _fields(model) if f.name != match]
+        first, last = self._lines
+        self._chunk, self._lines = [], None
+        try:
+            with transaction.atomic():
+                model._default_manager.bulk_create(
+                    chunk, update_conflicts=True, unique_fields=[match], update_fields=update
+                )
+        except (ValidationError, ValueError, DatabaseError) as e:
+            # A bad field value or a clash with another row fails the whole chunk.
+            raise ContentImportError(f"lines {first}-{last}: {e}")
+        label = model._meta.label_lower
+        self.counts[label] = self.counts.get(label, 0) + len(chunk)
+
+        now = time.perf_counter()
+        if self.on_progress and now - self._reported >= PROGRESS_INTERVAL:
+            self._reported = now
+            self.on_progress(self)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def rate(self) -> float:
+        return self.total / max(time.perf_counter() - self.started, 1e-9)
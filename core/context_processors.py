@@ -1,14 +1,50 @@
-import json
-
 from .models import EditableElement
 
 
+class EditableContent:
+    """Per-request store of saved editable HTML snippets, loaded by key.
+
+    The ``{% editable %}`` tag prefetches the keys from its template's manifest
+    in a single ``key__in`` query; anything it did not know about up front is
+    looked up individually and remembered for the rest of the request.
+    """
+
+    def __init__(self):
+        self._content = {}
+        self._fetched = set()
+
+    def prefetch(self, keys):
+        missing = set(keys) - self._fetched
+        if not missing:
+            return
+        self._content.update(
+            EditableElement.objects.filter(key__in=missing).order_by().values_list("key", "content")
+        )
+        self._fetched |= missing
+
+    async def aprefetch(self, keys):
+        """``prefetch`` through the async ORM, for async views."""
+        missing = set(keys) - self._fetched
+        if not missing:
+            return
+        rows = EditableElement.objects.filter(key__in=missing).order_by().values_list("key", "content")
+        self._content.update([row async for row in rows])
+        self._fetched |= missing
+
+    def __contains__(self, key):
+        self.prefetch([key])
+        return key in self._content
+
+    def __getitem__(self, key):
+        self.prefetch([key])
+        return self._content[key]
+
+
 def editable_elements(request):
-    """Expose saved editable HTML snippets to all templates as JSON.
+    """Expose saved editable HTML snippets to all templates.
 
-    The front-end visual editor uses this to hydrate elements that have been
-    edited previously.
+    Nothing is queried until a template renders an ``{% editable %}`` tag, and
+    then only for the keys that template can reference.
     """
 
-    mapping = {el.key: el.content for el in EditableElement.objects.all()}
-    return {"editable_elements_json": json.dumps(mapping)}
\ No newline at end of file
+    return {"editable_elements": EditableContent()}
@@ -0,0 +1,222 @@
+"""Normalization of HTML saved from the visual editor.
+
+Browsers serialize ``contenteditable`` and TinyMCE content with a lot of
+noise: empty or attribute-less ``<span>``s, repeated inline styles, runs of
+``&nbsp;``, Word's ``<o:p>`` and ``Mso*`` classes, comments. ``normalize()``
+rebuilds the markup in one pass over the tokens:
+
+* only allowlisted tags, attributes, URL schemes and style properties are
+  kept; other tags are unwrapped, and ``<script>``/``<style>``-like ones are
+  dropped with their content;
+* empty inline elements and attribute-less spans disappear, adjacent
+  identical inline tags are merged;
+* whitespace runs collapse to one space (or to nothing between block
+  tags), except inside ``<pre>``; a lone ``&nbsp;`` is kept;
+* the result is well-formed, with every open tag closed.
+
+Running it again on its output changes nothing.
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+BLOCK_TAGS = {
+    "p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "blockquote", "pre", "hr", "figure",
+    "figcaption", "table", "thead", "tbody", "tfoot", "tr", "th", "td", "caption", "br", "img", "iframe", "video",
+}
+INLINE_TAGS = {"a", "span", "strong", "b", "em", "i", "u", "s", "code", "sub", "sup", "mark", "small", "source"}
+VOID_TAGS = {"br", "hr", "img", "source"}
+# Dropped together with everything inside them.
+DROP_TAGS = {"script", "style", "template", "head", "title", "xml", "noscript", "object", "embed", "meta", "link"}
+# Meaningless without content (an <a> may still be a named anchor via its id).
+EMPTY_REMOVABLE = {"span", "strong", "b", "em", "i", "u", "s", "code", "sub", "sup", "mark", "small"}
+MERGEABLE = ("strong", "b", "em", "i", "u", "s", "sub", "sup", "mark", "small")
+
+GLOBAL_ATTRS = {"class", "id", "style", "title"}
+TAG_ATTRS = {
+    "a": {"href", "target", "rel"},
+    "img": {"src", "alt", "width", "height", "srcset", "sizes", "loading"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "ol": {"start", "type"},
+    "iframe": {"src", "width", "height", "allow", "allowfullscreen", "loading"},
+    "video": {"src", "controls", "width", "height", "poster"},
+    "source": {"src", "type"},
+}
+URL_ATTRS = {"href", "src", "poster"}
+SAFE_SCHEMES = ("http:", "https:", "mailto:", "tel:")
+STYLE_PROPERTIES = {
+    "text-align", "color", "background-color", "font-weight", "font-style", "font-size", "text-decoration",
+    "vertical-align", "width", "height", "max-width", "float", "display", "object-fit", "border-radius",
+    "margin", "margin-top", "margin-right", "margin-bottom", "margin-left", "padding",
+}
+_NOISE_CLASS_RE = re.compile(r"^(?:Mso|mce-|Apple-)", re.I)
+_WHITESPACE_RE = re.compile(r"[ \t\r\n\f\xa0]+")
+_STYLE_URL_RE = re.compile(r"url\s*\(|expression\s*\(", re.I)
+
+
+def _clean_style(value: str) -> str:
+    declarations = {}
+    for declaration in value.split(";"):
+        name, sep, prop_value = declaration.partition(":")
+        name, prop_value = name.strip().lower(), " ".join(prop_value.split())
+        if sep and name in STYLE_PROPERTIES and prop_value and not _STYLE_URL_RE.search(prop_value):
+            declarations.pop(name, None)  # the last one wins, in its position
+            declarations[name] = prop_value
+    return "; ".join(f"{name}: {prop_value}" for name, prop_value in declarations.items())
+
+
+def _safe_url(value: str) -> bool:
+    url = "".join(value.split()).lower()
+    return ":" not in url.split("/", 1)[0] or url.startswith(SAFE_SCHEMES)
+
+
+def _clean_attrs(tag: str, attrs: list) -> list:
+    allowed = GLOBAL_ATTRS | TAG_ATTRS.get(tag, set())
+    cleaned = {}
+    for name, value in attrs:
+        name = name.lower()
+        if name not in allowed:
+            continue
+        if value is not None:
+            value = value.strip()
+            if name == "style":
+                value = _clean_style(value)
+            elif name == "class":
+                value = " ".join(c for c in value.split() if not _NOISE_CLASS_RE.match(c))
+            elif name in URL_ATTRS and not _safe_url(value):
+                continue
+            if not value and name in ("style", "class", "id", "title"):
+                continue
+        cleaned[name] = value
+    return list(cleaned.items())
+
+
+class _Normalizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        # Open elements: [tag, index of its start tag in out (None if unwrapped)]
+        self.stack = []
+        self.dropping = 0
+        self.pending_space = False
+        # (index in out, start index, previous entry) of the last end tag emitted.
+        self.closed = None
+
+    def _in_pre(self) -> bool:
+        return any(frame[0] == "pre" for frame in self.stack)
+
+    def _emit_space(self, before_block: bool) -> None:
+        if self.pending_space and not before_block and self.out and self.out[-1] != " " and not self._after_block():
+            self.out.append(" ")
+        self.pending_space = False
+
+    def _after_block(self) -> bool:
+        last = self.out[-1] if self.out else ""
+        match = re.match(r"</?([a-z0-9]+)", last)
+        return bool(match and match.group(1) in BLOCK_TAGS)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_TAGS:
+            if tag not in ("meta", "link"):
+                self.dropping += 1
+            return
+        if self.dropping:
+            return
+        known = tag in BLOCK_TAGS or tag in INLINE_TAGS
+        attrs = _clean_attrs(tag, attrs) if known else []
+        if (tag == "span" and not attrs) or (tag == "img" and "src" not in dict(attrs)):
+            known = False  # unwrap, or drop an image without a usable source
+        self._emit_space(before_block=known and tag in BLOCK_TAGS)
+        if not known:
+            if tag not in VOID_TAGS:
+                self.stack.append([tag, None])
+            return
+        rendered = "".join(f" {name}" if value is None else f' {name}="{escape(value)}"' for name, value in attrs)
+        opening = f"<{tag}{rendered}>"
+        if tag in MERGEABLE and self.closed and self.closed[0] == len(self.out) - 1:
+            previous = self.closed[1]
+            if self.out[previous] == opening:
+                # Reopen the identical sibling that just closed.
+                self.out.pop()
+                self.closed = self.closed[2]
+                self.stack.append([tag, previous])
+                return
+        self.out.append(opening)
+        if tag not in VOID_TAGS:
+            self.stack.append([tag, len(self.out) - 1])
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in DROP_TAGS:
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropping:
+            if tag in DROP_TAGS:
+                self.dropping -= 1
+            return
+        if tag in VOID_TAGS or not any(frame[0] == tag for frame in self.stack):
+            return  # stray end tag
+        while self.stack:
+            open_tag, start = self.stack.pop()
+            self._close(open_tag, start)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag, start):
+        if start is None:
+            return
+        if tag in EMPTY_REMOVABLE and start == len(self.out) - 1:
+            self.out.pop()
+            return
+        self._emit_space(before_block=tag in BLOCK_TAGS)
+        self.out.append(f"</{tag}>")
+        self.closed = (len(self.out) - 1, start, self.closed)
+
+    def handle_data(self, data):
+        if self.dropping or not data:
+            return
+        if self._in_pre():
+            self._emit_space(before_block=False)
+            self.out.append(escape(data, quote=False))
+            return
+        parts = _WHITESPACE_RE.split(data)
+        runs = _WHITESPACE_RE.findall(data)
+        for i, part in enumerate(parts):
+            if part:
+                self._emit_space(before_block=False)
+                self.out.append(escape(part, quote=False))
+            if i < len(runs):
+                if runs[i] == "\xa0":
+                    # A deliberate non-breaking space (or a spacer paragraph).
+                    self._emit_space(before_block=False)
+                    self.out.append("&nbsp;")
+                else:
+                    self.pending_space = True
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._close(*self.stack.pop())
+        return "".join(self.out).strip()
+
+
+def normalize(html: str) -> str:
+    """``html`` with the editor noise removed; see the module docstring."""
+    parser = _Normalizer()
+    parser.feed(html or "")
+    return parser.close()
+
+
+def looks_like_html(value: str) -> bool:
+    """Whether a text field holds editor HTML rather than Markdown or plain text.
+
+    The editor always saves block-level markup; Markdown written in the admin
+    must keep its line breaks, so it is left alone.
+    """
+    value = (value or "").strip()
+    return value.startswith("<") and value.endswith(">")
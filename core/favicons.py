@@ -0,0 +1,135 @@
+"""Per-page tab metadata and the favicons generated from it.
+
+TabSettings rows are memoized per slug in-process and dropped whenever the
+content generation changes (any write to a ``core`` model, see
+``core.page_cache``), so rendering a page normally costs no DB query. The
+memo keeps the ``TAB_MEMO_SIZE`` most recently used slugs, since any
+``/favicon/<slug>.svg`` adds one. Icons
+are served from content-hashed URLs so browsers can cache them for good.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from io import BytesIO
+
+from django.utils.html import escape
+
+from .models import TabSettings
+from .page_cache import GenerationMemo, acontent_generation, content_generation
+
+DEFAULT_ICON_TEXT = "N"
+DEFAULT_BG = "#2F2F2F"
+DEFAULT_FG = "#FFFFFF"
+
+PNG_SIZE = 180
+ICO_SIZES = [(16, 16), (32, 32), (48, 48)]
+# Above the number of pages, which core.page_index seeds all at once.
+TAB_MEMO_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class TabMeta:
+    tab_title: str
+    icon_text: str = DEFAULT_ICON_TEXT
+    bg: str = DEFAULT_BG
+    fg: str = DEFAULT_FG
+
+    @property
+    def digest(self) -> str:
+        raw = "|".join((self.icon_text, self.bg, self.fg))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+
+# slug -> (content generation, TabMeta or None when no row exists)
+_tab_memo = GenerationMemo(TAB_MEMO_SIZE)
+# (digest, extension) -> rendered icon bytes
+_icon_memo = {}
+
+
+def tab_meta(slug: str) -> "TabMeta | None":
+    generation = content_generation()
+    cached = _tab_memo.get(slug)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    try:
+        meta = meta_from_settings(TabSettings.objects.get(slug=slug))
+    except TabSettings.DoesNotExist:
+        meta = None
+    _tab_memo[slug] = (generation, meta)
+    return meta
+
+
+async def atab_meta(slug: str) -> "TabMeta | None":
+    generation = await acontent_generation()
+    cached = _tab_memo.get(slug)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    try:
+        meta = meta_from_settings(await TabSettings.objects.aget(slug=slug))
+    except TabSettings.DoesNotExist:
+        meta = None
+    _tab_memo[slug] = (generation, meta)
+    return meta
+
+
+def meta_from_settings(obj: TabSettings) -> TabMeta:
+    return TabMeta(
+        tab_title=obj.tab_title,
+        icon_text=obj.icon_text or DEFAULT_ICON_TEXT,
+        bg=obj.icon_bg_color or DEFAULT_BG,
+        fg=obj.icon_text_color or DEFAULT_FG,
+    )
+
+
+def remember_tab_meta(generation: int, metas: dict) -> None:
+    """Seed the memo with already-loaded {slug: TabMeta or None} entries."""
+    for slug, meta in metas.items():
+        _tab_memo[slug] = (generation, meta)
+
+
+def icon_svg(meta: TabMeta) -> bytes:
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+        f'<rect width="100" height="100" rx="20" fill="{escape(meta.bg)}"/>'
+        '<text x="50" y="50" dy=".35em" text-anchor="middle" font-family="sans-serif" '
+        f'font-weight="bold" font-size="70" fill="{escape(meta.fg)}">{escape(meta.icon_text)}</text></svg>'
+    )
+    return svg.encode("utf-8")
+
+
+def _icon_image(meta: TabMeta, size: int):
+    from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+    def color(value, default):
+        try:
+            return ImageColor.getrgb(value)
+        except ValueError:
+            return ImageColor.getrgb(default)
+
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((0, 0, size - 1, size - 1), radius=size // 5, fill=color(meta.bg, DEFAULT_BG))
+    font = ImageFont.load_default(size=int(size * 0.7))
+    draw.text((size / 2, size / 2), meta.icon_text, fill=color(meta.fg, DEFAULT_FG), font=font, anchor="mm")
+    return image
+
+
+def render_icon(meta: TabMeta, ext: str) -> bytes:
+    key = (meta.digest, ext)
+    data = _icon_memo.get(key)
+    if data is not None:
+        return data
+
+    if ext == "svg":
+        data = icon_svg(meta)
+    else:
+        buf = BytesIO()
+        if ext == "png":
+            _icon_image(meta, PNG_SIZE).save(buf, format="PNG", optimize=True)
+        else:
+            _icon_image(meta, ICO_SIZES[-1][0]).save(buf, format="ICO", sizes=ICO_SIZES)
+        data = buf.getvalue()
+    _icon_memo[key] = data
+    return data
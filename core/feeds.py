@@ -0,0 +1,103 @@
+"""Atom and JSON Feed documents for the press releases.
+
+Both list the newest ``FEED_SIZE`` visible posts with their pre-rendered
+HTML. The views cache the documents like any public page (see
+``core.page_cache``), so a poller's conditional GET is answered with a 304
+and no database query until the content or the publishing schedule changes.
+"""
+
+import json
+import re
+
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.html import strip_tags
+
+from .images import best_variant
+from .templatetags.markdown_extras import render_markdown
+
+FEED_SIZE = 20
+FEED_TITLE = "Nomashae Press Releases"
+FEED_DESCRIPTION = "Decrees and news from the Democratic Micronation of Nomashae."
+FEED_IMAGE_WIDTH = 1280
+
+# Root-relative links and images in post bodies; readers show them out of context.
+_RELATIVE_URL_RE = re.compile(r'(\s(?:href|src)=["\'])/(?!/)')
+
+
+class _AtomFeed(feedgenerator.Atom1Feed):
+    # Atom1Feed only writes <summary>; readers show <content> in full.
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        handler.addQuickElement("content", item["content_html"], {"type": "html"})
+
+
+def _entries(request, posts) -> list:
+    origin = request.build_absolute_uri("/")
+    entries = []
+    for post in posts:
+        html = "".join(render_markdown(post, field) for field in post.MARKDOWN_FIELDS)
+        image = None
+        if post.image:
+            name = best_variant(post.image_variants, FEED_IMAGE_WIDTH)
+            image = request.build_absolute_uri(post.image.storage.url(name) if name else post.image.url)
+        entries.append(
+            {
+                "url": request.build_absolute_uri(reverse("blog_post", args=[post.pk])),
+                "title": post.title,
+                "summary": " ".join(strip_tags(render_markdown(post, "header")).split()),
+                "content_html": _RELATIVE_URL_RE.sub(rf"\1{origin}", html),
+                "published": post.published_at,
+                "image": image,
+            }
+        )
+    return entries
+
+
+def atom(request, posts) -> bytes:
+    feed = _AtomFeed(
+        title=FEED_TITLE,
+        link=request.build_absolute_uri(reverse("blog")),
+        description=FEED_DESCRIPTION,
+        feed_url=request.build_absolute_uri(reverse("blog_feed_atom")),
+        language="en",
+    )
+    for entry in _entries(request, posts):
+        feed.add_item(
+            title=entry["title"],
+            link=entry["url"],
+            unique_id=entry["url"],
+            description=entry["summary"] or None,
+            pubdate=entry["published"],
+            updateddate=entry["published"],
+            content_html=entry["content_html"],
+        )
+    return feed.writeString("utf-8").encode("utf-8")
+
+
+def json_feed(request, posts) -> bytes:
+    """A JSON Feed 1.1 document (https://jsonfeed.org/version/1.1)."""
+    items = []
+    for entry in _entries(request, posts):
+        item = {
+            "id": entry["url"],
+            "url": entry["url"],
+            "title": entry["title"],
+            "content_html": entry["content_html"],
+            "date_published": entry["published"].isoformat(),
+        }
+        if entry["summary"]:
+            item["summary"] = entry["summary"]
+        if entry["image"]:
+            item["image"] = entry["image"]
+        items.append(item)
+    document = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": FEED_TITLE,
+        "description": FEED_DESCRIPTION,
+        "home_page_url": request.build_absolute_uri(reverse("blog")),
+        "feed_url": request.build_absolute_uri(reverse("blog_feed_json")),
+        "language": "en",
+        "items": items,
+    }
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,78 @@
+"""Resized WebP derivatives for uploaded images.
+
+Variants are written next to the original (``decrees/flag.jpg`` gets
+``decrees/flag.w640.webp`` and friends) and described by a small dict that
+the owning row stores, so templates can build ``srcset`` without touching
+storage::
+
+    {"source": "decrees/flag.jpg", "width": 2400, "height": 1600,
+     "variants": [[320, "decrees/flag.w320.webp"], ...]}
+"""
+
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+IMAGE_WIDTHS = (320, 640, 960, 1280, 1920)
+WEBP_QUALITY = 80
+
+
+def variant_name(name: str, width: int) -> str:
+    root, _ext = os.path.splitext(name)
+    return f"{root}.w{width}.webp"
+
+
+def generate_variants(field_file) -> dict:
+    """Write WebP variants for ``field_file`` and return their description.
+
+    Returns an empty dict when the file is missing or not a readable image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if not field_file:
+        return {}
+    storage, name = field_file.storage, field_file.name
+    try:
+        with storage.open(name, "rb") as fh:
+            image = Image.open(fh)
+            image.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError):
+        return {}
+
+    # Apply the EXIF orientation, then drop all metadata by re-encoding.
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    widths = [w for w in IMAGE_WIDTHS if w < image.width] or [image.width]
+    if image.width not in widths and image.width < IMAGE_WIDTHS[-1]:
+        widths.append(image.width)
+
+    variants = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        buf = BytesIO()
+        resized.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+        target = variant_name(name, width)
+        if storage.exists(target):
+            storage.delete(target)
+        variants.append([width, storage.save(target, ContentFile(buf.getvalue()))])
+
+    return {"source": name, "width": image.width, "height": image.height, "variants": variants}
+
+
+def delete_variants(info: dict, storage) -> None:
+    for _width, name in (info or {}).get("variants", []):
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def best_variant(info: dict, max_width: int) -> "str | None":
+    """Name of the largest variant no wider than ``max_width`` (or the smallest)."""
+    variants = (info or {}).get("variants") or []
+    if not variants:
+        return None
+    fitting = [v for v in variants if v[0] <= max_width]
+    return max(fitting)[1] if fitting else min(variants)[1]
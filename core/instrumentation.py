@@ -0,0 +1,331 @@
+"""Per-request timing: a ``Server-Timing`` header and Prometheus-style metrics.
+
+``RequestTimingMiddleware`` times each request and breaks it down into
+phases: SQL (count and time), context processors, template rendering
+(excluding the context processors it triggers) and Markdown rendering.
+Code can add its own phase with ``with timer("name"):``.
+
+Lookups that found nothing (e.g. probes of the catch-all page route) are
+counted with ``record_miss``; each worker remembers its most recent distinct
+misses in a bounded LRU.
+
+Each worker keeps histograms per URL name in memory and every few seconds
+writes a snapshot to ``settings.METRICS_DIR``. The staff-only ``/metrics/``
+view sums the snapshots of all workers, so gunicorn's processes report as
+one service.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 5.0
+# Snapshots from workers that stopped longer ago than this are dropped.
+SNAPSHOT_RETENTION = 3600.0
+# Distinct missed keys remembered per worker, and how many /metrics/ lists.
+MISS_LRU_SIZE = 256
+MISS_METRICS_TOP = 20
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+        # Depth of nested Template.render calls; only the outermost is timed.
+        self.render_depth = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timer(phase: str):
+    """Add the time spent in the block to ``phase`` of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+class _Histograms:
+    """Per-(view, phase) bucket counts plus per-view counters for one worker."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {"histograms": {}, "queries": {}, "requests": {}, "misses": {}, "recent_misses": OrderedDict()}
+        self.last_flush = 0.0
+
+    def observe(self, view: str, status: int, timings: RequestTimings) -> None:
+        with self.lock:
+            for phase, seconds in timings.durations.items():
+                key = f"{view}|{phase}"
+                hist = self.data["histograms"].setdefault(key, {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+                for i, bound in enumerate(BUCKETS):
+                    if seconds <= bound:
+                        hist["buckets"][i] += 1
+                hist["sum"] += seconds
+                hist["count"] += 1
+            self.data["queries"][view] = self.data["queries"].get(view, 0) + timings.queries
+            key = f"{view}|{status // 100}xx"
+            self.data["requests"][key] = self.data["requests"].get(key, 0) + 1
+
+    def miss(self, view: str, key: str) -> None:
+        with self.lock:
+            self.data["misses"][view] = self.data["misses"].get(view, 0) + 1
+            recent = self.data["recent_misses"]
+            label = f"{view}|{key}"
+            recent[label] = recent.pop(label, 0) + 1
+            if len(recent) > MISS_LRU_SIZE:
+                recent.popitem(last=False)
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.last_flush < FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        directory = Path(settings.METRICS_DIR)
+        with self.lock:
+            payload = json.dumps(self.data)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = directory / f".{os.getpid()}.tmp"
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, directory / f"{os.getpid()}.json")
+        except OSError:
+            # Metrics must never break a request.
+            pass
+
+
+_histograms = _Histograms()
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add("db", time.perf_counter() - start)
+
+
+def _wrap_connection(sender, connection, **kwargs):
+    # Installed for the connection's lifetime rather than per request:
+    # connections are per thread, and the async ORM runs queries in a worker
+    # thread. The context variable follows the request into that thread.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def record_miss(view: str, key: str) -> None:
+    """Count a lookup in ``view`` that found nothing for ``key``."""
+    _histograms.miss(view, key[:100])
+
+
+def server_timing_header(timings: RequestTimings) -> str:
+    parts = []
+    for phase, seconds in timings.durations.items():
+        entry = f"{phase};dur={seconds * 1000:.2f}"
+        if phase == "db":
+            entry += f';desc="{timings.queries} queries"'
+        parts.append(entry)
+    return ", ".join(parts)
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        timings.add("total", time.perf_counter() - start)
+        user = None if settings.SERVER_TIMING else getattr(request, "user", None)
+        return self._finish(request, response, timings, user)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        timings.add("total", time.perf_counter() - start)
+        user = None
+        if not settings.SERVER_TIMING and hasattr(request, "auser"):
+            user = await request.auser()
+        return self._finish(request, response, timings, user)
+
+    def _finish(self, request, response, timings, user):
+        # The header exposes query counts and render times, so unless
+        # SERVER_TIMING is set only staff get it.
+        if settings.SERVER_TIMING or (user is not None and user.is_staff):
+            response["Server-Timing"] = server_timing_header(timings)
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        _histograms.observe(view, response.status_code, timings)
+        _histograms.flush()
+        return response
+
+
+def install() -> None:
+    """Hook SQL, template and context-processor timing into Django.
+
+    Every new database connection gets the query timer. Django has no public
+    hooks for the other two, so ``Template.render`` and the engines'
+    context-processor lists are wrapped once at startup.
+    """
+    from django.template import engines
+    from django.template.base import Template
+
+    connection_created.connect(_wrap_connection, dispatch_uid="instrumentation-query-timer")
+    if getattr(Template.render, "_timed", False):
+        return
+    original_render = Template.render
+
+    def render(self, context):
+        timings = _current.get()
+        if timings is None or timings.render_depth:
+            return original_render(self, context)
+        timings.render_depth += 1
+        before = timings.durations.get("context_processors", 0.0)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            timings.render_depth -= 1
+            elapsed = time.perf_counter() - start
+            timings.add("template", elapsed - (timings.durations.get("context_processors", 0.0) - before))
+
+    render._timed = True
+    Template.render = render
+
+    def timed(processor):
+        def wrapper(request):
+            with timer("context_processors"):
+                return processor(request)
+
+        return wrapper
+
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is not None:
+            engine.template_context_processors = tuple(timed(p) for p in engine.template_context_processors)
+
+
+def _load_snapshots() -> list:
+    _histograms.flush(force=True)
+    directory = Path(settings.METRICS_DIR)
+    snapshots = []
+    now = time.time()
+    for path in directory.glob("*.json"):
+        try:
+            if now - path.stat().st_mtime > SNAPSHOT_RETENTION:
+                path.unlink()
+                continue
+            snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics() -> str:
+    """All workers' metrics in the Prometheus text exposition format."""
+    histograms, queries, requests, misses, recent_misses = {}, {}, {}, {}, {}
+    for snapshot in _load_snapshots():
+        for key, hist in snapshot.get("histograms", {}).items():
+            total = histograms.setdefault(key, {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+            total["buckets"] = [a + b for a, b in zip(total["buckets"], hist["buckets"])]
+            total["sum"] += hist["sum"]
+            total["count"] += hist["count"]
+        for key, value in snapshot.get("queries", {}).items():
+            queries[key] = queries.get(key, 0) + value
+        for key, value in snapshot.get("requests", {}).items():
+            requests[key] = requests.get(key, 0) + value
+        for key, value in snapshot.get("misses", {}).items():
+            misses[key] = misses.get(key, 0) + value
+        for key, value in snapshot.get("recent_misses", {}).items():
+            recent_misses[key] = recent_misses.get(key, 0) + value
+
+    lines = [
+        "# HELP nomashae_request_phase_seconds Time spent per request, by view and phase.",
+        "# TYPE nomashae_request_phase_seconds histogram",
+    ]
+    for key in sorted(histograms):
+        view, phase = key.split("|", 1)
+        labels = f'view="{_label(view)}",phase="{phase}"'
+        hist = histograms[key]
+        for bound, count in zip(BUCKETS, hist["buckets"]):
+            lines.append(f'nomashae_request_phase_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'nomashae_request_phase_seconds_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+        lines.append(f"nomashae_request_phase_seconds_sum{{{labels}}} {hist['sum']:.6f}")
+        lines.append(f"nomashae_request_phase_seconds_count{{{labels}}} {hist['count']}")
+
+    lines += [
+        "# HELP nomashae_db_queries_total SQL queries run, by view.",
+        "# TYPE nomashae_db_queries_total counter",
+    ]
+    for view in sorted(queries):
+        lines.append(f'nomashae_db_queries_total{{view="{_label(view)}"}} {queries[view]}')
+
+    lines += [
+        "# HELP nomashae_requests_total Requests handled, by view and status class.",
+        "# TYPE nomashae_requests_total counter",
+    ]
+    for key in sorted(requests):
+        view, status = key.split("|", 1)
+        lines.append(f'nomashae_requests_total{{view="{_label(view)}",status="{status}"}} {requests[key]}')
+
+    lines += [
+        "# HELP nomashae_lookup_misses_total Lookups that found nothing, by view.",
+        "# TYPE nomashae_lookup_misses_total counter",
+    ]
+    for view in sorted(misses):
+        lines.append(f'nomashae_lookup_misses_total{{view="{_label(view)}"}} {misses[view]}')
+
+    lines += [
+        "# HELP nomashae_recent_misses Most frequent recently missed keys (per-worker LRU, summed).",
+        "# TYPE nomashae_recent_misses gauge",
+    ]
+    top = sorted(recent_misses.items(), key=lambda item: (-item[1], item[0]))[:MISS_METRICS_TOP]
+    for label, count in top:
+        view, key = label.split("|", 1)
+        lines.append(f'nomashae_recent_misses{{view="{_label(view)}",key="{_label(key)}"}} {count}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,211 @@
+"""Throughput and latency of the WSGI and ASGI deployments under slow clients.
+
+A spawned worker migrates and seeds a throwaway SQLite database (see
+``core.benchmarks``) and serves it with gunicorn twice, with the same number
+of processes: sync workers on ``nomashae_site.wsgi`` and uvicorn workers
+configured by ``nomashae_site/gunicorn_asgi.py``. Against each it runs many
+concurrent slow clients, which trickle their request headers and read the
+response in small pieces, plus one fast client; the fast client's latency
+shows how long a slow client can hold up everyone else.
+
+The ASGI run needs ``uvicorn`` and ``uvicorn-worker`` installed.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Spawned workers import this module before Django is set up, so nothing
+# that touches models is imported at module level.
+
+HOST = "localhost"
+SERVERS = {
+    "wsgi": ["nomashae_site.wsgi:application"],
+    "asgi": ["-c", "nomashae_site/gunicorn_asgi.py"],
+}
+READ_SIZE = 4096
+REQUEST_TIMEOUT = 60
+
+
+async def _request(port: int, path: str, trickle: float = 0.0, read_delay: float = 0.0) -> tuple:
+    """GET ``path``; return (status, body bytes, seconds).
+
+    With ``trickle`` the request is sent a header line at a time over that
+    many seconds; with ``read_delay`` the response is read ``READ_SIZE``
+    bytes at a time with that pause in between.
+    """
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {HOST}", "User-Agent: benchmark_servers", "Connection: close", ""]
+        for line in lines:
+            writer.write(f"{line}\r\n".encode("ascii"))
+            await writer.drain()
+            if trickle:
+                await asyncio.sleep(trickle / len(lines))
+
+        response = bytearray()
+        while chunk := await reader.read(READ_SIZE):
+            response += chunk
+            if read_delay:
+                await asyncio.sleep(read_delay)
+    finally:
+        writer.close()
+    status = int(response.split(b" ", 2)[1]) if response.startswith(b"HTTP/") else 0
+    _, _, body = bytes(response).partition(b"\r\n\r\n")
+    return status, len(body), time.perf_counter() - started
+
+
+async def _warm(port: int, paths: list) -> None:
+    # Fill the page cache and the workers' in-process indexes first.
+    await asyncio.gather(*(_request(port, path) for path in paths))
+
+
+async def _load(port: int, paths: list, options: dict) -> dict:
+    from core import benchmarks
+
+    deadline = time.monotonic() + options["duration"]
+    slow, fast, errors = [], [], []
+
+    async def run(latencies, n, **kwargs):
+        while time.monotonic() < deadline:
+            path = paths[n % len(paths)]
+            n += 1
+            try:
+                status, _, elapsed = await asyncio.wait_for(_request(port, path, **kwargs), REQUEST_TIMEOUT)
+            except (OSError, asyncio.TimeoutError) as exc:
+                errors.append(type(exc).__name__)
+                continue
+            if status != 200:
+                errors.append(f"HTTP {status}")
+                continue
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        run(fast, 0),
+        *(
+            run(slow, i, trickle=options["trickle"], read_delay=options["read_delay"])
+            for i in range(options["clients"])
+        ),
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "completed": len(slow) + len(fast),
+        "errors": len(errors),
+        "rps": round((len(slow) + len(fast)) / elapsed, 1),
+        "slow": benchmarks.summarize(slow),
+        "fast": benchmarks.summarize(fast),
+    }
+
+
+def _worker(options, results):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nomashae_site.settings")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "benchmark.sqlite3")
+        # Before setup, so the connection and the servers started later all
+        # use the throwaway database.
+        os.environ["SQLITE_PATH"] = db_path
+        django.setup()
+
+        from django.core.management import call_command
+        from django.db import connections
+
+        from core import benchmarks
+
+        call_command("migrate", verbosity=0)
+        fixtures = benchmarks.seed(options["tier"], options["seed"])
+        connections.close_all()
+        paths = [
+            url
+            for endpoint in benchmarks.ENDPOINTS
+            if not endpoint.staff and endpoint.method == "GET" and (url := endpoint.url(fixtures))
+        ]
+
+        rows = []
+        for name in options["servers"]:
+            port = benchmarks.free_port()
+            env = {**os.environ, "DJANGO_CACHE_DIR": os.path.join(tmp, f"cache-{name}")}
+            args = [*SERVERS[name], "--workers", str(options["workers"])]
+            try:
+                server = benchmarks.start_gunicorn(args, port, env, settings.BASE_DIR)
+            except RuntimeError as exc:
+                rows.append({"server": name, "error": str(exc)})
+                continue
+            try:
+                asyncio.run(_warm(port, paths * options["workers"]))
+                row = asyncio.run(_load(port, paths, options))
+                row.update(server=name, peak_kib=benchmarks.peak_rss_kib(server.pid))
+                rows.append(row)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    results.put(rows)
+
+
+class Command(BaseCommand):
+    help = "Compare the WSGI (sync workers) and ASGI (uvicorn workers) deployments under many slow clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", default="wsgi,asgi", help="Comma-separated: wsgi, asgi.")
+        parser.add_argument("--tier", default="small", help="Data-size tier to seed (see benchmark_views).")
+        parser.add_argument("--seed", type=int, default=0, help="Fixture RNG seed.")
+        parser.add_argument("--workers", type=int, default=2, help="gunicorn processes for each server.")
+        parser.add_argument("--clients", type=int, default=100, help="Concurrent slow clients.")
+        parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load per server.")
+        parser.add_argument("--trickle", type=float, default=1.0, help="Seconds a slow client takes to send a request.")
+        parser.add_argument("--read-delay", type=float, default=0.05, help="Pause between a slow client's reads.")
+        parser.add_argument("--output", default=None, help="Write results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        from core import benchmarks
+
+        servers = [s.strip() for s in options["servers"].split(",") if s.strip()]
+        unknown = [s for s in servers if s not in SERVERS]
+        if unknown or not servers:
+            raise CommandError(f"Unknown server(s): {', '.join(unknown) or '(none)'}")
+        if options["tier"] not in benchmarks.TIERS:
+            raise CommandError(f"Unknown tier: {options['tier']}")
+
+        worker_options = {
+            k: options[k]
+            for k in ("tier", "seed", "workers", "clients", "duration", "trickle", "read_delay")
+        }
+        worker_options["servers"] = servers
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{options['clients']} slow clients + 1 fast client for {options['duration']:g}s,"
+                f" {options['workers']} workers, tier {options['tier']}"
+            )
+        )
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        proc = ctx.Process(target=_worker, args=(worker_options, results))
+        proc.start()
+        rows = results.get()
+        proc.join()
+
+        for row in rows:
+            if "error" in row:
+                self.stdout.write(self.style.WARNING(f"  {row['server']:<5} skipped: {row['error']}"))
+                continue
+            slow, fast = row["slow"], row["fast"]
+            self.stdout.write(
+                f"  {row['server']:<5} {row['rps']:8.1f} req/s  errors={row['errors']:<4}"
+                f" slow p50={slow['p50_ms']:8.1f}ms p99={slow['p99_ms']:8.1f}ms"
+                f"  fast p50={fast['p50_ms']:8.1f}ms p99={fast['p99_ms']:8.1f}ms"
+                f"  peak={row['peak_kib']}KiB"
+            )
+
+        if options["output"]:
+            run = {"options": worker_options, "django": django.get_version(), "results": rows}
+            Path(options["output"]).write_text(json.dumps(run, indent=2), encoding="utf-8")
+            self.stdout.write(f"Wrote {options['output']}")
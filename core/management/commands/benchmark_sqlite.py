@@ -0,0 +1,159 @@
+"""Concurrent read/write benchmark for the SQLite configuration.
+
+Runs reader and writer processes against the real views (through Django's
+test client) on a throwaway copy of the database, once with SQLite's stock
+settings and once with the tuned settings from ``settings.DATABASES``, and
+reports throughput and lock errors for each.
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+READ_PATHS = ["/", "/culture/", "/blog/"]
+
+PROFILES = {
+    # What Django does out of the box: rollback journal, a new connection
+    # per request, deferred transactions.
+    "default": {"journal_mode": "DELETE", "CONN_MAX_AGE": 0, "OPTIONS": {}},
+    "tuned": {
+        "journal_mode": "WAL",
+        "CONN_MAX_AGE": settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+        "OPTIONS": settings.DATABASES["default"].get("OPTIONS", {}),
+    },
+}
+
+
+def _worker(role, index, db_path, profile, duration, results):
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nomashae_site.settings")
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    # Point the (not yet opened) default connection at the benchmark copy.
+    connections["default"].settings_dict.update(
+        NAME=db_path,
+        CONN_MAX_AGE=PROFILES[profile]["CONN_MAX_AGE"],
+        OPTIONS=dict(PROFILES[profile]["OPTIONS"]),
+    )
+
+    ok = errors = locked = 0
+    latencies = []
+    # Bypass the page cache so every read reaches the database.
+    with override_settings(
+        ALLOWED_HOSTS=["*"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    ):
+        client = Client()
+        if role == "writer":
+            client.force_login(get_user_model().objects.get(username="benchmark-staff"))
+        deadline = time.perf_counter() + duration
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            start = time.perf_counter()
+            try:
+                if role == "reader":
+                    response = client.get(READ_PATHS[n % len(READ_PATHS)])
+                else:
+                    response = client.post(
+                        "/editable-element/update/",
+                        json.dumps({"key": f"benchmark.w{index}.{n % 50}", "content": f"<p>{n}</p>"}),
+                        content_type="application/json",
+                    )
+                body = response.content
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    errors += 1
+                    locked += b"locked" in body
+            except Exception as e:
+                errors += 1
+                locked += "locked" in str(e)
+            latencies.append(time.perf_counter() - start)
+
+    results.put({"role": role, "ok": ok, "errors": errors, "locked": locked, "latencies": latencies})
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent readers/writers against the views with default vs tuned SQLite settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=6)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile.")
+        parser.add_argument("--profile", choices=[*PROFILES, "both"], default="both")
+
+    def handle(self, *args, readers, writers, duration, profile, **options):
+        source = settings.DATABASES["default"]["NAME"]
+        profiles = list(PROFILES) if profile == "both" else [profile]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in profiles:
+                db_path = os.path.join(tmp, f"{name}.sqlite3")
+                self._prepare_copy(source, db_path, PROFILES[name]["journal_mode"])
+                summary = self._run(name, db_path, readers, writers, duration)
+                self._report(name, summary, duration)
+
+    def _prepare_copy(self, source, db_path, journal_mode):
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(db_path)
+        src.backup(dst)
+        src.close()
+        dst.execute(f"PRAGMA journal_mode={journal_mode}")
+        dst.close()
+
+        from django.contrib.auth.hashers import make_password
+        from django.utils import timezone
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT OR IGNORE INTO auth_user (username, password, is_superuser, is_staff, is_active,"
+            " first_name, last_name, email, date_joined) VALUES (?, ?, 0, 1, 1, '', '', '', ?)",
+            ("benchmark-staff", make_password(None), timezone.now().isoformat()),
+        )
+        conn.commit()
+        conn.close()
+
+    def _run(self, profile, db_path, readers, writers, duration):
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_worker, args=(role, i, db_path, profile, duration, results))
+            for role, count in (("reader", readers), ("writer", writers))
+            for i in range(count)
+        ]
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        return collected
+
+    def _report(self, profile, collected, duration):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Profile: {profile}"))
+        for role in ("reader", "writer"):
+            rows = [r for r in collected if r["role"] == role]
+            if not rows:
+                continue
+            ok = sum(r["ok"] for r in rows)
+            errors = sum(r["errors"] for r in rows)
+            locked = sum(r["locked"] for r in rows)
+            latencies = sorted(lat for r in rows for lat in r["latencies"])
+            p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+            self.stdout.write(
+                f"  {role}s: {ok / duration:8.1f} ok/s  errors={errors} (locked={locked})"
+                f"  p50={p50:.1f}ms  p99={p99:.1f}ms"
+            )
@@ -0,0 +1,268 @@
+"""Latency/query/size/memory benchmark for the public and editor endpoints.
+
+For each data-size tier a spawned worker migrates a throwaway SQLite
+database, seeds it (see ``core.benchmarks``) and measures every endpoint
+in-process through Django's test client: latency percentiles, SQL queries,
+response bytes and peak Python allocations per request. With ``--http`` the
+same requests are also timed against a local gunicorn serving that database
+with the page cache live as deployed (there, memory is the workers' peak
+RSS and queries aren't visible).
+
+Results are written as JSON; ``--baseline`` compares against an earlier run
+and fails the command on regressions.
+"""
+
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Spawned workers import this module before Django is set up, so nothing
+# that touches models is imported at module level.
+
+HOST = "localhost"
+
+
+def _measure_in_process(fixtures, iterations, warmup):
+    import tracemalloc
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from core import benchmarks
+
+    anonymous = Client()
+    staff = Client()
+    staff.force_login(get_user_model().objects.get(pk=fixtures["staff_id"]))
+
+    rows = []
+    for endpoint in benchmarks.ENDPOINTS:
+        url = endpoint.url(fixtures)
+        if url is None:
+            continue
+        client = staff if endpoint.staff else anonymous
+        n = 0
+
+        def request():
+            nonlocal n
+            n += 1
+            if endpoint.method == "POST":
+                return client.post(url, endpoint.body(n), content_type="application/json")
+            return client.get(url)
+
+        for _ in range(warmup):
+            request()
+
+        latencies, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = request()
+                latencies.append(time.perf_counter() - start)
+            queries.append(len(captured))
+            if response.status_code != 200:
+                raise RuntimeError(f"{endpoint.name}: HTTP {response.status_code} for {url}")
+
+        # Allocation tracing slows requests down, so it gets its own pass.
+        peak = 0
+        for _ in range(min(5, iterations)):
+            tracemalloc.start()
+            request()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        rows.append(
+            {
+                "endpoint": endpoint.name,
+                "mode": "inprocess",
+                **benchmarks.summarize(latencies),
+                "queries": sorted(queries)[len(queries) // 2],
+                "bytes": len(response.content),
+                "peak_kib": peak // 1024,
+            }
+        )
+    return rows
+
+
+def _measure_http(fixtures, iterations, warmup, db_path, workers):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from core import benchmarks
+
+    # A logged-in session for the staff endpoints, stored in the shared DB.
+    login = Client()
+    login.force_login(get_user_model().objects.get(pk=fixtures["staff_id"]))
+    session_cookie = f"{settings.SESSION_COOKIE_NAME}={login.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    port = benchmarks.free_port()
+    env = {
+        **os.environ,
+        "SQLITE_PATH": db_path,
+        "DJANGO_CACHE_DIR": os.path.join(os.path.dirname(db_path), "cache"),
+    }
+    server = benchmarks.start_gunicorn(
+        ["nomashae_site.wsgi:application", "--workers", str(workers)], port, env, settings.BASE_DIR
+    )
+    try:
+        rows = []
+        for endpoint in benchmarks.ENDPOINTS:
+            url = endpoint.url(fixtures)
+            if url is None:
+                continue
+            headers = {"Host": HOST}
+            if endpoint.staff:
+                headers["Cookie"] = session_cookie
+            if endpoint.method == "POST":
+                headers["Content-Type"] = "application/json"
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            latencies, size = [], 0
+            for i in range(warmup + iterations):
+                start = time.perf_counter()
+                conn.request(endpoint.method, url, body=endpoint.body(i), headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                elapsed = time.perf_counter() - start
+                if response.status != 200:
+                    raise RuntimeError(f"{endpoint.name}: HTTP {response.status} for {url}")
+                if i >= warmup:
+                    latencies.append(elapsed)
+                    size = len(body)
+            conn.close()
+            rows.append(
+                {
+                    "endpoint": endpoint.name,
+                    "mode": "http",
+                    **benchmarks.summarize(latencies),
+                    "queries": None,
+                    "bytes": size,
+                    "peak_kib": benchmarks.peak_rss_kib(server.pid),
+                }
+            )
+        return rows
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _worker(tier, options, results):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nomashae_site.settings")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "benchmark.sqlite3")
+        # Before setup, so the connection and any gunicorn started later
+        # both use the throwaway database.
+        os.environ["SQLITE_PATH"] = db_path
+        django.setup()
+
+        from django.core.management import call_command
+        from django.db import connections
+        from django.test.utils import override_settings
+
+        from core import benchmarks
+
+        with override_settings(
+            ALLOWED_HOSTS=["*"],
+            MEDIA_ROOT=os.path.join(tmp, "media"),
+            # Measure the views, not the page cache.
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        ):
+            call_command("migrate", verbosity=0)
+            started = time.perf_counter()
+            fixtures = benchmarks.seed(tier, options["seed"])
+            seeded = time.perf_counter() - started
+
+            rows = _measure_in_process(fixtures, options["iterations"], options["warmup"])
+            connections.close_all()
+            if options["http"]:
+                rows += _measure_http(fixtures, options["iterations"], options["warmup"], db_path, options["workers"])
+
+    import resource
+
+    for row in rows:
+        row["tier"] = tier
+    results.put(
+        {
+            "tier": tier,
+            "seed_seconds": round(seeded, 2),
+            "rows": benchmarks.TIERS[tier],
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "results": rows,
+        }
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark every public and editor endpoint across data-size tiers; compare against a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tiers", default="small,medium", help="Comma-separated: small, medium, large.")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0, help="Fixture RNG seed.")
+        parser.add_argument("--http", action="store_true", help="Also measure through a local gunicorn.")
+        parser.add_argument("--workers", type=int, default=2, help="gunicorn workers for --http.")
+        parser.add_argument("--output", default=None, help="Write results as JSON to this file.")
+        parser.add_argument("--baseline", default=None, help="Earlier --output file to compare against.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        from core import benchmarks
+
+        tiers = [t.strip() for t in options["tiers"].split(",") if t.strip()]
+        unknown = [t for t in tiers if t not in benchmarks.TIERS]
+        if unknown:
+            raise CommandError(f"Unknown tier(s): {', '.join(unknown)}")
+
+        ctx = multiprocessing.get_context("spawn")
+        tier_reports = []
+        for tier in tiers:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Tier: {tier} {benchmarks.TIERS[tier]}"))
+            results = ctx.Queue()
+            worker_options = {k: options[k] for k in ("iterations", "warmup", "seed", "http", "workers")}
+            proc = ctx.Process(target=_worker, args=(tier, worker_options, results))
+            proc.start()
+            report = results.get()
+            proc.join()
+            tier_reports.append(report)
+            for row in report["results"]:
+                queries = "-" if row["queries"] is None else row["queries"]
+                self.stdout.write(
+                    f"  {row['mode']:<9} {row['endpoint']:<24} p50={row['p50_ms']:8.2f}ms p90={row['p90_ms']:8.2f}ms"
+                    f" p99={row['p99_ms']:8.2f}ms queries={queries:<3} bytes={row['bytes']:<8} peak={row['peak_kib']}KiB"
+                )
+
+        run = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "iterations": options["iterations"],
+                "warmup": options["warmup"],
+                "seed": options["seed"],
+            },
+            "tiers": [{k: v for k, v in r.items() if k != "results"} for r in tier_reports],
+            "results": [row for r in tier_reports for row in r["results"]],
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(run, indent=2), encoding="utf-8")
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+            regressions = benchmarks.compare(run["results"], baseline["results"], options["threshold"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,129 @@
+"""Move existing uploads to content-addressed names (see ``core.storage``).
+
+Files saved before content addressing keep their original names. This
+re-stores each one (and its image variants) under its content hash, points
+the rows at the new names and deletes the old files, so identical uploads end
+up sharing one blob. ``--prune`` also removes content-addressed blobs that no
+row references any more.
+"""
+
+import os
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from core.page_cache import bump_content_generation
+from core.storage import content_digest
+
+
+def _file_fields():
+    for model in apps.get_app_config("core").get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = "Re-store uploaded media under content hashes, sharing one file between duplicates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without changing it.")
+        parser.add_argument("--prune", action="store_true", help="Delete stored blobs that no row references.")
+
+    def handle(self, *args, dry_run=False, prune=False, **options):
+        moved = missing = 0
+        stale = {}  # old name -> storage it lives in
+        for model, field in _file_fields():
+            storage = field.storage
+            has_variants = any(f.name == "image_variants" for f in model._meta.concrete_fields)
+            rows = model.objects.exclude(**{field.name: ""}).exclude(**{f"{field.name}__isnull": True})
+            for obj in rows.iterator():
+                name = getattr(obj, field.attname).name
+                if content_digest(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f"Missing file for {model.__name__} {obj.pk}: {name}")
+                    continue
+                moved += 1
+                if dry_run:
+                    self.stdout.write(f"Would move {name}")
+                    continue
+
+                with storage.open(name, "rb") as fh:
+                    new_name = storage.save(name, fh)
+                updates = {field.attname: new_name}
+                stale[name] = storage
+
+                if has_variants and obj.image_variants:
+                    info = dict(obj.image_variants)
+                    variants = []
+                    for width, variant in info.get("variants", []):
+                        if not content_digest(variant) and storage.exists(variant):
+                            with storage.open(variant, "rb") as fh:
+                                stale[variant] = storage
+                                variant = storage.save(variant, fh)
+                        variants.append([width, variant])
+                    info.update(source=new_name, variants=variants)
+                    updates["image_variants"] = info
+                if hasattr(obj, "original_name") and not obj.original_name:
+                    updates["original_name"] = os.path.basename(name)
+
+                # update() rather than save(): nothing needs re-rendering.
+                with transaction.atomic():
+                    model.objects.filter(pk=obj.pk).update(**updates)
+                self.stdout.write(f"{name} -> {new_name}")
+
+        # Only delete old files once no row points at them.
+        still_used = self._referenced_names()
+        for name, storage in sorted(stale.items()):
+            if name not in still_used:
+                storage.delete(name)
+
+        pruned = 0
+        if prune:
+            pruned = self._prune(dry_run)
+
+        if moved and not dry_run:
+            bump_content_generation()
+        verb = "Would move" if dry_run else "Moved"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {moved} files ({missing} missing); pruned {pruned} unreferenced blobs.")
+        )
+
+    def _referenced_names(self) -> set:
+        names = set()
+        for model, field in _file_fields():
+            has_variants = any(f.name == "image_variants" for f in model._meta.concrete_fields)
+            columns = [field.attname] + (["image_variants"] if has_variants else [])
+            for row in model.objects.values_list(*columns):
+                if row[0]:
+                    names.add(row[0])
+                if has_variants and row[1]:
+                    names.update(variant for _width, variant in row[1].get("variants", []))
+        return names
+
+    def _prune(self, dry_run: bool) -> int:
+        referenced = self._referenced_names()
+        pruned = 0
+        seen_dirs = set()
+        for _model, field in _file_fields():
+            top = str(field.upload_to).strip("/").split("/", 1)[0]
+            root = Path(field.storage.path(top))
+            if root in seen_dirs or not root.is_dir():
+                continue
+            seen_dirs.add(root)
+            for path in root.rglob("*"):
+                if not path.is_file():
+                    continue
+                name = path.relative_to(field.storage.location).as_posix()
+                if content_digest(name) and name not in referenced:
+                    pruned += 1
+                    if dry_run:
+                        self.stdout.write(f"Would prune {name}")
+                    else:
+                        # storage.delete() leaves content-addressed blobs alone.
+                        path.unlink()
+        return pruned
@@ -0,0 +1,57 @@
+"""Stream site content to a JSON Lines file (see ``core.content_io``)."""
+
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import content_io
+
+
+def open_text(path: str, mode: str):
+    """``path`` as a text file; ``-`` is stdin/stdout and ``*.gz`` is gzipped."""
+    if path == "-":
+        return (sys.stdin if "r" in mode else sys.stdout), False
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6), True
+    return open(path, mode, encoding="utf-8", newline="\n"), True
+
+
+class Command(BaseCommand):
+    help = "Export posts, pages, tab settings, editable elements and media metadata as JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write (.gz to compress), or - for stdout.")
+        parser.add_argument("--models", default="", help=f"Comma-separated subset of: {', '.join(content_io.MODELS)}.")
+        parser.add_argument("--chunk-size", type=int, default=content_io.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, output, models, chunk_size, **options):
+        try:
+            model_classes = content_io.resolve([m.strip() for m in models.split(",") if m.strip()])
+        except LookupError as e:
+            raise CommandError(f"Unknown model(s): {e}")
+
+        # Progress goes to stderr so stdout can carry the export itself.
+        log = self.stderr if output == "-" else self.stdout
+        started = time.perf_counter()
+        total = 0
+        out, close = open_text(output, "w")
+        try:
+            for model in model_classes:
+                count = 0
+                model_started = time.perf_counter()
+                for line in content_io.export_lines(model, chunk_size):
+                    out.write(line)
+                    count += 1
+                total += count
+                elapsed = time.perf_counter() - model_started
+                log.write(f"  {model._meta.label_lower}: {count} rows ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+        finally:
+            if close:
+                out.close()
+            else:
+                out.flush()
+
+        elapsed = time.perf_counter() - started
+        log.write(self.style.SUCCESS(f"Exported {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)."))
@@ -0,0 +1,116 @@
+"""Prerender the public site to static files (see ``core.static_export``)."""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Spawned workers import this module before Django is set up, so nothing
+# that touches models is imported at module level.
+_client = None
+
+
+def _init_worker():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nomashae_site.settings")
+    django.setup()
+    _setup_client()
+
+
+def _setup_client():
+    global _client
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    # Render what an anonymous visitor gets, straight from the views rather
+    # than from (or into) the page cache.
+    override_settings(
+        ALLOWED_HOSTS=["*"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    ).enable()
+    _client = Client()
+
+
+def _render(job):
+    from core import static_export
+
+    root, page, previous = job
+    response = _client.get(page.url)
+    if response.status_code != 200:
+        return page.url, None, f"HTTP {response.status_code}"
+    content = b"".join(response) if response.streaming else response.content
+    entry = static_export.write_page(Path(root), page, content, response["Content-Type"], previous)
+    return page.url, entry, None
+
+
+class Command(BaseCommand):
+    help = "Render the public pages to static files with .gz/.br siblings, re-rendering only what changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None, help="Export directory (default: settings.STATIC_EXPORT_ROOT).")
+        parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Render processes.")
+        parser.add_argument("--force", action="store_true", help="Re-render every page.")
+
+    def handle(self, *args, output, jobs, force, **options):
+        from core import static_export
+
+        root = Path(output or settings.STATIC_EXPORT_ROOT).resolve()
+        root.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+
+        previous = static_export.load_manifest(root)
+        pages = static_export.collect_pages()
+        stale = [
+            page
+            for page in pages
+            if force
+            or previous.get(page.url, {}).get("inputs") != page.inputs
+            or not (root / page.path).exists()
+        ]
+
+        manifest = {page.url: previous[page.url] for page in pages if page.url in previous}
+        jobs_list = [(str(root), page, previous.get(page.url, {})) for page in stale]
+        failures = []
+        for url, entry, error in self._render_all(jobs_list, jobs):
+            if error:
+                failures.append(f"{url}: {error}")
+                manifest.pop(url, None)
+            else:
+                manifest[url] = entry
+
+        current = {page.url for page in pages}
+        removed = [url for url in previous if url not in current]
+        for url in removed:
+            static_export.remove_page(root, previous[url])
+
+        static_export.save_manifest(root, manifest)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {len(stale) - len(failures)} of {len(pages)} pages, removed {len(removed)}"
+                f" in {time.perf_counter() - started:.1f}s -> {root}"
+            )
+        )
+        if failures:
+            raise CommandError("Some pages failed to render:\n  " + "\n  ".join(failures))
+
+    def _render_all(self, jobs_list, jobs):
+        if not jobs_list:
+            return []
+        if jobs <= 1 or len(jobs_list) == 1:
+            _setup_client()
+            return map(_render, jobs_list)
+        # Spawned workers each set up Django and render their share; the
+        # parent only collects manifest entries.
+        executor = ProcessPoolExecutor(
+            max_workers=min(jobs, len(jobs_list)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        with executor:
+            return list(executor.map(_render, jobs_list, chunksize=max(1, len(jobs_list) // (jobs * 4))))
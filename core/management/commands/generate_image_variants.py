@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.models import EditorMedia, PressRelease
+from core.page_cache import bump_content_generation
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP variants for PressRelease images and editor uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants even when they are already up to date.",
+        )
+
+    def handle(self, *args, force=False, **options):
+        for model in (PressRelease, EditorMedia):
+            field = model.image_field_name
+            qs = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            done = total = 0
+            for obj in qs.order_by("pk").iterator(chunk_size=100):
+                total += 1
+                if obj.refresh_image_variants(force=force):
+                    model.objects.filter(pk=obj.pk).update(image_variants=obj.image_variants)
+                    done += 1
+            self.stdout.write(f"{model.__name__}: generated variants for {done} of {total}")
+            if done:
+                bump_content_generation()
+        self.stdout.write(self.style.SUCCESS("Done."))
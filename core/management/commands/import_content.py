@@ -0,0 +1,56 @@
+"""Upsert site content from a JSON Lines file (see ``core.content_io``)."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import content_io, search
+from core.management.commands.export_content import open_text
+from core.page_cache import bump_content_generation
+
+# Rows of these models feed the search index.
+INDEXED = {"core.pressrelease", "core.dynamicpage", "core.editableelement"}
+
+
+class Command(BaseCommand):
+    help = "Import JSON Lines written by export_content, upserting in chunks with bulk_create."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File to read (.gz is decompressed), or - for stdin.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=content_io.DEFAULT_CHUNK_SIZE,
+            help="Rows written per bulk_create, each in its own transaction.",
+        )
+
+    def handle(self, *args, input, chunk_size, **options):
+        def progress(importer):
+            self.stdout.write(f"  {importer.total} rows ({importer.rate:,.0f} rows/s)")
+
+        importer = content_io.Importer(chunk_size=chunk_size, on_progress=progress)
+        source, close = open_text(input, "r")
+        try:
+            for number, line in enumerate(source, 1):
+                importer.feed(line, number)
+            importer.flush()
+        except content_io.ContentImportError as e:
+            raise CommandError(f"{e} ({importer.total} rows already imported)")
+        finally:
+            if close:
+                source.close()
+            # Chunks commit one by one, so this runs after a failed import too.
+            # bulk_create sends no signals: rebuild the index and invalidate once.
+            if INDEXED & set(importer.counts):
+                with transaction.atomic():
+                    search.rebuild()
+            if importer.counts:
+                bump_content_generation()
+
+        for label, count in importer.counts.items():
+            self.stdout.write(f"  {label}: {count} rows")
+        elapsed = time.perf_counter() - importer.started
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {importer.total} rows in {elapsed:.1f}s ({importer.rate:,.0f} rows/s).")
+        )
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+from core.editor_html import looks_like_html, normalize
+from core.models import EditableElement, PressRelease
+from core.page_cache import bump_content_generation
+
+
+def _size(value: str) -> int:
+    return len((value or "").encode("utf-8"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-normalize stored editor HTML (see core.editor_html): every EditableElement and the"
+        " PressRelease text fields that hold HTML rather than Markdown."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving.")
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, dry_run=False, batch_size=200, **options):
+        post_fields = [*PressRelease.MARKDOWN_FIELDS, *(f"{f}_html" for f in PressRelease.MARKDOWN_FIELDS)]
+        element_keys, post_ids = [], []
+        before = after = 0
+
+        def flush(model, batch, fields):
+            if batch and not dry_run:
+                model.objects.bulk_update(batch, fields)
+            batch.clear()
+
+        with transaction.atomic():
+            batch = []
+            for el in EditableElement.objects.order_by("pk").iterator(chunk_size=batch_size):
+                cleaned = normalize(el.content)
+                if cleaned != el.content:
+                    before, after = before + _size(el.content), after + _size(cleaned)
+                    el.content = cleaned
+                    batch.append(el)
+                    element_keys.append(el.key)
+                if len(batch) >= batch_size:
+                    flush(EditableElement, batch, ["content"])
+            flush(EditableElement, batch, ["content"])
+
+            for post in PressRelease.objects.order_by("pk").iterator(chunk_size=batch_size):
+                changed = False
+                for field in PressRelease.MARKDOWN_FIELDS:
+                    value = getattr(post, field)
+                    if not looks_like_html(value):
+                        continue
+                    cleaned = normalize(value)
+                    if cleaned != value:
+                        before, after = before + _size(value), after + _size(cleaned)
+                        setattr(post, field, cleaned)
+                        changed = True
+                if changed:
+                    post.render_markdown_fields()
+                    batch.append(post)
+                    post_ids.append(post.pk)
+                if len(batch) >= batch_size:
+                    flush(PressRelease, batch, [*post_fields, "markdown_hash"])
+            flush(PressRelease, batch, [*post_fields, "markdown_hash"])
+
+            # bulk_update sends no signals: reindex and invalidate once.
+            if not dry_run and (element_keys or post_ids):
+                search.reindex_editable_keys(element_keys)
+                for post in PressRelease.objects.filter(pk__in=post_ids):
+                    search.index_post(post)
+                transaction.on_commit(bump_content_generation)
+
+        verb = "Would normalize" if dry_run else "Normalized"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(element_keys)} editable elements and {len(post_ids)} press releases,"
+                f" saving {before - after} bytes ({before} -> {after})."
+            )
+        )
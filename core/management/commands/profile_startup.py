@@ -0,0 +1,157 @@
+"""Cold-start profile: import time per module and time to first response.
+
+Each run starts a fresh interpreter under ``python -X importtime`` that
+imports the WSGI application and the URLconf with the views (``boot``),
+optionally runs the gunicorn preload warm-up (``core.startup.warm``), then
+sends one request per path through the application. Two modes are measured: ``cold`` is a worker
+loading the application itself, ``preload`` is one forked from a warmed
+master (its first responses are timed after the warm-up). Every run gets an
+empty page cache, so first responses really render.
+
+Results are written as JSON; ``--baseline`` compares against an earlier run
+and fails the command on regressions, including a heavy dependency
+(``core.startup.HEAVY_MODULES``) that is now imported at boot.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+# Runs in the fresh interpreter; argv: mode, heavy modules (JSON), paths...
+_CHILD = """
+import io, json, sys, time
+started = time.perf_counter()
+from nomashae_site.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+booted = time.perf_counter()
+mode, heavy, paths = sys.argv[1], json.loads(sys.argv[2]), sys.argv[3:]
+report = {"boot_ms": (booted - started) * 1000, "heavy_at_boot": [m for m in heavy if m in sys.modules]}
+print("profile_startup: request phase", file=sys.stderr, flush=True)
+if mode == "preload":
+    from core.startup import warm
+    warm()
+    report["warm_ms"] = (time.perf_counter() - booted) * 1000
+from wsgiref.util import setup_testing_defaults
+report["first_response_ms"], report["status"] = {}, {}
+for path in paths:
+    environ = {"PATH_INFO": path, "HTTP_HOST": "localhost", "SERVER_NAME": "localhost", "wsgi.input": io.BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+    start = time.perf_counter()
+    response = application(environ, lambda s, h, exc_info=None: status.append(s))
+    b"".join(response)
+    report["first_response_ms"][path] = (time.perf_counter() - start) * 1000
+    report["status"][path] = status[0]
+print(json.dumps(report))
+"""
+
+MODES = ("cold", "preload")
+
+
+def _run(mode: str, paths: list, env: dict) -> tuple:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, mode, json.dumps(startup.HEAVY_MODULES), *paths],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise CommandError(f"{mode} run failed:\n{completed.stderr[-2000:]}")
+    boot_lines = completed.stderr.split("profile_startup: request phase", 1)[0].splitlines()
+    return json.loads(completed.stdout.splitlines()[-1]), startup.parse_importtime(boot_lines)
+
+
+class Command(BaseCommand):
+    help = "Measure import time per module and time to first response of a fresh worker; compare against a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paths", default="/,/blog/,/culture/", help="Comma-separated paths to request.")
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode; medians are reported.")
+        parser.add_argument("--top", type=int, default=15, help="Modules and packages to list.")
+        parser.add_argument("--output", default=None, help="Write results as JSON to this file.")
+        parser.add_argument("--baseline", default=None, help="Earlier --output file to compare against.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        paths = [p.strip() for p in options["paths"].split(",") if p.strip()]
+        results, imports = [], []
+        for mode in MODES:
+            reports, module_runs = [], []
+            for _ in range(options["runs"]):
+                with tempfile.TemporaryDirectory() as cache_dir:
+                    env = {
+                        **os.environ,
+                        "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "nomashae_site.settings"),
+                        "DJANGO_CACHE_DIR": cache_dir,
+                    }
+                    report, modules = _run(mode, paths, env)
+                reports.append(report)
+                module_runs.append(modules)
+            failed = {p: s for p, s in reports[-1]["status"].items() if not s.startswith("200")}
+            if failed:
+                raise CommandError(f"Non-200 responses: {failed}")
+
+            row = {
+                "mode": mode,
+                "boot_ms": startup.median_ms([r["boot_ms"] for r in reports]),
+                "warm_ms": startup.median_ms([r["warm_ms"] for r in reports]) if mode == "preload" else None,
+                "first_response_ms": {
+                    path: startup.median_ms([r["first_response_ms"][path] for r in reports]) for path in paths
+                },
+                "heavy_at_boot": reports[-1]["heavy_at_boot"],
+            }
+            results.append(row)
+            if mode == "cold":
+                # Import times are the same in both modes; keep the median run's.
+                imports = sorted(module_runs, key=lambda m: sum(s for _, s, _ in m))[len(module_runs) // 2]
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{mode}: boot {row['boot_ms']:.1f}ms"))
+            if row["warm_ms"] is not None:
+                self.stdout.write(f"  warm-up in the master: {row['warm_ms']:.1f}ms")
+            for path, ms in row["first_response_ms"].items():
+                self.stdout.write(f"  first response {path:<20} {ms:8.1f}ms")
+            if row["heavy_at_boot"]:
+                self.stdout.write(self.style.WARNING(f"  imported at boot: {', '.join(row['heavy_at_boot'])}"))
+
+        top = options["top"]
+        self.stdout.write(self.style.MIGRATE_HEADING("Import time at boot by package (self)"))
+        for package, us in list(startup.by_package(imports).items())[:top]:
+            self.stdout.write(f"  {package:<32} {us / 1000:8.1f}ms")
+        self.stdout.write(self.style.MIGRATE_HEADING("Slowest modules at boot (self / cumulative)"))
+        for name, self_us, cumulative_us in sorted(imports, key=lambda m: -m[1])[:top]:
+            self.stdout.write(f"  {name:<48} {self_us / 1000:8.1f}ms {cumulative_us / 1000:8.1f}ms")
+
+        run = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "platform": platform.platform(),
+                "runs": options["runs"],
+            },
+            "results": results,
+            "imports": [{"module": n, "self_us": s, "cumulative_us": c} for n, s, c in imports],
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(run, indent=2), encoding="utf-8")
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+            regressions = startup.compare(results, baseline["results"], options["threshold"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import PressRelease
+from core.page_cache import bump_content_generation
+
+
+class Command(BaseCommand):
+    help = "Re-render the stored Markdown HTML for every PressRelease."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render even when the stored content hash is current.",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, force=False, batch_size=200, **options):
+        fields = [f"{f}_html" for f in PressRelease.MARKDOWN_FIELDS] + ["markdown_hash"]
+        batch, rendered, total = [], 0, 0
+
+        with transaction.atomic():
+            for pr in PressRelease.objects.order_by("pk").iterator(chunk_size=batch_size):
+                total += 1
+                if pr.render_markdown_fields(force=force):
+                    batch.append(pr)
+                if len(batch) >= batch_size:
+                    PressRelease.objects.bulk_update(batch, fields)
+                    rendered += len(batch)
+                    batch = []
+            if batch:
+                PressRelease.objects.bulk_update(batch, fields)
+                rendered += len(batch)
+            if rendered:
+                # bulk_update sends no signals: invalidate the cached pages once.
+                transaction.on_commit(bump_content_generation)
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} of {total} press releases."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+from core.page_cache import bump_content_generation
+
+
+class Command(BaseCommand):
+    help = "Repopulate the full-text search index from every post and page."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = search.rebuild()
+        bump_content_generation()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} posts and pages."))
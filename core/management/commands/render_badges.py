@@ -0,0 +1,78 @@
+"""Pre-render every citizenship badge image (see ``core.badges``)."""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Spawned workers import this module before Django is set up, so nothing
+# that touches models is imported at module level.
+BATCH_SIZE = 50
+
+
+def _init_worker():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nomashae_site.settings")
+    django.setup()
+
+
+def _render_batch(job):
+    from core import badges
+    from core.models import CitizenshipBadge
+
+    pks, formats, force = job
+    rendered = 0
+    for badge in CitizenshipBadge.objects.filter(pk__in=pks):
+        paths = {fmt: badges.cache_path(badges.render_key(badge), fmt) for fmt in formats}
+        if force or not all(path.exists() for path in paths.values()):
+            badges.render_cached(badge, formats, force=force)
+            rendered += 1
+    return rendered
+
+
+class Command(BaseCommand):
+    help = "Render every citizenship badge to the on-disk cache, in parallel across processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Render processes.")
+        parser.add_argument("--formats", default="png,webp", help="Comma-separated: png, webp.")
+        parser.add_argument("--force", action="store_true", help="Redraw badges that are already cached.")
+        parser.add_argument("--prune", action="store_true", help="Delete cached images of changed or deleted badges.")
+
+    def handle(self, *args, jobs, formats, force, prune, **options):
+        from core import badges
+        from core.models import CitizenshipBadge
+
+        formats = tuple(f.strip() for f in formats.split(",") if f.strip())
+        unknown = [f for f in formats if f not in badges.FORMATS]
+        if unknown or not formats:
+            raise CommandError(f"Unknown format(s): {', '.join(unknown) or '(none)'}")
+
+        started = time.perf_counter()
+        pks = list(CitizenshipBadge.objects.order_by("pk").values_list("pk", flat=True))
+        batches = [(pks[i : i + BATCH_SIZE], formats, force) for i in range(0, len(pks), BATCH_SIZE)]
+        if jobs <= 1 or len(batches) <= 1:
+            rendered = sum(map(_render_batch, batches))
+        else:
+            # Each worker loads the fonts and artwork once and draws its share.
+            executor = ProcessPoolExecutor(
+                max_workers=min(jobs, len(batches)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            with executor:
+                rendered = sum(executor.map(_render_batch, batches))
+
+        removed = 0
+        if prune:
+            removed = badges.prune({badges.render_key(badge) for badge in CitizenshipBadge.objects.iterator()})
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {rendered} of {len(pks)} badges, pruned {removed} files"
+                f" in {time.perf_counter() - started:.1f}s"
+            )
+        )
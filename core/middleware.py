@@ -0,0 +1,48 @@
+"""WhiteNoise for the ASGI deployment.
+
+WhiteNoise's middleware is sync-only, and Django runs everything below a
+sync-only middleware synchronously: under ASGI every later middleware and
+every async view would be pushed onto a thread. This subclass serves static
+files the same way but passes other requests on without leaving the event
+loop.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opening the file and stat-ing its alternatives touches the disk.
+            response = await sync_to_async(self.serve)(static_file, request)
+            if response.file_to_stream is not None:
+                response.streaming_content = _read_blocks(response.file_to_stream, response.block_size)
+            return response
+        return await self.get_response(request)
+
+
+async def _read_blocks(filelike, block_size: int):
+    # An async iterator, so Django's ASGI handler needn't drain a sync one.
+    read = sync_to_async(filelike.read, thread_sensitive=False)
+    while block := await read(block_size):
+        yield block
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_editormedia"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pressrelease",
+            name="body_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="pressrelease",
+            name="footer_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="pressrelease",
+            name="header_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="pressrelease",
+            name="markdown_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
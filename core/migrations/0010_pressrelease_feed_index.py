@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_pressrelease_rendered_markdown"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="pressrelease",
+            options={"ordering": ["-is_pinned", "-published_at", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="pressrelease",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-is_pinned", "-published_at", "id"],
+                name="pressrelease_feed_idx",
+            ),
+        ),
+    ]
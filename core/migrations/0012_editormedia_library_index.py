@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="editormedia",
+            options={"ordering": ["-uploaded_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="editormedia",
+            index=models.Index(fields=["-uploaded_at", "-id"], name="editormedia_library_idx"),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from html import unescape
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+def build_index(apps, schema_editor):
+    PressRelease = apps.get_model("core", "PressRelease")
+    DynamicPage = apps.get_model("core", "DynamicPage")
+    EditableElement = apps.get_model("core", "EditableElement")
+
+    def text(html):
+        return " ".join(unescape(strip_tags(html or "")).split())
+
+    rows = []
+    for post in PressRelease.objects.iterator():
+        body = " ".join(
+            text(getattr(post, f"{field}_html") or getattr(post, field)) for field in ("header", "body", "footer")
+        )
+        rows.append(("post", post.pk, int(post.is_published), post.title, body))
+    stored = dict(EditableElement.objects.filter(key__startswith="page_").values_list("key", "content"))
+    for page in DynamicPage.objects.iterator():
+        title = text(stored.get(f"page_{page.slug}_title")) or page.title
+        body = text(stored.get(f"page_{page.slug}_content"))
+        rows.append(("page", page.pk, int(page.is_published), title, body))
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO core_search_index (kind, object_id, published, title, body) VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_editormedia_library_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE VIRTUAL TABLE core_search_index USING fts5(
+                    kind UNINDEXED,
+                    object_id UNINDEXED,
+                    published UNINDEXED,
+                    title,
+                    body,
+                    tokenize = 'porter unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """,
+            reverse_sql="DROP TABLE core_search_index",
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
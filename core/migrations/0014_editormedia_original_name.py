@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="editormedia",
+            name="original_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
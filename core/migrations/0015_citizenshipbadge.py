@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_editormedia_original_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CitizenshipBadge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("username", models.CharField(max_length=50)),
+                (
+                    "origin",
+                    models.CharField(
+                        choices=[
+                            ("Eastern Air Temple", "Eastern Air Temple"),
+                            ("Western Air Temple", "Western Air Temple"),
+                            ("Northern Air Temple", "Northern Air Temple"),
+                            ("Southern Air Temple", "Southern Air Temple"),
+                            ("Northern Water Tribe", "Northern Water Tribe"),
+                            ("Southern Water Tribe", "Southern Water Tribe"),
+                            ("Earth Kingdom", "Earth Kingdom"),
+                            ("Fire Nation", "Fire Nation"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("color1_hex", models.CharField(max_length=7)),
+                ("color2_hex", models.CharField(max_length=7)),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.text.Lower("username"),
+                        name="unique_citizenship_username_ci",
+                    )
+                ],
+            },
+        ),
+    ]
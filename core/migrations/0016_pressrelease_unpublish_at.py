@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_citizenshipbadge"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pressrelease",
+            name="unpublish_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
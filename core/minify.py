@@ -0,0 +1,104 @@
+"""Conservative CSS and JavaScript minifiers for the site's own static files.
+
+Both only remove what can never change behavior: comments, indentation,
+blank lines and (in CSS) whitespace next to punctuation. JavaScript keeps
+its line breaks, so automatic semicolon insertion sees the same code, and
+string, template and regex literals are copied untouched. That leaves some
+bytes on the table compared to a real minifier, but gzip/brotli recover most
+of the difference and nothing can break.
+"""
+
+import re
+
+_CSS_TOKENS = re.compile(r"""("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')|/\*.*?\*/""", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+# A space before ":" is kept; in a selector it means a descendant.
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*|:\s+")
+
+# After one of these a "/" starts a regex literal rather than a division.
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+
+
+def minify_css(source: str) -> str:
+    strings = []
+
+    def stash(match):
+        if not match.group(1):
+            return ""  # a comment
+        strings.append(match.group(1))
+        return f"\0{len(strings) - 1}\0"
+
+    text = _CSS_TOKENS.sub(stash, source)
+    text = _CSS_SPACE.sub(" ", text)
+    text = _CSS_PUNCT.sub(lambda m: m.group(1) or ":", text).replace(";}", "}").strip()
+    return re.sub(r"\0(\d+)\0", lambda m: strings[int(m.group(1))], text)
+
+
+def minify_js(source: str) -> str:
+    lines = []
+    line = []
+    starts_in_code = True
+    last = ""  # last significant character outside literals
+    i, n = 0, len(source)
+
+    def end_line(ends_in_code):
+        nonlocal line, starts_in_code
+        text = "".join(line)
+        if starts_in_code:
+            text = text.lstrip()
+        if ends_in_code:
+            text = text.rstrip()
+        if text or not (starts_in_code and ends_in_code):
+            lines.append(text)
+        line = []
+        starts_in_code = ends_in_code
+
+    while i < n:
+        c = source[i]
+        nxt = source[i + 1] if i + 1 < n else ""
+        if c == "\n":
+            end_line(True)
+            i += 1
+        elif c == "/" and nxt == "/":
+            while i < n and source[i] != "\n":
+                i += 1
+        elif c == "/" and nxt == "*":
+            end = source.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            if "\n" in source[i:end]:
+                end_line(True)
+            else:
+                line.append(" ")
+            i = end
+        elif c in "'\"`" or (c == "/" and (not last or last in _REGEX_PRECEDERS)):
+            # Copy the literal verbatim, up to its unescaped closing quote.
+            closing = c
+            in_class = False
+            line.append(c)
+            i += 1
+            while i < n:
+                c = source[i]
+                if c == "\\":
+                    line.append(source[i : i + 2])
+                    i += 2
+                    continue
+                if c == "\n":
+                    if closing != "`":
+                        break  # unterminated; let the browser complain
+                    end_line(False)
+                    i += 1
+                    continue
+                line.append(c)
+                i += 1
+                if closing == "/" and c in "[]":
+                    in_class = c == "["
+                elif c == closing and not in_class:
+                    break
+            last = "a"
+        else:
+            line.append(c)
+            if not c.isspace():
+                last = c
+            i += 1
+    end_line(True)
+    return "\n".join(lines)
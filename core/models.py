@@ -3,26 +3,124 @@ from django.db.models import UniqueConstraint
 from django.db.models.functions import Lower
 from django.utils import timezone
 
+from .images import delete_variants, generate_variants
+from .rendering import markdown_signature, markdown_to_html
 
 
+class ImageVariantsMixin(models.Model):
+    """Keeps resized WebP variants of an image/file field (see core.images)."""
 
-class PressRelease(models.Model):
+    image_field_name = "image"
+
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def refresh_image_variants(self, force: bool = False) -> bool:
+        """Regenerate the variants if the source file changed.
+
+        Returns True when image_variants was updated.
+        """
+
+        field_file = getattr(self, self.image_field_name)
+        source = field_file.name if field_file else ""
+        if not force and (self.image_variants or {}).get("source", "") == source:
+            return False
+        delete_variants(self.image_variants, field_file.storage)
+        self.image_variants = generate_variants(field_file) if field_file else {}
+        if source and not self.image_variants:
+            # Not an image; remember the source so we don't retry on every save.
+            self.image_variants = {"source": source, "variants": []}
+        return True
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or self.image_field_name in update_fields:
+            if self.refresh_image_variants():
+                super().save(update_fields=["image_variants"])
+
+
+class PressReleaseQuerySet(models.QuerySet):
+    def visible(self, now=None):
+        """Published posts whose publish window includes ``now``."""
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(unpublish_at__isnull=True) | models.Q(unpublish_at__gt=now),
+            is_published=True,
+            published_at__lte=now,
+        )
+
+
+class PressRelease(ImageVariantsMixin, models.Model):
     title = models.CharField(max_length=200)
     header = models.TextField(blank=True)
     body = models.TextField()
     footer = models.TextField(blank=True)
     image = models.ImageField(upload_to="decrees/", blank=True, null=True)
+    # A post is shown from published_at (which may be in the future) until
+    # unpublish_at, if set; see core.scheduling.
     published_at = models.DateTimeField(default=timezone.now)
+    unpublish_at = models.DateTimeField(blank=True, null=True)
     is_published = models.BooleanField(default=True)
     is_pinned = models.BooleanField(default=False)
     highlight = models.BooleanField(default=False)
 
+    # Markdown fields pre-rendered on save; see render_markdown_fields().
+    header_html = models.TextField(blank=True, editable=False)
+    body_html = models.TextField(blank=True, editable=False)
+    footer_html = models.TextField(blank=True, editable=False)
+    markdown_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    MARKDOWN_FIELDS = ("header", "body", "footer")
+
+    objects = PressReleaseQuerySet.as_manager()
+
     class Meta:
-        ordering = ["-is_pinned", "-published_at"]
+        # "id" breaks ties so the blog feed can paginate by keyset.
+        ordering = ["-is_pinned", "-published_at", "id"]
+        indexes = [
+            # Partial on is_published: SQLite compares booleans as a bare
+            # column, which can match a partial index but not a leading key.
+            models.Index(
+                fields=["-is_pinned", "-published_at", "id"],
+                condition=models.Q(is_published=True),
+                name="pressrelease_feed_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.title
 
+    def current_markdown_hash(self) -> str:
+        return markdown_signature(*(getattr(self, f) or "" for f in self.MARKDOWN_FIELDS))
+
+    def render_markdown_fields(self, force: bool = False) -> bool:
+        """Refresh the stored *_html fields if the sources changed.
+
+        Returns True when anything was re-rendered.
+        """
+
+        digest = self.current_markdown_hash()
+        if not force and digest == self.markdown_hash:
+            return False
+        for field in self.MARKDOWN_FIELDS:
+            setattr(self, f"{field}_html", markdown_to_html(getattr(self, field)))
+        self.markdown_hash = digest
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.MARKDOWN_FIELDS):
+            if self.render_markdown_fields() and update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    *(f"{f}_html" for f in self.MARKDOWN_FIELDS),
+                    "markdown_hash",
+                }
+        super().save(*args, **kwargs)
+
 
 class HomeCard(models.Model):
     title = models.CharField(max_length=200)
@@ -57,6 +155,38 @@ class TabSettings(models.Model):
 
 
 
+class CitizenshipBadge(models.Model):
+    """A citizen's badge; the image is rendered from these fields (see core.badges)."""
+
+    ORIGIN_CHOICES = [
+        ("Eastern Air Temple", "Eastern Air Temple"),
+        ("Western Air Temple", "Western Air Temple"),
+        ("Northern Air Temple", "Northern Air Temple"),
+        ("Southern Air Temple", "Southern Air Temple"),
+        ("Northern Water Tribe", "Northern Water Tribe"),
+        ("Southern Water Tribe", "Southern Water Tribe"),
+        ("Earth Kingdom", "Earth Kingdom"),
+        ("Fire Nation", "Fire Nation"),
+    ]
+
+    username = models.CharField(max_length=50)
+    origin = models.CharField(max_length=50, choices=ORIGIN_CHOICES)
+    color1_hex = models.CharField(max_length=7)
+    color2_hex = models.CharField(max_length=7)
+    # Extra drawing parameters, e.g. the seed of the background pattern.
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            UniqueConstraint(Lower("username"), name="unique_citizenship_username_ci"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.username} ({self.origin})"
+
+
 class DynamicPage(models.Model):
     """Dynamically generated web pages editable from the frontend."""
     slug = models.SlugField(unique=True)
@@ -71,13 +201,20 @@ class DynamicPage(models.Model):
         return f"{self.title} (/{self.slug}/)"
 
 
-class EditorMedia(models.Model):
+class EditorMedia(ImageVariantsMixin, models.Model):
     """Stores files inline-uploaded via the rich text editor."""
+    image_field_name = "file"
+
     file = models.FileField(upload_to="editor_uploads/")
+    # Files are stored under their content hash; this is what the user called it.
+    original_name = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ["-uploaded_at"]
+        ordering = ["-uploaded_at", "-id"]
+        indexes = [
+            models.Index(fields=["-uploaded_at", "-id"], name="editormedia_library_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.file.name
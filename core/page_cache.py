@@ -0,0 +1,299 @@
+"""Full-page cache for anonymous visitors.
+
+Content only changes when staff save something, so every write to a ``core``
+content model replaces a site-wide generation token (see ``core.signals``;
+citizenship badges, created by visitors, have a generation of their own). Cached
+pages remember the generation they were rendered at; an entry from an older
+generation is still served while a request re-renders it. The render lock is
+a ``cache.add()``, which FileBasedCache doesn't make atomic across processes,
+so now and then two workers render the same page; that costs time, not
+correctness.
+
+A generation is an opaque token (``time.time_ns()``), not a counter: the
+file cache culls keys at random once it is full, and a counter recreated at
+1 would make entries rendered before an edit look current again. A new
+token matches no stored entry. Entries are also kept at most
+``PUBLIC_PAGE_CACHE_TIMEOUT`` seconds.
+
+``cache_public_page`` wraps sync and async views alike; async views use the
+cache's async API. FileBasedCache implements that with ``sync_to_async``, so
+every lookup, hit or miss, still runs on a thread from the sync pool. Views
+that list blog posts pass ``scheduled=True``: their entries also expire at
+the next scheduled publish or unpublish time (see ``core.scheduling``) and
+are never served past it.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+GENERATION_KEY = "core:content-generation"
+PAGE_KEY_PREFIX = "core:page:"
+# How long a stale entry may keep being served if the re-render never finishes.
+RENDER_LOCK_TIMEOUT = 30
+
+
+def _new_token() -> int:
+    return time.time_ns()
+
+
+def generation(key: str = GENERATION_KEY) -> int:
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _new_token(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+async def ageneration(key: str = GENERATION_KEY) -> int:
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, _new_token(), timeout=None)
+        value = await cache.aget(key)
+    return value
+
+
+def bump_generation(key: str = GENERATION_KEY) -> None:
+    cache.set(key, _new_token(), timeout=None)
+
+
+def content_generation() -> int:
+    return generation(GENERATION_KEY)
+
+
+async def acontent_generation() -> int:
+    return await ageneration(GENERATION_KEY)
+
+
+def bump_content_generation() -> None:
+    bump_generation(GENERATION_KEY)
+
+
+class GenerationMemo:
+    """Per-worker memo of ``key -> (generation, value)`` entries.
+
+    Keys can come from URLs, so at most ``size`` are kept and the least
+    recently used go first.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> "tuple | None":
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def __setitem__(self, key, entry: tuple) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _is_cacheable_request(request) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    user = getattr(request, "user", None)
+    return not (user and user.is_authenticated and user.is_staff)
+
+
+async def _ais_cacheable_request(request) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    user = await request.auser() if hasattr(request, "auser") else None
+    return not (user and user.is_authenticated and user.is_staff)
+
+
+def _page_key(request, query_params) -> str:
+    # Scheme and host too: feeds contain absolute URLs, and ALLOWED_HOSTS has several.
+    # Only parameters the view reads: anything else (?utm_source=, random
+    # cache busters) would otherwise make a new entry for the same page.
+    params = urlencode(sorted((name, value) for name, value in request.GET.items() if name in query_params))
+    url = f"{request.build_absolute_uri(request.path)}?{params}"
+    return PAGE_KEY_PREFIX + hashlib.md5(url.encode("utf-8")).hexdigest()
+
+
+def _is_storable(response) -> bool:
+    return response.status_code == 200 and not response.cookies and not response.streaming
+
+
+def _expires_at(scheduled: bool) -> "float | None":
+    if not scheduled:
+        return None
+    from .scheduling import next_change
+
+    change = next_change()
+    return change.timestamp() if change else None
+
+
+async def _aexpires_at(scheduled: bool) -> "float | None":
+    if not scheduled:
+        return None
+    from .scheduling import anext_change
+
+    change = await anext_change()
+    return change.timestamp() if change else None
+
+
+def _unexpired(entry):
+    # Past a scheduled change the page is wrong, so it isn't even served stale.
+    if entry is not None and entry.get("expires") is not None and time.time() >= entry["expires"]:
+        return None
+    return entry
+
+
+def _timeout(entry) -> float:
+    timeout = settings.PUBLIC_PAGE_CACHE_TIMEOUT
+    if entry["expires"] is not None:
+        timeout = min(timeout, entry["expires"] - time.time())
+    return timeout
+
+
+def _entry(response, generation: int, previous, scheduled: bool = False, expires: "float | None" = None) -> dict:
+    content = response.content
+    etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+    if previous and previous["etag"] == etag:
+        last_modified = previous["last_modified"]
+    else:
+        last_modified = int(time.time())
+    return {
+        "generation": generation,
+        "content": content,
+        "content_type": response["Content-Type"],
+        "etag": etag,
+        "last_modified": last_modified,
+        "scheduled": scheduled,
+        "expires": expires,
+    }
+
+
+def _response_from_entry(request, entry) -> HttpResponse:
+    response = HttpResponse(entry["content"], content_type=entry["content_type"])
+    response["ETag"] = entry["etag"]
+    response["Last-Modified"] = http_date(entry["last_modified"])
+    if entry.get("scheduled"):
+        # Browsers may keep the page until it next changes on schedule (staff
+        # edits show up within PUBLIC_PAGE_MAX_AGE). Logging in sets the
+        # session cookie, so staff never get the anonymous copy.
+        max_age = settings.PUBLIC_PAGE_MAX_AGE
+        if entry["expires"] is not None:
+            max_age = min(max_age, int(entry["expires"] - time.time()))
+        patch_cache_control(response, public=True, max_age=max(0, max_age))
+        patch_vary_headers(response, ["Cookie"])
+    else:
+        # Browsers must revalidate so staff who log in never see the anonymous copy.
+        patch_cache_control(response, no_cache=True)
+    return get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=entry["last_modified"],
+        response=response,
+    )
+
+
+def cache_public_page(view_func=None, *, scheduled: bool = False, query_params: tuple = ()):
+    """Serve ``view_func`` from the page cache for non-staff GET/HEAD requests.
+
+    Use ``@cache_public_page(scheduled=True)`` for views whose output depends
+    on which posts are visible right now. ``query_params`` names the query
+    string parameters the view reads; others don't change the cache key.
+    """
+
+    if view_func is None:
+        return partial(cache_public_page, scheduled=scheduled, query_params=query_params)
+    if iscoroutinefunction(view_func):
+        return _acache_public_page(view_func, scheduled, query_params)
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if not _is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = _page_key(request, query_params)
+        generation = content_generation()
+        expires = _expires_at(scheduled)
+        entry = _unexpired(cache.get(key))
+
+        if entry is not None and entry["generation"] == generation:
+            return _response_from_entry(request, entry)
+
+        lock_key = key + ":lock"
+        locked = False
+        if entry is not None:
+            # Stale: the request that wins the lock re-renders, the others get the old copy.
+            locked = cache.add(lock_key, 1, timeout=RENDER_LOCK_TIMEOUT)
+            if not locked:
+                return _response_from_entry(request, entry)
+        try:
+            response = view_func(request, *args, **kwargs)
+            if not _is_storable(response):
+                return response
+            if hasattr(response, "render"):
+                response = response.render()
+            entry = _entry(response, generation, entry, scheduled, expires)
+            timeout = _timeout(entry)
+            if timeout > 0:
+                cache.set(key, entry, timeout=timeout)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+        return _response_from_entry(request, entry)
+
+    return _wrapped
+
+
+def _acache_public_page(view_func, scheduled: bool, query_params: tuple):
+    @wraps(view_func)
+    async def _wrapped(request, *args, **kwargs):
+        if not await _ais_cacheable_request(request):
+            return await view_func(request, *args, **kwargs)
+
+        key = _page_key(request, query_params)
+        generation = await acontent_generation()
+        expires = await _aexpires_at(scheduled)
+        entry = _unexpired(await cache.aget(key))
+
+        if entry is not None and entry["generation"] == generation:
+            return _response_from_entry(request, entry)
+
+        lock_key = key + ":lock"
+        locked = False
+        if entry is not None:
+            locked = await cache.aadd(lock_key, 1, timeout=RENDER_LOCK_TIMEOUT)
+            if not locked:
+                return _response_from_entry(request, entry)
+        try:
+            response = await view_func(request, *args, **kwargs)
+            if not _is_storable(response):
+                return response
+            entry = _entry(response, generation, entry, scheduled, expires)
+            timeout = _timeout(entry)
+            if timeout > 0:
+                await cache.aset(key, entry, timeout=timeout)
+        finally:
+            if locked:
+                await cache.adelete(lock_key)
+
+        return _response_from_entry(request, entry)
+
+    return _wrapped
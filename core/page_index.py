@@ -0,0 +1,89 @@
+"""In-process index of published DynamicPage slugs.
+
+``<slug:slug>/`` is the last URL pattern, so every unknown path that looks
+like a slug (``/wp-admin/``, ``/.env/``...) ends up in ``dynamic_page``. The
+index answers those from memory: each worker loads all published pages and
+their ``page_<slug>`` TabSettings in two queries, and reloads them only when
+the content generation changes (any write to ``core`` content, see
+``core.page_cache``). Unknown slugs are recorded as misses in the metrics.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from .favicons import TabMeta, meta_from_settings, remember_tab_meta
+from .page_cache import acontent_generation, content_generation
+
+
+@dataclass(frozen=True)
+class PageRecord:
+    """What rendering a dynamic page needs, without loading the model."""
+
+    pk: int
+    slug: str
+    title: str
+    tab: "TabMeta | None"
+
+    @property
+    def tab_slug(self) -> str:
+        return f"page_{self.slug}"
+
+
+_lock = threading.Lock()
+# (content generation, {slug: PageRecord}) or None before the first load
+_index = None
+
+
+def _querysets():
+    from .models import DynamicPage, TabSettings
+
+    return (
+        TabSettings.objects.filter(slug__startswith="page_"),
+        DynamicPage.objects.filter(is_published=True).values_list("pk", "slug", "title"),
+    )
+
+
+def _build(generation: int, tab_settings, rows) -> dict:
+    tabs = {obj.slug: meta_from_settings(obj) for obj in tab_settings}
+    records = {
+        slug: PageRecord(pk=pk, slug=slug, title=title, tab=tabs.get(f"page_{slug}")) for pk, slug, title in rows
+    }
+    # The favicon view looks these up by tab slug; it needn't query again.
+    remember_tab_meta(generation, {record.tab_slug: record.tab for record in records.values()})
+    return records
+
+
+def pages() -> dict:
+    """{slug: PageRecord} for every published page, current as of this generation."""
+    global _index
+    generation = content_generation()
+    index = _index
+    if index is not None and index[0] == generation:
+        return index[1]
+    with _lock:
+        if _index is None or _index[0] != generation:
+            tab_settings, rows = _querysets()
+            _index = (generation, _build(generation, list(tab_settings), list(rows)))
+        return _index[1]
+
+
+async def apages() -> dict:
+    """``pages()`` for async views, loading through the async ORM."""
+    global _index
+    generation = await acontent_generation()
+    index = _index
+    if index is not None and index[0] == generation:
+        return index[1]
+    tab_settings, rows = _querysets()
+    # Two requests may both rebuild after a change; the results are equal.
+    records = _build(generation, [obj async for obj in tab_settings], [row async for row in rows])
+    _index = (generation, records)
+    return records
+
+
+def lookup(slug: str) -> "PageRecord | None":
+    return pages().get(slug)
+
+
+async def alookup(slug: str) -> "PageRecord | None":
+    return (await apages()).get(slug)
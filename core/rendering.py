@@ -0,0 +1,48 @@
+"""Markdown rendering shared by the template filter and stored PressRelease HTML.
+
+``markdown`` is imported on first use rather than when models and template
+tags load, so worker startup doesn't pay for it (see ``core.startup``).
+"""
+
+import functools
+import hashlib
+import json
+import threading
+
+from .instrumentation import timer
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables"]
+
+_local = threading.local()
+
+
+def _converter():
+    import markdown
+
+    # Building the extension pipeline is the expensive part, so each thread
+    # keeps one converter and resets it between documents.
+    md = getattr(_local, "md", None)
+    if md is None:
+        md = _local.md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md
+
+
+def markdown_to_html(text: str) -> str:
+    if not text:
+        return ""
+    with timer("markdown"):
+        return _converter().reset().convert(text)
+
+
+@functools.cache
+def _markdown_version() -> str:
+    import markdown
+
+    return markdown.__version__
+
+
+def markdown_signature(*sources: str) -> str:
+    """Hash of the given sources plus the extension configuration."""
+
+    payload = json.dumps([MARKDOWN_EXTENSIONS, _markdown_version(), *sources])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,63 @@
+"""Scheduled publishing of blog posts.
+
+A post is visible from its ``published_at`` until its optional
+``unpublish_at`` (``PressRelease.objects.visible()``). Nothing runs at those
+moments. Instead, pages that list posts are cached only until the next one
+(``cache_public_page(scheduled=True)``), so they flip over on time without a
+cron job. ``next_change()`` says when that is. It costs one query per
+content generation and another each time a scheduled moment passes.
+"""
+
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .page_cache import acontent_generation, content_generation
+
+# (content generation, next change or None); valid until that change passes
+_memo = None
+
+
+def _bounds(now) -> dict:
+    return {
+        "publish": Min("published_at", filter=Q(published_at__gt=now)),
+        "unpublish": Min("unpublish_at", filter=Q(unpublish_at__gt=now)),
+    }
+
+
+def _published():
+    from .models import PressRelease
+
+    return PressRelease.objects.filter(is_published=True)
+
+
+def _earliest(bounds: dict):
+    return min((value for value in bounds.values() if value is not None), default=None)
+
+
+def _cached(generation: int, now):
+    memo = _memo
+    if memo is not None and memo[0] == generation and (memo[1] is None or memo[1] > now):
+        return memo
+    return None
+
+
+def next_change(now=None):
+    """The earliest publish or unpublish time after ``now``, or None."""
+    global _memo
+    now = now or timezone.now()
+    generation = content_generation()
+    memo = _cached(generation, now)
+    if memo is None:
+        memo = _memo = (generation, _earliest(_published().aggregate(**_bounds(now))))
+    return memo[1]
+
+
+async def anext_change(now=None):
+    """``next_change`` for async views."""
+    global _memo
+    now = now or timezone.now()
+    generation = await acontent_generation()
+    memo = _cached(generation, now)
+    if memo is None:
+        memo = _memo = (generation, _earliest(await _published().aaggregate(**_bounds(now))))
+    return memo[1]
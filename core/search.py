@@ -0,0 +1,190 @@
+"""Site-wide full-text search backed by an SQLite FTS5 table.
+
+``core_search_index`` (created in migration 0013) holds one row per
+PressRelease and per DynamicPage. Page bodies live in EditableElement under
+``page_<slug>_content``, so saving that element reindexes its page. Rows are
+kept in sync from model signals (see ``core.signals``); ``manage.py
+rebuild_search_index`` repopulates the table from scratch.
+"""
+
+import re
+from dataclasses import dataclass
+from html import unescape
+
+from django.db import connection
+from django.urls import reverse
+from django.utils.html import escape, strip_tags
+
+TABLE = "core_search_index"
+KIND_POST = "post"
+KIND_PAGE = "page"
+
+# bm25() takes one weight per column: kind, object_id, published, title, body.
+_BM25 = f"bm25({TABLE}, 0.0, 0.0, 0.0, 10.0, 1.0)"
+# Rows search() ranks at a time; it reads on while hidden posts leave it short.
+SEARCH_BATCH_SIZE = 50
+
+_PAGE_KEY_RE = re.compile(r"^page_(?P<slug>[-\w]+?)_(?:title|content)$")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    snippet: str
+    url: str
+    rank: float
+
+
+def _text(html: str) -> str:
+    # The index holds plain text; _mark() escapes it once on the way out.
+    return " ".join(unescape(strip_tags(html or "")).split())
+
+
+def _replace(kind: str, object_id: int, title: str, body: str, published: bool) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+        cursor.execute(
+            f"INSERT INTO {TABLE} (kind, object_id, published, title, body) VALUES (%s, %s, %s, %s, %s)",
+            [kind, object_id, int(published), title, body],
+        )
+
+
+def remove(kind: str, object_id: int) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+
+def index_post(post) -> None:
+    body = " ".join(
+        _text(getattr(post, f"{field}_html") or getattr(post, field)) for field in post.MARKDOWN_FIELDS
+    )
+    _replace(KIND_POST, post.pk, post.title, body, post.is_published)
+
+
+def index_page(page) -> None:
+    from .models import EditableElement
+
+    stored = dict(
+        EditableElement.objects.filter(
+            key__in=[f"page_{page.slug}_title", f"page_{page.slug}_content"]
+        ).values_list("key", "content")
+    )
+    title = _text(stored.get(f"page_{page.slug}_title")) or page.title
+    _replace(KIND_PAGE, page.pk, title, _text(stored.get(f"page_{page.slug}_content")), page.is_published)
+
+
+def reindex_editable_keys(keys) -> None:
+    """Reindex the dynamic pages whose stored title/content ``keys`` belong to."""
+    from .models import DynamicPage
+
+    slugs = {m["slug"] for m in map(_PAGE_KEY_RE.match, keys) if m}
+    for page in DynamicPage.objects.filter(slug__in=slugs):
+        index_page(page)
+
+
+def rebuild() -> int:
+    from .models import DynamicPage, PressRelease
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+    count = 0
+    for post in PressRelease.objects.iterator(chunk_size=500):
+        index_post(post)
+        count += 1
+    for page in DynamicPage.objects.iterator(chunk_size=500):
+        index_page(page)
+        count += 1
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+    return count
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every word, prefix-matched."""
+    return " ".join(f'"{token}"*' for token in _TOKEN_RE.findall(query))
+
+
+def search_ids(query: str, kind: str, published_only: bool = True, limit: int = 1000) -> list:
+    expression = match_expression(query)
+    if not expression:
+        return []
+    sql = f"SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s"
+    params = [expression, kind]
+    if published_only:
+        sql += " AND published = 1"
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} ORDER BY {_BM25} LIMIT %s", [*params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _ranked_rows(expression: str, limit: int, offset: int) -> list:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT kind, object_id,
+                   highlight({TABLE}, 3, '\x02', '\x03'),
+                   snippet({TABLE}, 4, '\x02', '\x03', '…', 24),
+                   {_BM25} AS rank
+            FROM {TABLE}
+            WHERE {TABLE} MATCH %s AND published = 1
+            ORDER BY rank
+            LIMIT %s OFFSET %s
+            """,
+            [expression, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def _hits(rows) -> list:
+    from .models import DynamicPage, PressRelease
+
+    slugs = dict(
+        DynamicPage.objects.filter(pk__in=[r[1] for r in rows if r[0] == KIND_PAGE]).values_list("pk", "slug")
+    )
+    # The index only knows is_published; the publish window is checked here.
+    visible_posts = set(
+        PressRelease.objects.visible()
+        .filter(pk__in=[r[1] for r in rows if r[0] == KIND_POST])
+        .values_list("pk", flat=True)
+    )
+    hits = []
+    for kind, object_id, title, snippet, rank in rows:
+        if kind == KIND_POST:
+            if object_id not in visible_posts:
+                continue
+            url = reverse("blog_post", args=[object_id])
+        elif object_id in slugs:
+            url = reverse("dynamic_page", args=[slugs[object_id]])
+        else:
+            continue
+        hits.append(SearchHit(kind, object_id, _mark(title), _mark(snippet), url, rank))
+    return hits
+
+
+def search(query: str, limit: int = 20) -> list:
+    """Published posts and pages matching ``query``, best first (BM25).
+
+    Titles weigh ten times as much as body text. Snippets wrap matches in
+    ``<mark>``; everything else in them is escaped text. Scheduled or expired
+    posts are filtered out after ranking, so further rows are read until
+    ``limit`` hits are found or the matches run out.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    batch = max(limit, SEARCH_BATCH_SIZE)
+    hits, offset = [], 0
+    while len(hits) < limit:
+        rows = _ranked_rows(expression, batch, offset)
+        hits += _hits(rows)
+        if len(rows) < batch:
+            break
+        offset += batch
+    return hits[:limit]
+
+
+def _mark(text: str) -> str:
+    return escape(text).replace("\x02", "<mark>").replace("\x03", "</mark>")
@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import badges, search
+from .page_cache import bump_content_generation
+
+# Written by visitors rather than staff and shown on no cached page; see core.badges.
+NON_CONTENT_MODELS = ("CitizenshipBadge",)
+
+
+def _content_changed(sender, **kwargs):
+    # Bump after commit, or a concurrent render could cache pre-write content
+    # under the new generation.
+    transaction.on_commit(bump_content_generation)
+
+
+def _badge_changed(sender, **kwargs):
+    transaction.on_commit(badges.bump_badge_generation)
+
+
+def connect_content_signals():
+    """Invalidate cached pages whenever a ``core`` content model is written."""
+
+    for model in apps.get_app_config("core").get_models():
+        if model.__name__ in NON_CONTENT_MODELS:
+            continue
+        post_save.connect(_content_changed, sender=model, dispatch_uid=f"content-generation-save-{model.__name__}")
+        post_delete.connect(_content_changed, sender=model, dispatch_uid=f"content-generation-delete-{model.__name__}")
+
+    from .models import CitizenshipBadge
+
+    post_save.connect(_badge_changed, sender=CitizenshipBadge, dispatch_uid="badge-generation-save")
+    post_delete.connect(_badge_changed, sender=CitizenshipBadge, dispatch_uid="badge-generation-delete")
+
+
+# The search index lives in the same database, so it is written inside the
+# saving transaction and rolls back with it.
+
+
+def _post_saved(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+def _post_deleted(sender, instance, **kwargs):
+    search.remove(search.KIND_POST, instance.pk)
+
+
+def _page_saved(sender, instance, **kwargs):
+    search.index_page(instance)
+
+
+def _page_deleted(sender, instance, **kwargs):
+    search.remove(search.KIND_PAGE, instance.pk)
+
+
+def _element_changed(sender, instance, **kwargs):
+    search.reindex_editable_keys([instance.key])
+
+
+def connect_search_signals():
+    """Keep ``core_search_index`` in step with posts, pages and page bodies."""
+    from .models import DynamicPage, EditableElement, PressRelease
+
+    post_save.connect(_post_saved, sender=PressRelease, dispatch_uid="search-post-save")
+    post_delete.connect(_post_deleted, sender=PressRelease, dispatch_uid="search-post-delete")
+    post_save.connect(_page_saved, sender=DynamicPage, dispatch_uid="search-page-save")
+    post_delete.connect(_page_deleted, sender=DynamicPage, dispatch_uid="search-page-delete")
+    post_save.connect(_element_changed, sender=EditableElement, dispatch_uid="search-element-save")
+    post_delete.connect(_element_changed, sender=EditableElement, dispatch_uid="search-element-delete")
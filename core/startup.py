@@ -0,0 +1,106 @@
+"""Worker startup: keeping it cheap, warming it once, and measuring it.
+
+Heavy optional dependencies (``HEAVY_MODULES``) are imported by the code that
+uses them, not at module level, so booting a worker loads Django, the models
+and the views and nothing else. With gunicorn's ``preload_app`` (the default
+in ``nomashae_site/gunicorn_*.py``) the master calls ``warm()`` once before
+forking: the URL resolver, the compiled public templates, Markdown and the
+page index are then shared copy-on-write by every worker instead of being
+built again on each one's first requests.
+
+``manage.py profile_startup`` measures import time per module and time to
+first response in fresh interpreters; ``compare()`` flags regressions
+against a stored run.
+"""
+
+import statistics
+
+# Loaded on first use only; profile_startup reports any imported at boot.
+HEAVY_MODULES = ("markdown", "PIL.Image", "django.utils.feedgenerator")
+
+# Templates behind the public pages, compiled into the cached loader by warm().
+WARM_TEMPLATES = (
+    "core/home.html",
+    "core/blog.html",
+    "core/culture.html",
+    "core/search.html",
+    "core/dynamic_page.html",
+    "core/citizenship.html",
+)
+
+
+def warm() -> None:
+    """Build what every worker would otherwise build on its first requests.
+
+    Safe to call before forking: database connections are closed again at the
+    end, so no worker inherits an open one.
+    """
+    from django.db import DatabaseError, connections
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    from . import page_index
+    from .rendering import markdown_to_html
+
+    resolver = get_resolver()
+    resolver.url_patterns  # imports the URLconf and the views
+    resolver.reverse_dict
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    markdown_to_html("warm")
+    try:
+        page_index.pages()
+    except DatabaseError:
+        pass  # not migrated yet; the first request loads it
+    connections.close_all()
+
+
+def parse_importtime(lines) -> list:
+    """``-X importtime`` output as (module, self µs, cumulative µs) in import order."""
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():  # skip the header line
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def by_package(modules: list) -> dict:
+    """Self import time (µs) summed per top-level package, largest first."""
+    totals = {}
+    for name, self_us, _ in modules:
+        package = name.split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def median_ms(values: list) -> float:
+    return round(statistics.median(values), 1) if values else 0.0
+
+
+def compare(results: list, baseline: list, threshold: float = 0.2, noise_ms: float = 20.0) -> list:
+    """Regressions of ``results`` against ``baseline`` as readable strings.
+
+    A timing must be both ``threshold`` (relative) and ``noise_ms`` (absolute)
+    worse to count; any heavy module newly imported at boot does.
+    """
+    previous = {row["mode"]: row for row in baseline}
+    regressions = []
+    for row in results:
+        base = previous.get(row["mode"])
+        if base is None:
+            continue
+        timings = [("boot_ms", row["boot_ms"], base["boot_ms"])]
+        timings += [
+            (f"first response {path}", ms, base["first_response_ms"][path])
+            for path, ms in row["first_response_ms"].items()
+            if path in base["first_response_ms"]
+        ]
+        for label, new, old in timings:
+            if new > old * (1 + threshold) and new - old > noise_ms:
+                regressions.append(f"{row['mode']}: {label} {old:.1f}ms -> {new:.1f}ms")
+        for module in sorted(set(row["heavy_at_boot"]) - set(base["heavy_at_boot"])):
+            regressions.append(f"{row['mode']}: {module} is now imported at boot")
+    return regressions
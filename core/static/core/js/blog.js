@@ -0,0 +1,28 @@
+const themes = ['fire', 'earth', 'water', 'air'];
+let currentIdx = parseInt(localStorage.getItem('themeIndex') || '0');
+document.body.classList.add('theme-' + themes[currentIdx]);
+
+const translations = {
+    en: {
+        "page-title": "The Nomashae Blog",
+        "back-link": "Back to Home",
+        "footer-text": "&copy; 2026 Nomashae"
+    },
+    mfb: {
+        "page-title": "Nomashae Blog",
+        "back-link": "Bak tu Hom",
+        "footer-text": "&copy; 2026 Nomasha"
+    }
+};
+
+const langSwitcher = document.getElementById('lang-switcher');
+let currentLang = 'en';
+
+langSwitcher.addEventListener('click', () => {
+    currentLang = currentLang === 'en' ? 'mfb' : 'en';
+    langSwitcher.textContent = currentLang === 'en' ? 'EN' : 'mFB';
+    for (const id in translations[currentLang]) {
+        const element = document.getElementById(id);
+        if (element) element.innerHTML = translations[currentLang][id];
+    }
+});
@@ -0,0 +1,130 @@
+const themes = ['fire', 'earth', 'water', 'air'];
+let currentIdx = parseInt(localStorage.getItem('themeIndex') || '0');
+document.body.classList.add('theme-' + themes[currentIdx]);
+
+const translations = {
+    en: {
+        "page-title": "National Culture",
+        "back-link": "Back to Home",
+        "anthem-title": "“Harmony of the Four”",
+        "anthem-subtitle": "National Anthem of Nomashae",
+        "anthem-body": `
+            <div class="verse-title">Verse I</div>
+            From mountain breath to ocean deep,
+            From steady stone to burning flame,
+            Four ancient forces wake and keep
+            Our land, our vow, our honored name.
+            In balance born, in balance strong,
+            We rise as one, though many stand,
+            Each voice a note, each step a song,
+            United heart of Nomashaen land.
+
+            <div class="chorus">
+                <div class="verse-title">Chorus</div>
+                Earth that holds us,
+                Water that flows,
+                Fire that guides us,
+                Air that knows—
+                Through change and time, through dark and light,
+                The Four stand one, our path made right.
+                In harmony we live and stand,
+                All elements, one Nomashae.
+            </div>
+
+            <div class="verse-title">Verse II</div>
+            When storms may test our calm resolve,
+            And shadows cross the rising sun,
+            The ancient ways our doubts dissolve,
+            For none are four, yet all are one.
+            With strength of stone and mercy’s tide,
+            With fearless flame and freedom’s breath,
+            We walk the path where truths abide,
+            In life, in peace, beyond all death.
+
+            <div class="verse-title">Bridge</div>
+            No crown of power, no rule by fear,
+            But balance sworn by heart and hand,
+            The past behind, the future near,
+            Guarded by all who love this land.
+
+            <div class="verse-title">Final Chorus</div>
+            Earth, Water, Fire, Air,
+            Bound in balance, just and fair,
+            From every soul our strength is drawn,
+            A new united age is born.
+            In harmony we rise and stand,
+            All elements—one Nomashae.
+        `
+    },
+    mfb: {
+        "page-title": "Nesh Kultur",
+        "back-link": "Bak tu Hom",
+        "anthem-title": "“Pa Teka Tor”",
+        "anthem-subtitle": "Nationalna Anthema dem Nomashae",
+        "anthem-body": `
+            <div class="verse-title">Part I</div>
+            Bo breth mo mon,
+            Pa sol wa deep,
+            Tor che ru, tor flam fi,
+            Fo tor wak, tu guard pa nem.
+            Pa teka born, pa teka tor,
+            Tu ri un, tu zan stand,
+            Ev vox sil, ev step son,
+            Un tor hon Nomashae.
+
+            <div class="chorus">
+                <div class="verse-title">Korus</div>
+                Ru hold tu,
+                Wa ru flow,
+                Fi ru guid tu,
+                Bo ru no—
+                Tru chan ta, tru dark li,
+                Fo tor un, pa teka ri.
+                Pa teka liv, pa teka stand,
+                Fo tor un — Nomashae.
+            </div>
+
+            <div class="verse-title">Part II</div>
+            Wen storm test sil tu,
+            Wen shad cross sol ri,
+            Old pa teka brek dout,
+            Fo yet un, al yet tu.
+            Ru tor stone, wa pa tide,
+            Fi no fear, bo free breth,
+            Tu wak pa tru pat,
+            Liv, pa, beyon end.
+
+            <div class="verse-title">Brij</div>
+            No kron pow, no rul fear,
+            Pa teka swor by sil an hand,
+            Past go bak, fut near,
+            Guard by al ho lov hon.
+
+            <div class="verse-title">Fin Korus</div>
+            Ru, Wa, Fi, Bo,
+            Bound pa teka, jus an so,
+            Ev sil giv tor tu,
+            Nu age un ri nu.
+            Pa teka ris, pa teka stand,
+            Fo tor un — Nomashae.
+        `
+    }
+};
+
+// Only fill in the default lyrics if no saved version was rendered server-side.
+const anthemBody = document.getElementById('anthem-body');
+if (!anthemBody.innerHTML.trim()) anthemBody.innerHTML = translations['en']['anthem-body'];
+
+const langSwitcher = document.getElementById('lang-switcher');
+let currentLang = 'en';
+
+langSwitcher.addEventListener('click', () => {
+    currentLang = currentLang === 'en' ? 'mfb' : 'en';
+    langSwitcher.textContent = currentLang === 'en' ? 'EN' : 'mFB';
+    const t = translations[currentLang];
+    document.getElementById('page-title').textContent = t['page-title'];
+    document.getElementById('back-link').textContent = t['back-link'];
+    document.getElementById('anthem-title').textContent = t['anthem-title'];
+    document.getElementById('anthem-subtitle').textContent = t['anthem-subtitle'];
+    document.getElementById('anthem-body').innerHTML = t['anthem-body'];
+});
@@ -0,0 +1,368 @@
+// Lightweight visual editor: staff users can toggle edit mode and
+// click on elements marked with data-edit-id to edit and save them.
+// Only included for staff; endpoint URLs come from the script tag's data-*
+// attributes so this file can be served as a cached static bundle.
+(function () {
+    const canEdit = document.body.dataset.canEdit === 'true';
+    if (!canEdit) return;
+    const urls = document.currentScript.dataset;
+
+    const navControls = document.querySelector('nav .nav-controls');
+    if (!navControls) return;
+    const editBtn = document.createElement('button');
+    editBtn.className = 'btn-icon';
+    editBtn.textContent = 'Edit Page';
+    navControls.appendChild(editBtn);
+
+    const newPageBtn = document.createElement('button');
+    newPageBtn.className = 'btn-icon';
+    newPageBtn.textContent = '+ New Page';
+    newPageBtn.style.display = 'none'; // Hidden until Edit mode
+    newPageBtn.style.borderColor = 'var(--primary)';
+    newPageBtn.style.color = 'var(--primary)';
+    navControls.appendChild(newPageBtn);
+
+    let editMode = false;
+
+    let currentFilePickerCallback = null;
+    // The library is paged by the server; more items load as the
+    // sentinel at the bottom of the grid scrolls into view.
+    let mediaNext = null;
+    let mediaLoading = false;
+    let mediaObserver = null;
+
+    function renderMediaItem(grid, f) {
+        const d = document.createElement('div');
+        d.className = 'media-item';
+        const img = document.createElement('img');
+        img.src = f.thumb;
+        img.alt = f.name;
+        img.title = f.date;
+        img.loading = 'lazy';
+        d.appendChild(img);
+        d.addEventListener('click', () => {
+            currentFilePickerCallback(f.url, { alt: f.name });
+            closeMediaLibrary();
+        });
+        grid.appendChild(d);
+    }
+
+    async function loadMediaPage(grid, sentinel) {
+        if (mediaLoading) return;
+        mediaLoading = true;
+        try {
+            let url = urls.mediaLibraryUrl;
+            if (mediaNext) url += '?after=' + encodeURIComponent(mediaNext);
+            const res = await fetch(url);
+            const data = await res.json();
+            if (data.ok) {
+                data.files.forEach(f => renderMediaItem(grid, f));
+                mediaNext = data.next;
+                if (!grid.children.length) {
+                    grid.innerHTML = '<p>No library images found.</p>';
+                }
+            }
+        } catch (e) {
+            mediaNext = null;
+            grid.innerHTML = 'Error loading media library.';
+        }
+        mediaLoading = false;
+        if (!mediaNext && mediaObserver) mediaObserver.unobserve(sentinel);
+    }
+
+    window.openMediaLibrary = async function (cb) {
+        currentFilePickerCallback = cb;
+        document.getElementById('media-modal').style.display = 'flex';
+        const grid = document.getElementById('media-grid');
+        const sentinel = document.getElementById('media-grid-sentinel');
+        grid.innerHTML = '';
+        mediaNext = null;
+        await loadMediaPage(grid, sentinel);
+        if (mediaObserver) mediaObserver.disconnect();
+        if (mediaNext) {
+            mediaObserver = new IntersectionObserver((entries) => {
+                if (entries.some(e => e.isIntersecting) && mediaNext) loadMediaPage(grid, sentinel);
+            }, { root: document.querySelector('.media-modal-content') });
+            mediaObserver.observe(sentinel);
+        }
+    };
+    window.closeMediaLibrary = function () {
+        const modal = document.getElementById('media-modal');
+        if (modal) modal.style.display = 'none';
+        currentFilePickerCallback = null;
+    };
+
+    function getCsrfToken() {
+        const name = 'csrftoken=';
+        const cookies = document.cookie.split(';');
+        for (let c of cookies) {
+            c = c.trim();
+            if (c.startsWith(name)) return c.substring(name.length);
+        }
+        return '';
+    }
+
+    // Images go up in chunks so large files don't have to arrive in
+    // one request; after a network error the upload asks the server
+    // how far it got and resumes from there.
+    async function uploadImageChunked(blobInfo, progress) {
+        const blob = blobInfo.blob();
+        const headers = { 'X-CSRFToken': getCsrfToken() };
+        const startRes = await fetch(urls.uploadStartUrl, {
+            method: 'POST',
+            headers: { ...headers, 'Content-Type': 'application/json' },
+            body: JSON.stringify({ name: blobInfo.filename(), size: blob.size }),
+        });
+        const started = await startRes.json();
+        if (!startRes.ok) throw { message: started.error || 'Upload failed', remove: true };
+
+        const chunkUrl = urls.uploadChunkUrl.replace('UPLOAD_ID', started.upload_id);
+        let offset = 0;
+        let retries = 0;
+        while (true) {
+            const chunk = blob.slice(offset, offset + started.chunk_size);
+            let res, data;
+            try {
+                res = await fetch(chunkUrl, {
+                    method: 'PUT',
+                    headers: { ...headers, 'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream' },
+                    body: chunk,
+                });
+                data = await res.json();
+            } catch (err) {
+                if (++retries > 5) throw { message: 'Upload interrupted', remove: true };
+                await new Promise(r => setTimeout(r, 1000 * retries));
+                const status = await fetch(chunkUrl, { headers });
+                if (status.ok) offset = (await status.json()).offset;
+                continue;
+            }
+            if (data.location) {
+                progress(100);
+                return data.location;
+            }
+            if (res.status === 409 || (data.offset !== undefined && !res.ok)) {
+                if (++retries > 5) throw { message: data.error || 'Upload failed', remove: true };
+                offset = data.offset;
+                continue;
+            }
+            if (!res.ok) throw { message: data.error || 'Upload failed', remove: true };
+            offset = data.offset;
+            retries = 0;
+            progress(Math.round(100 * offset / blob.size));
+        }
+    }
+
+    // Edits are queued and sent together to the batch endpoint. Each
+    // element remembers the HTML it was last saved with, so unchanged
+    // elements are never sent, and the server skips writes whose hash
+    // matches what it already stores.
+    const pendingSaves = new Map();
+    let flushTimer = null;
+
+    async function sha256Hex(text) {
+        if (!window.crypto || !crypto.subtle) return null;
+        const buf = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+        return Array.from(new Uint8Array(buf)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    function saveElement(el) {
+        const key = el.dataset.editId;
+        const model = el.dataset.model;
+
+        if (!key && !model) return;
+
+        const content = el.innerHTML;
+        if (el._nomashaeSaved === content) return;
+        pendingSaves.set(el, content);
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushSaves, 800);
+    }
+
+    async function flushSaves(keepalive) {
+        clearTimeout(flushTimer);
+        if (!pendingSaves.size) return;
+        const batch = Array.from(pendingSaves.entries());
+        pendingSaves.clear();
+
+        const changes = await Promise.all(batch.map(async ([el, content]) => {
+            // Hashing is async; skip it when the page is unloading.
+            const change = { content, hash: keepalive ? null : await sha256Hex(content) };
+            const model = el.dataset.model;
+            const modelId = el.dataset.modelId;
+            const modelField = el.dataset.modelField;
+            if (model && modelId && modelField) {
+                change.model = model;
+                change.model_id = modelId;
+                change.field = modelField;
+            } else {
+                change.key = el.dataset.editId;
+            }
+            return change;
+        }));
+
+        try {
+            const res = await fetch(urls.batchUrl, {
+                method: 'POST',
+                keepalive: !!keepalive,
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': getCsrfToken(),
+                },
+                body: JSON.stringify({ changes }),
+            });
+            const data = await res.json();
+            if (data.ok) {
+                batch.forEach(([el, content]) => { el._nomashaeSaved = content; });
+                return;
+            }
+            // Nothing in the batch was saved. The server names the change it
+            // rejected: drop that one and send the rest again.
+            const rejected = Number.isInteger(data.index) ? data.index : -1;
+            requeue(batch, rejected);
+            if (!keepalive) alert("Error: " + data.error);
+            if (rejected >= 0 && pendingSaves.size) flushTimer = setTimeout(flushSaves, 800);
+        } catch (e) {
+            console.error('Failed to save edits', e);
+            requeue(batch, -1);
+            if (!keepalive) alert("Network error occurred. Your edits will be sent again with the next change.");
+        }
+    }
+
+    // Puts a failed batch back in the queue, except the change at index
+    // `rejected` and elements edited again since (their newer content wins).
+    function requeue(batch, rejected) {
+        batch.forEach(([el, content], i) => {
+            if (i !== rejected && !pendingSaves.has(el)) pendingSaves.set(el, content);
+        });
+    }
+    window.addEventListener('pagehide', () => flushSaves(true));
+
+    newPageBtn.addEventListener('click', async () => {
+        const title = prompt("Enter the title for the new page:");
+        if (!title) return;
+        let slug = prompt("Enter a simple URL slug (e.g., 'rules', 'history', 'faq'):");
+        if (!slug) return;
+
+        // simplistic slugify
+        slug = slug.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/(^-|-$)+/g, '');
+
+        try {
+            const res = await fetch(urls.createPageUrl, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': getCsrfToken(),
+                },
+                body: JSON.stringify({ title, slug }),
+            });
+            const data = await res.json();
+            if (data.ok) {
+                window.location.href = data.url;
+            } else {
+                alert("Error: " + data.error);
+            }
+        } catch (e) {
+            alert("Network error occurred.");
+        }
+    });
+
+    editBtn.addEventListener('click', () => {
+        editMode = !editMode;
+        editBtn.textContent = editMode ? 'Stop Editing' : 'Edit Page';
+        newPageBtn.style.display = editMode ? 'block' : 'none';
+
+        const targets = document.querySelectorAll('[data-edit-id]');
+
+        if (editMode) {
+            targets.forEach((el) => {
+                const model = el.dataset.model;
+                if (el._nomashaeSaved === undefined) el._nomashaeSaved = el.innerHTML;
+
+                // If it's a Django Model-backed element (like a Decree), use TinyMCE
+                if (model) {
+                    el.id = el.id || 'tinymce-' + Math.random().toString(36).substr(2, 9);
+                    tinymce.init({
+                        selector: '#' + el.id,
+                        inline: true,
+                        plugins: 'image imagetools link lists media table codesample',
+                        toolbar: 'undo redo | blocks | bold italic | alignleft aligncenter alignright | bullist numlist | link image',
+                        image_advtab: true,
+                        images_upload_handler: uploadImageChunked,
+                        automatic_uploads: true,
+                        file_picker_types: 'image',
+                        file_picker_callback: function (callback, value, meta) {
+                            if (meta.filetype === 'image') {
+                                window.openMediaLibrary(callback);
+                            }
+                        },
+                        setup: function (editor) {
+                            editor.on('blur', function () {
+                                // Save back the underlying HTML
+                                el.innerHTML = editor.getContent();
+                                saveElement(el);
+                            });
+                        }
+                    });
+                } else {
+                    // Standard lightweight edits (like tiny layout pieces)
+                    el.contentEditable = 'true';
+                    el.style.outline = '1px dashed var(--primary)';
+                    if (!el._nomashaeEditBound) {
+                        el.addEventListener('blur', () => saveElement(el));
+                        el._nomashaeEditBound = true;
+                    }
+                }
+            });
+        } else {
+            // Turn off edit mode
+            targets.forEach((el) => {
+                if (el.dataset.model) {
+                    if (tinymce.get(el.id)) {
+                        el.innerHTML = tinymce.get(el.id).getContent();
+                        saveElement(el);
+                        tinymce.get(el.id).remove();
+                    }
+                } else {
+                    el.contentEditable = 'false';
+                    el.style.outline = '';
+                }
+            });
+            flushSaves();
+        }
+    });
+
+    // Blog post management (the buttons only exist on blog pages).
+    const createBtn = document.getElementById('btn-create-post');
+    if (createBtn) {
+        createBtn.addEventListener('click', async () => {
+            const title = prompt("Enter the title for the new Draft Post:");
+            if (!title) return;
+            try {
+                const res = await fetch(urls.blogCreateUrl, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken() },
+                    body: JSON.stringify({ title })
+                });
+                const data = await res.json();
+                if (data.ok) location.reload(); // Reload to show the new mapped post
+                else alert(data.error);
+            } catch (e) { alert("Network error"); }
+        });
+    }
+
+    window.deletePost = async function (id) {
+        if (!confirm("Are you sure you want to permanently delete this post?")) return;
+        try {
+            const res = await fetch(urls.blogDeleteUrl, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken() },
+                body: JSON.stringify({ id })
+            });
+            const data = await res.json();
+            if (data.ok) {
+                const postEl = document.getElementById('post-' + id);
+                if (postEl) postEl.remove();
+            } else alert(data.error);
+        } catch (e) { alert("Network error"); }
+    };
+})();
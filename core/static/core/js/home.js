@@ -0,0 +1,50 @@
+const translations = {
+    en: {
+        "site-motto": '"Energy in Motion"',
+        "nav-orders": "Decrees",
+        "nav-culture": "Culture",
+        "parliament-title": "Government Structure",
+        "pm-title": "Prime Minister",
+        "pres-title": "President",
+        "affairs-title": "Affairs",
+        "culture-title": "Culture",
+        "language-title": "Flyingo Bisdomick",
+        "language-intro": "The living language of Nomashae — shaped by air, motion, and balance.",
+        "language-example": '"Modern day is the best day for sky surfing. Next, I had an apple and a small chocolate bar."',
+        "pdf-link": "Language Guide",
+        "original-link": "Original PDF",
+        "about-title": "About Nomashae",
+        "about-text": "Founded in 2025, Nomashae is a democratic micronation inspired by the nomadic spirit of Avatar: The Last Airbender.",
+        "footer-text": "&copy; 2025 Nomashae | Powered by the Elements"
+    },
+    mfb2: {
+        "site-motto": '"Fo tor un - Nomashae"',
+        "nav-orders": "Ofi Ord",
+        "nav-culture": "Kulturana",
+        "parliament-title": "Gova Struktur",
+        "pm-title": "Prim Ministra",
+        "pres-title": "Prezida",
+        "affairs-title": "Afarana",
+        "culture-title": "Kulturana",
+        "language-title": "Ultra-Modern Bisdomic",
+        "language-intro": "Dis es da liv ling ov Nomasha — evolvd ov mani agen.",
+        "language-example": '<strong>Modrn dei es da best dei for skai surf. Nex, mi had un pom an smol chok bar.</strong>',
+        "pdf-link": "Loda Gid",
+        "original-link": "Orig PDF",
+        "about-title": "Abaut Nomasha",
+        "about-text": "Fond 2025, Nomasha es un demo-nesh inspai bai nomad spirita an air-enerji.",
+        "footer-text": "&copy; 2025 Nomasha | Powrd bai da Elemen"
+    }
+};
+
+const langSwitcher = document.getElementById('lang-switcher');
+let currentLang = 'en';
+
+langSwitcher.addEventListener('click', () => {
+    currentLang = currentLang === 'en' ? 'mfb2' : 'en';
+    langSwitcher.textContent = currentLang === 'en' ? 'EN' : 'mFB2';
+    for (const id in translations[currentLang]) {
+        const element = document.getElementById(id);
+        if (element) element.innerHTML = translations[currentLang][id];
+    }
+});
@@ -0,0 +1,22 @@
+function cycleTheme() {
+    const themes = ['fire', 'earth', 'water', 'air'];
+    let lastIndex = parseInt(localStorage.getItem('themeIndex') || '-1');
+    let nextIndex = (lastIndex + 1) % themes.length;
+    localStorage.setItem('themeIndex', nextIndex);
+    document.body.classList.add('theme-' + themes[nextIndex]);
+}
+cycleTheme();
+
+const themeToggle = document.getElementById('theme-toggle');
+if (localStorage.getItem('darkMode') === 'enabled') {
+    document.body.classList.add('dark-mode');
+    if (themeToggle) themeToggle.textContent = 'Light Mode';
+}
+if (themeToggle) {
+    themeToggle.addEventListener('click', () => {
+        document.body.classList.toggle('dark-mode');
+        const isDark = document.body.classList.contains('dark-mode');
+        localStorage.setItem('darkMode', isDark ? 'enabled' : 'disabled');
+        themeToggle.textContent = isDark ? 'Light Mode' : 'Dark Mode';
+    });
+}
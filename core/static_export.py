@@ -0,0 +1,202 @@
+"""Incremental static export of the public site.
+
+Every public page (home, culture, each blog feed page and permalink, and
+every published DynamicPage) plus the favicons they link to is rendered
+through the normal views and written under ``settings.STATIC_EXPORT_ROOT``
+as ``<path>/index.html`` with ``.gz``/``.br`` siblings, which WhiteNoise and
+nginx's ``gzip_static``/``brotli_static`` pick up as-is.
+
+``manifest.json`` maps each URL to its file and records a fingerprint of the
+page's inputs (the rows it renders, its tab settings, the shared editable
+elements, the templates and the static manifest). The next export only
+re-renders pages whose fingerprint changed and deletes pages that are gone.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import reverse
+
+from .favicons import TabMeta, tab_meta
+from .models import DynamicPage, EditableElement, HomeCard, PressRelease
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Content types worth precompressing; favicons in PNG/ICO already are.
+COMPRESSIBLE = ("text/", "image/svg+xml", "application/json")
+
+
+@dataclass
+class ExportPage:
+    url: str
+    inputs: str
+
+    @property
+    def path(self) -> str:
+        path = self.url.lstrip("/")
+        return path + "index.html" if path.endswith("/") or not path else path
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _file_digest(paths) -> str:
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(str(path).encode("utf-8"))
+        h.update(Path(path).read_bytes())
+    return h.hexdigest()
+
+
+def _shared_inputs() -> str:
+    """Inputs every page depends on: templates, static URLs, shared elements."""
+    template_files = [
+        path
+        for config in apps.get_app_configs()
+        if config.name == "core"
+        for path in (Path(config.path) / "templates").rglob("*.html")
+    ]
+    static_manifest = Path(settings.STATIC_ROOT) / "staticfiles.json"
+    elements = EditableElement.objects.exclude(key__startswith="page_").order_by("key").values_list("key", "content")
+    return _digest(
+        _file_digest(template_files),
+        static_manifest.read_bytes() if static_manifest.exists() else None,
+        list(elements),
+    )
+
+
+def _favicons(slug: str) -> list:
+    digest = (tab_meta(slug) or TabMeta(tab_title="")).digest
+    return [
+        ExportPage(reverse("favicon", kwargs={"slug": slug, "digest": digest, "ext": ext}), digest)
+        for ext in ("svg", "png", "ico")
+    ]
+
+
+def collect_pages() -> list:
+    """Every exportable URL with a fingerprint of what its output depends on."""
+    from .views import BLOG_PAGE_SIZE, _encode_cursor
+
+    shared = _shared_inputs()
+    pages = []
+
+    def add(url, slug, *inputs):
+        pages.append(ExportPage(url, _digest(shared, tab_meta(slug), *inputs)))
+        pages.extend(_favicons(slug))
+
+    add(reverse("home"), "home", list(HomeCard.objects.filter(is_active=True).values_list()))
+    add(reverse("culture"), "culture")
+
+    fields = [f.attname for f in PressRelease._meta.concrete_fields]
+    feed, cursor, last = [], None, None
+    for post in PressRelease.objects.visible().iterator(chunk_size=500):
+        row = [getattr(post, name) for name in fields]
+        add(reverse("blog_post", args=[post.pk]), "blog", row)
+        if len(feed) == BLOG_PAGE_SIZE:
+            # This post starts a new page, so the one being closed has a next link.
+            next_cursor = _encode_cursor(last)
+            add(reverse("blog_after", args=[cursor]) if cursor else reverse("blog"), "blog", feed, next_cursor)
+            feed, cursor = [], next_cursor
+        feed.append(row)
+        last = post
+    if feed or cursor is None:
+        add(reverse("blog_after", args=[cursor]) if cursor else reverse("blog"), "blog", feed, None)
+
+    stored = dict(EditableElement.objects.filter(key__startswith="page_").values_list("key", "content"))
+    for page in DynamicPage.objects.filter(is_published=True):
+        prefix = f"page_{page.slug}_"
+        own = sorted((k, v) for k, v in stored.items() if k.startswith(prefix))
+        add(reverse("dynamic_page", args=[page.slug]), f"page_{page.slug}", page.pk, page.title, own)
+
+    # Several pages share favicons; keep the first of each.
+    unique = {}
+    for page in pages:
+        unique.setdefault(page.url, page)
+    return list(unique.values())
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _compressed_variants(data: bytes) -> dict:
+    variants = {"gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants["br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def write_page(root: Path, page: ExportPage, content: bytes, content_type: str, previous: dict) -> dict:
+    """Write one rendered page (and its compressed siblings); return its manifest entry."""
+    target = root / page.path
+    sha = hashlib.sha256(content).hexdigest()
+    entry = {
+        "path": page.path,
+        "inputs": page.inputs,
+        "sha256": sha,
+        "size": len(content),
+        "content_type": content_type,
+        "encodings": [],
+    }
+
+    # Same bytes as last time (the inputs changed in a way that doesn't show):
+    # leave the files alone so mtimes and downstream syncs stay quiet.
+    if previous.get("sha256") == sha and target.exists():
+        entry["encodings"] = previous.get("encodings", [])
+        return entry
+
+    _write(target, content)
+    for suffix in ("gz", "br"):
+        Path(f"{target}.{suffix}").unlink(missing_ok=True)
+    if content_type.startswith(COMPRESSIBLE):
+        for suffix, data in _compressed_variants(content).items():
+            # Not worth serving if it barely shrinks.
+            if len(data) < len(content) * 0.95:
+                _write(Path(f"{target}.{suffix}"), data)
+                entry["encodings"].append(suffix)
+    return entry
+
+
+def remove_page(root: Path, entry: dict) -> None:
+    target = root / entry["path"]
+    for path in (target, Path(f"{target}.gz"), Path(f"{target}.br")):
+        path.unlink(missing_ok=True)
+    # Prune directories left empty, up to the export root.
+    parent = target.parent
+    while parent != root and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+
+
+def load_manifest(root: Path) -> dict:
+    try:
+        manifest = json.loads((root / MANIFEST_NAME).read_text("utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("pages", {})
+
+
+def save_manifest(root: Path, pages: dict) -> None:
+    data = json.dumps({"version": MANIFEST_VERSION, "pages": dict(sorted(pages.items()))}, indent=1)
+    _write(root / MANIFEST_NAME, data.encode("utf-8"))
@@ -0,0 +1,119 @@
+"""Storage backends: content-addressed uploads and minified static files.
+
+Every saved upload is named after the SHA-256 of its bytes, under the top-level
+directory of the name it was saved with::
+
+    editor_uploads/flag.jpg  ->  editor_uploads/3f/3fa9...c2.jpg
+
+The hash is computed while the upload is copied to disk, and saving bytes
+that are already stored just returns the existing name, so re-uploads
+collapse to one blob that any number of rows can point at. Because a name
+can never refer to different content, media URLs can be cached forever.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .minify import minify_css, minify_js
+
+CONTENT_ADDRESSED_RE = re.compile(r"^(?:[^/]+/)?(?P<shard>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})(?:\.\w+)?$")
+
+
+def content_digest(name: str) -> "str | None":
+    """The SHA-256 a content-addressed ``name`` was stored under, else None."""
+    match = CONTENT_ADDRESSED_RE.match(name or "")
+    if match and match["digest"].startswith(match["shard"]):
+        return match["digest"]
+    return None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name is decided in _save() from the content.
+        return name
+
+    def _save(self, name, content):
+        name = name.replace("\\", "/")
+        top = name.split("/", 1)[0] if "/" in name else ""
+        extension = os.path.splitext(name)[1].lower()
+        directory = Path(self.path(top)) if top else Path(self.location)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+            hexdigest = digest.hexdigest()
+            final = "/".join(filter(None, (top, hexdigest[:2], hexdigest + extension)))
+            path = Path(self.path(final))
+            if path.exists():
+                os.unlink(tmp)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # mkstemp creates files readable by the owner only.
+                os.chmod(tmp, self.file_permissions_mode or 0o644)
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return final
+
+    def delete(self, name):
+        # A blob may be shared by several rows, so it is never deleted on one
+        # row's behalf; ``manage.py dedupe_media --prune`` removes blobs that
+        # nothing references any more.
+        if content_digest(name):
+            return
+        super().delete(name)
+
+
+class MinifiedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's hashed, precompressed storage, minifying our own CSS/JS first.
+
+    ``collectstatic`` copies the files, this rewrites the site's bundles
+    (under ``core/``) minified in place, and the manifest step then hashes
+    and compresses the minified bytes.
+    """
+
+    minify_prefixes = ("core/",)
+    minifiers = {".css": minify_css, ".js": minify_js}
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for path, (storage, source) in list(paths.items()):
+                minify = self.minifiers.get(os.path.splitext(path)[1])
+                if minify is None or not path.startswith(self.minify_prefixes):
+                    continue
+                with storage.open(source) as fh:
+                    text = fh.read().decode("utf-8")
+                if self.exists(path):
+                    self.delete(path)
+                self._save(path, ContentFile(minify(text).encode("utf-8")))
+                paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # No manifest yet (collectstatic hasn't run, e.g. for the
+            # benchmark or a fresh checkout): fall back to the plain name.
+            if self.hashed_files:
+                raise
+            return name
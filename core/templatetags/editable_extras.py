@@ -0,0 +1,115 @@
+from weakref import WeakKeyDictionary
+
+from django import template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+# Compiled Template -> (static keys, dynamic key expressions). Entries die with
+# the template object, so recompiled templates get a fresh manifest.
+_manifests = WeakKeyDictionary()
+
+
+class EditableNode(template.Node):
+    def __init__(self, key, nodelist):
+        self.key = key
+        self.nodelist = nodelist
+
+    def render(self, context):
+        key = str(self.key.resolve(context) or "")
+        stored = context.get("editable_elements")
+        if not key or stored is None:
+            return self.nodelist.render(context)
+
+        # The first editable node of a render loads every key the template
+        # tree can reference in one query.
+        if EditableNode not in context.render_context:
+            context.render_context[EditableNode] = True
+            stored.prefetch(_keys_for_render(context))
+
+        if key in stored:
+            return mark_safe(stored[key])
+        return self.nodelist.render(context)
+
+
+def _template_manifest(tpl, engine):
+    """Return the editable keys a compiled template (and its parents) can use."""
+
+    manifest = _manifests.get(tpl)
+    if manifest is not None:
+        return manifest
+
+    static, dynamic = set(), []
+    for node in tpl.nodelist.get_nodes_by_type(EditableNode):
+        if node.key.is_var or node.key.filters:
+            dynamic.append(node.key)
+        else:
+            static.add(str(node.key.var))
+
+    # Follow {% extends %} / {% include %} when the target is a literal name.
+    related = tpl.nodelist.get_nodes_by_type(ExtendsNode)
+    related += tpl.nodelist.get_nodes_by_type(IncludeNode)
+    for node in related:
+        target = node.parent_name if isinstance(node, ExtendsNode) else node.template
+        if target.is_var or target.filters:
+            continue
+        parent_static, parent_dynamic = _template_manifest(engine.get_template(str(target.var)), engine)
+        static |= parent_static
+        dynamic.extend(parent_dynamic)
+
+    manifest = (frozenset(static), tuple(dynamic))
+    _manifests[tpl] = manifest
+    return manifest
+
+
+def _keys_for_render(context):
+    tpl = context.template
+    if tpl is None:
+        return set()
+    static, dynamic = _template_manifest(tpl, tpl.engine)
+    keys = set(static)
+    for expr in dynamic:
+        # Keys built from loop variables may not resolve yet; those are
+        # fetched individually when their node renders.
+        value = expr.resolve(context)
+        if value:
+            keys.add(str(value))
+    return keys
+
+
+def editable_keys(template_name: str, context: dict) -> set:
+    """The keys rendering ``template_name`` with ``context`` will look up.
+
+    Lets async views fetch them before rendering; keys that only resolve
+    inside loops are still fetched by their node.
+    """
+    from django.template import Context
+    from django.template.loader import get_template
+
+    tpl = get_template(template_name).template
+    static, dynamic = _template_manifest(tpl, tpl.engine)
+    keys = set(static)
+    resolve_context = Context(context)
+    for expr in dynamic:
+        value = expr.resolve(resolve_context)
+        if value:
+            keys.add(str(value))
+    return keys
+
+
+@register.tag
+def editable(parser, token):
+    """Render the saved EditableElement content for a key, or the default body.
+
+    Usage::
+
+        <h1 data-edit-id="home.site_title">{% editable "home.site_title" %}Nomashae{% endeditable %}</h1>
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag takes exactly one argument (the element key)")
+    key = parser.compile_filter(bits[1])
+    nodelist = parser.parse(("endeditable",))
+    parser.delete_first_token()
+    return EditableNode(key, nodelist)
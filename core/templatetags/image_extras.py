@@ -0,0 +1,40 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field_file, info=None, alt="", sizes="100vw", **attrs):
+    """Render an ``<img>`` with a WebP ``srcset`` built from stored variants.
+
+    Usage::
+
+        {% responsive_image pr.image pr.image_variants alt=pr.title sizes="(max-width: 900px) 100vw, 900px" %}
+
+    Falls back to the original file when no variants have been generated yet.
+    Extra keyword arguments become attributes on the tag.
+    """
+    if not field_file:
+        return ""
+    info = info or {}
+    variants = info.get("variants") or []
+    extra = format_html_join("", ' {}="{}"', attrs.items())
+
+    if not variants:
+        return format_html('<img src="{}" alt="{}" loading="lazy" decoding="async"{}>', field_file.url, alt, extra)
+
+    storage = field_file.storage
+    srcset = ", ".join(f"{storage.url(name)} {width}w" for width, name in variants)
+    width, largest = max(variants)
+    height = round(info["height"] * width / info["width"]) if info.get("width") else None
+    dims = format_html(' width="{}" height="{}"', width, height) if height else ""
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{} loading="lazy" decoding="async"{}>',
+        storage.url(largest),
+        srcset,
+        sizes,
+        alt,
+        dims,
+        extra,
+    )
@@ -1,12 +1,25 @@
 from django import template
 from django.utils.safestring import mark_safe
-import markdown
+
+from core.rendering import markdown_to_html
 
 register = template.Library()
 
 @register.filter
-def render_markdown(text):
-    if not text:
+def render_markdown(value, field=None):
+    """Render Markdown to HTML.
+
+    ``{{ text|render_markdown }}`` renders the string directly.
+    ``{{ pr|render_markdown:"body" }}`` uses the HTML stored on the object when
+    it is up to date and only falls back to rendering the source field.
+    """
+    if field:
+        obj = value
+        stored = getattr(obj, f"{field}_html", "")
+        if stored and obj.markdown_hash and obj.markdown_hash == obj.current_markdown_hash():
+            return mark_safe(stored)
+        value = getattr(obj, field, "")
+    if not value:
         return ""
-    html = markdown.markdown(text, extensions=['fenced_code', 'tables'])
+    html = markdown_to_html(value)
     return mark_safe(html)
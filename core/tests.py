@@ -1,3 +1,716 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import itertools
+import json
+import struct
+import tempfile
+import time
+import zlib
+from datetime import timedelta
+from pathlib import Path
+from io import BytesIO, StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template import Context, Engine
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from . import badges, content_io, search, storage, uploads
+from .context_processors import EditableContent
+from .editor_html import normalize
+from .favicons import meta_from_settings
+from .models import CitizenshipBadge, DynamicPage, EditableElement, EditorMedia, HomeCard, PressRelease, TabSettings
+from .page_cache import GENERATION_KEY, _page_key, content_generation
+from .templatetags.markdown_extras import render_markdown
+from .views import MEDIA_LIBRARY_PAGE_SIZE
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Per-worker memos are keyed on the content generation, so every test starts
+# on one no earlier test has seen.
+_generations = itertools.count(1000)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedSiteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache.set(GENERATION_KEY, next(_generations), timeout=None)
+
+
+class PageCacheTests(CachedSiteTestCase):
+    def test_etag_revalidation_returns_304(self):
+        first = self.client.get("/culture/")
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get("/culture/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        first = self.client.get("/culture/")
+        again = self.client.get("/culture/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_saved_content_shows_once_the_transaction_commits(self):
+        self.assertNotContains(self.client.get("/"), "Fresh card")
+        with self.captureOnCommitCallbacks() as callbacks:
+            HomeCard.objects.create(title="Fresh card", body="Body")
+            self.assertNotContains(self.client.get("/"), "Fresh card")
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.client.get("/"), "Fresh card")
+
+    def test_an_evicted_generation_never_matches_old_entries(self):
+        cache.delete(GENERATION_KEY)
+        self.assertNotContains(self.client.get("/"), "Fresh card")
+        with self.captureOnCommitCallbacks(execute=True):
+            HomeCard.objects.create(title="Fresh card", body="Body")
+        cache.delete(GENERATION_KEY)  # culled by the file cache
+        self.assertContains(self.client.get("/"), "Fresh card")
+
+    def test_unread_query_parameters_share_the_entry(self):
+        first = self.client.get("/culture/")
+        entries = len(cache._cache)
+        for value in ("1", "2", "3"):
+            response = self.client.get(f"/culture/?x={value}")
+            self.assertEqual(response["ETag"], first["ETag"])
+        self.client.get("/search/?q=anything")
+        self.client.get("/search/?q=something+else")
+        self.assertEqual(len(cache._cache), entries)
+
+    def test_read_query_parameters_are_part_of_the_key(self):
+        now = timezone.now()
+        for i in range(12):
+            PressRelease.objects.create(title=f"Post {i}", body="Body", published_at=now - timedelta(hours=i))
+        cursor = self.client.get("/blog/").context["next_cursor"]
+        older = self.client.get(f"/blog/?after={cursor}")
+        self.assertContains(older, "Post 11")
+        self.assertNotContains(self.client.get("/blog/?utm_source=feed"), "Post 11")
+
+    def test_a_scheduled_post_appears_once_its_time_passes(self):
+        later = timezone.now() + timedelta(hours=1)
+        post = PressRelease.objects.create(title="Scheduled decree", body="Body", published_at=later)
+        self.assertNotContains(self.client.get("/blog/"), "Scheduled decree")
+
+        key = _page_key(RequestFactory().get("/blog/"), ("after",))
+        entry = cache.get(key)
+        self.assertAlmostEqual(entry["expires"], later.timestamp(), places=3)
+        # Let the hour pass: without a save, so the generation stays the same.
+        cache.set(key, {**entry, "expires": time.time() - 1})
+        PressRelease.objects.filter(pk=post.pk).update(published_at=timezone.now() - timedelta(minutes=1))
+        self.assertContains(self.client.get("/blog/"), "Scheduled decree")
+
+    def test_rebuilding_markdown_replaces_cached_pages(self):
+        post = PressRelease.objects.create(title="Decree", body="**Bold**")
+        # Stored HTML from an older renderer, with a current hash.
+        PressRelease.objects.filter(pk=post.pk).update(body_html="<p>Old render</p>")
+        url = f"/blog/{post.pk}/"
+        self.assertContains(self.client.get(url), "Old render")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_markdown", "--force", stdout=StringIO())
+        response = self.client.get(url)
+        self.assertNotContains(response, "Old render")
+        self.assertContains(response, "<strong>Bold</strong>")
+
+    def test_staff_bypass_the_cache(self):
+        self.client.get("/")
+        with self.captureOnCommitCallbacks(execute=False):
+            HomeCard.objects.create(title="Fresh card", body="Body")
+        self.assertNotContains(self.client.get("/"), "Fresh card")
+
+        staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.assertContains(self.client.get("/"), "Fresh card")
+
+
+class ServerTimingTests(CachedSiteTestCase):
+    def test_only_staff_get_the_header_by_default(self):
+        self.assertNotIn("Server-Timing", self.client.get("/culture/"))
+        staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.assertIn("total;dur=", self.client.get("/culture/")["Server-Timing"])
+
+    @override_settings(SERVER_TIMING=True)
+    def test_the_setting_adds_it_for_everyone(self):
+        self.assertIn("Server-Timing", self.client.get("/culture/"))
+
+
+class FaviconTests(CachedSiteTestCase):
+    def test_only_the_current_hash_is_cached_for_good(self):
+        settings_row = TabSettings.objects.create(slug="blog", tab_title="News", icon_text="B")
+        digest = meta_from_settings(settings_row).digest
+
+        response = self.client.get(f"/favicon/blog.{digest}.svg")
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+        for url in ("/favicon/blog.svg", "/favicon/blog.000000000000.svg"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn("max-age=300", response["Cache-Control"])
+                self.assertNotIn("immutable", response["Cache-Control"])
+
+class FeedTests(CachedSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        PressRelease.objects.create(title="Visible decree", body="**Body**")
+        PressRelease.objects.create(title="Draft decree", body="Body", is_published=False)
+        PressRelease.objects.create(title="Scheduled decree", body="Body", published_at=now + timedelta(hours=1))
+        PressRelease.objects.create(title="Expired decree", body="Body", unpublish_at=now - timedelta(minutes=1))
+
+    def test_feeds_list_only_visible_posts(self):
+        response = self.client.get("/blog/feed.json")
+        self.assertEqual(response["Content-Type"], "application/feed+json; charset=utf-8")
+        self.assertEqual([item["title"] for item in response.json()["items"]], ["Visible decree"])
+
+        response = self.client.get("/blog/feed.atom")
+        self.assertEqual(response["Content-Type"], "application/atom+xml; charset=utf-8")
+        self.assertContains(response, "Visible decree")
+        for title in ("Draft decree", "Scheduled decree", "Expired decree"):
+            self.assertNotContains(response, title)
+
+    def test_a_repeat_poll_is_not_modified(self):
+        for url in ("/blog/feed.atom", "/blog/feed.json"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                self.assertTrue(etag)
+                again = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b"")
+
+class ContentIOTests(TestCase):
+    def snapshot(self) -> dict:
+        # Rows matched on a slug or key get new primary keys on import.
+        rows = {}
+        for model in content_io.resolve():
+            match = content_io.MODELS[model._meta.label_lower]
+            names = [f.attname for f in model._meta.concrete_fields if match == "id" or not f.primary_key]
+            rows[model] = list(model.objects.order_by(match).values(*names))
+        return rows
+
+    def test_export_then_import_restores_every_row(self):
+        PressRelease.objects.create(title="Decree", body="**Bold**", published_at=timezone.now())
+        HomeCard.objects.create(title="Card", body="Body")
+        TabSettings.objects.create(slug="blog", tab_title="News")
+        DynamicPage.objects.create(slug="rules", title="Rules")
+        EditableElement.objects.create(key="home.intro", content="<p>Hello</p>")
+        before = self.snapshot()
+        with tempfile.TemporaryDirectory() as temp:
+            path = f"{temp}/content.jsonl.gz"
+            call_command("export_content", path, stdout=StringIO())
+            for model in before:
+                model.objects.all().delete()
+            call_command("import_content", path, stdout=StringIO())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_the_last_line_for_a_key_wins_within_a_chunk(self):
+        importer = content_io.Importer()
+        for content in ("<p>First</p>", "<p>Second</p>"):
+            row = {"model": "core.editableelement", "pk": 1, "fields": {"key": "home.intro", "content": content}}
+            importer.feed(json.dumps(row))
+        importer.flush()
+        self.assertEqual(importer.counts, {"core.editableelement": 1})
+        self.assertEqual(EditableElement.objects.get(key="home.intro").content, "<p>Second</p>")
+
+
+    def test_a_failed_import_still_refreshes_what_it_wrote(self):
+        rows = [
+            {"model": "core.pressrelease", "pk": 1, "fields": {"title": "Comet decree", "body": "Body"}},
+            {"model": "core.pressrelease", "pk": 2, "fields": {"title": "Bad", "published_at": "not a date"}},
+        ]
+        before = content_generation()
+        with tempfile.TemporaryDirectory() as temp:
+            path = f"{temp}/content.jsonl"
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.writelines(json.dumps(row) + "\n" for row in rows)
+            with self.assertRaisesMessage(CommandError, "lines 2-2"):
+                call_command("import_content", path, "--chunk-size", "1", stdout=StringIO())
+        self.assertEqual([hit.object_id for hit in search.search("comet")], [1])
+        self.assertGreater(content_generation(), before)
+
+class EditableManifestTests(TestCase):
+    TEMPLATES = {
+        "base.html": (
+            "{% load editable_extras %}"
+            '<h1>{% editable "t.title" %}Title{% endeditable %}</h1>{% block body %}{% endblock %}'
+        ),
+        "footer.html": '{% load editable_extras %}{% editable "t.footer" %}Footer{% endeditable %}',
+        "page.html": (
+            '{% extends "base.html" %}{% load editable_extras %}{% block body %}'
+            '{% editable "t.intro" %}Intro{% endeditable %}'
+            "{% for key in keys %}{% editable key %}Default{% endeditable %}{% endfor %}"
+            '{% include "footer.html" %}{% endblock %}'
+        ),
+    }
+
+    def setUp(self):
+        for key in ("t.title", "t.intro", "t.footer", "t.loop"):
+            EditableElement.objects.create(key=key, content=f"Saved {key}")
+
+    def render(self, keys=()):
+        engine = Engine(
+            loaders=[("django.template.loaders.locmem.Loader", self.TEMPLATES)],
+            libraries={"editable_extras": "core.templatetags.editable_extras"},
+        )
+        context = Context({"editable_elements": EditableContent(), "keys": keys})
+        return engine.get_template("page.html").render(context)
+
+    def test_one_query_loads_every_key_across_extends_and_include(self):
+        with self.assertNumQueries(1) as queries:
+            html = self.render()
+        self.assertIn(" IN ", queries.captured_queries[0]["sql"])
+        for key in ("t.title", "t.intro", "t.footer"):
+            self.assertIn(f"Saved {key}", html)
+
+    def test_keys_missing_from_the_manifest_are_looked_up_one_by_one(self):
+        with self.assertNumQueries(3):
+            html = self.render(keys=["t.loop", "t.unsaved"])
+        self.assertIn("Saved t.loop", html)
+        self.assertIn("Default", html)
+
+class StoredMarkdownTests(TestCase):
+    def test_stored_html_is_used_while_the_hash_is_current(self):
+        post = PressRelease.objects.create(title="Decree", body="**Bold**")
+        self.assertEqual(post.body_html, "<p><strong>Bold</strong></p>")
+        # Anything in *_html is trusted as long as markdown_hash matches the sources.
+        PressRelease.objects.filter(pk=post.pk).update(body_html="<p>stored</p>")
+        post = PressRelease.objects.get(pk=post.pk)
+        self.assertEqual(render_markdown(post, "body"), "<p>stored</p>")
+
+    def test_stale_html_is_rendered_again(self):
+        post = PressRelease.objects.create(title="Decree", body="**Bold**")
+        post.body = "*Amended*"
+        self.assertEqual(render_markdown(post, "body"), "<p><em>Amended</em></p>")
+
+        PressRelease.objects.filter(pk=post.pk).update(markdown_hash="outdated", body_html="<p>old</p>")
+        post = PressRelease.objects.get(pk=post.pk)
+        self.assertEqual(render_markdown(post, "body"), "<p><strong>Bold</strong></p>")
+
+
+class BlogPaginationTests(CachedSiteTestCase):
+    def test_cursor_pages_cover_every_post_once(self):
+        now = timezone.now()
+        for i in range(25):
+            # Shared timestamps make the id the tie-breaker.
+            PressRelease.objects.create(
+                title=f"Post {i}", body="Body", published_at=now - timedelta(hours=i // 3), is_pinned=i in (7, 20)
+            )
+        seen, url = [], "/blog/"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [post.pk for post in response.context["posts"]]
+            cursor = response.context["next_cursor"]
+            url = f"/blog/after/{cursor}/" if cursor else None
+        expected = PressRelease.objects.order_by("-is_pinned", "-published_at", "id").values_list("pk", flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_invalid_cursor_is_a_404(self):
+        for url in ("/blog/after/not-a-cursor/", "/blog/?after=bm9wZQ", "/blog/after/MXxub3QtYS1kYXRlfDE/"):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class DynamicPageIndexTests(CachedSiteTestCase):
+    def test_unknown_slugs_are_answered_from_memory(self):
+        DynamicPage.objects.create(slug="rules", title="Rules")
+        self.assertEqual(self.client.get("/wp-admin/").status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/wp-login/").status_code, 404)
+
+    def test_a_new_page_is_found_after_a_miss(self):
+        self.assertEqual(self.client.get("/charter/").status_code, 404)
+        with self.captureOnCommitCallbacks(execute=True):
+            DynamicPage.objects.create(slug="charter", title="Charter")
+        self.assertContains(self.client.get("/charter/"), "Charter")
+
+class SearchTests(CachedSiteTestCase):
+    def test_hidden_posts_do_not_crowd_out_visible_ones(self):
+        later = timezone.now() + timedelta(days=1)
+        for i in range(search.SEARCH_BATCH_SIZE + 10):
+            # Title matches rank above the visible posts' body matches.
+            PressRelease.objects.create(title=f"Comet decree {i}", body="Scheduled", published_at=later)
+        visible = {PressRelease.objects.create(title=f"Notice {i}", body="About the comet").pk for i in range(3)}
+
+        hits = search.search("comet", limit=5)
+        self.assertEqual({hit.object_id for hit in hits}, visible)
+        self.assertEqual(len(search.search("comet", limit=2)), 2)
+
+    def test_entities_are_indexed_as_text(self):
+        PressRelease.objects.create(title="Fish & Chips", body="Salt & vinegar <3")
+        self.assertEqual(search.search("amp"), [])
+
+        [hit] = search.search("vinegar")
+        self.assertEqual(hit.title, "Fish &amp; Chips")
+        self.assertIn("Salt &amp; <mark>vinegar</mark> &lt;3", hit.snippet)
+        response = self.client.get("/search/?q=vinegar")
+        self.assertContains(response, "Fish &amp; Chips")
+        self.assertContains(response, "Salt &amp; <mark>vinegar</mark> &lt;3")
+        self.assertNotContains(response, "&amp;amp;")
+
+
+    def test_migration_indexes_entities_as_text(self):
+        build_index = importlib.import_module("core.migrations.0013_search_index").build_index
+        PressRelease.objects.create(title="Fish & Chips", body="Salt & vinegar")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.TABLE}")
+        build_index(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(search.search("amp"), [])
+        [hit] = search.search("vinegar")
+        self.assertIn("Salt &amp; <mark>vinegar</mark>", hit.snippet)
+
+class EditorBatchSaveTests(CachedSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(staff)
+        EditableElement.objects.create(key="home.intro", content="<p>Same</p>")
+        self.post = PressRelease.objects.create(title="Decree", body="Body")
+
+    def save(self, changes):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/editable-element/batch/", json.dumps({"changes": changes}), "application/json")
+
+    @staticmethod
+    def change(content, **fields):
+        return {**fields, "content": content, "hash": hashlib.sha256(content.encode("utf-8")).hexdigest()}
+
+    def test_unchanged_content_is_skipped(self):
+        before = content_generation()
+        response = self.save(
+            [
+                self.change("<p>Same</p>", key="home.intro"),
+                self.change("Decree", model="PressRelease", model_id=self.post.pk, field="title"),
+            ]
+        )
+        self.assertEqual(response.json(), {"ok": True, "saved": 0, "skipped": 2, "bytes_saved": 0})
+        self.assertEqual(content_generation(), before)
+
+    def test_changed_content_is_saved(self):
+        before = content_generation()
+        response = self.save(
+            [
+                self.change("<p>Same</p>", key="home.intro"),
+                self.change("<p>New</p>", key="home.outro"),
+                self.change("Amended decree", model="PressRelease", model_id=self.post.pk, field="title"),
+            ]
+        )
+        self.assertEqual(response.json()["saved"], 2)
+        self.assertEqual(response.json()["skipped"], 1)
+        self.assertEqual(EditableElement.objects.get(key="home.outro").content, "<p>New</p>")
+        self.assertEqual(PressRelease.objects.get(pk=self.post.pk).title, "Amended decree")
+        self.assertGreater(content_generation(), before)
+
+    def test_hash_mismatch_rejects_the_whole_batch(self):
+        bad = {**self.change("<p>New</p>", key="home.outro"), "hash": "0" * 64}
+        response = self.save([self.change("<p>Other</p>", key="home.intro"), bad])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["index"], 1)
+        self.assertEqual(EditableElement.objects.get(key="home.intro").content, "<p>Same</p>")
+        self.assertFalse(EditableElement.objects.filter(key="home.outro").exists())
+
+    def test_a_missing_row_is_reported_by_index(self):
+        missing = self.change("New", model="PressRelease", model_id=self.post.pk + 1, field="title")
+        response = self.save([self.change("<p>Other</p>", key="home.intro"), missing])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["index"], 1)
+        self.assertEqual(EditableElement.objects.get(key="home.intro").content, "<p>Same</p>")
+
+
+def _png(width: int, height: int) -> bytes:
+    """A PNG header for an image of any size, with no pixel data."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", b"")
+
+
+class MediaLibraryTests(CachedSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(staff)
+        now = timezone.now()
+        # Pairs share a timestamp, so the cursor has to break ties on id.
+        EditorMedia.objects.bulk_create(
+            EditorMedia(file=f"editor_uploads/{i}.png", uploaded_at=now - timedelta(minutes=i // 2))
+            for i in range(MEDIA_LIBRARY_PAGE_SIZE + 5)
+        )
+
+    def test_cursor_pages_are_stable_while_rows_are_added(self):
+        first = self.client.get("/api/editor/library/").json()
+        self.assertEqual(len(first["files"]), MEDIA_LIBRARY_PAGE_SIZE)
+        EditorMedia.objects.bulk_create([EditorMedia(file="editor_uploads/new.png")])
+        second = self.client.get(f"/api/editor/library/?after={first['next']}").json()
+
+        ids = [f["id"] for f in first["files"] + second["files"]]
+        self.assertEqual(len(ids), len(set(ids)))
+        existing = EditorMedia.objects.exclude(file="editor_uploads/new.png").values_list("pk", flat=True)
+        self.assertEqual(set(ids), set(existing))
+        self.assertIsNone(second["next"])
+
+    def test_an_unchanged_page_is_not_modified(self):
+        first = self.client.get("/api/editor/library/")
+        again = self.client.get("/api/editor/library/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            EditorMedia.objects.filter(pk=first.json()["files"][0]["id"]).delete()
+        self.assertEqual(self.client.get("/api/editor/library/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+
+class EditorUploadTests(CachedSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        overrides = override_settings(
+            EDITOR_UPLOAD_TEMP_DIR=f"{temp.name}/uploads", MEDIA_ROOT=f"{temp.name}/media", EDITOR_UPLOAD_CHUNK_BYTES=64
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.staff = get_user_model().objects.create_user("editor", password="x", is_staff=True)
+        self.client.force_login(self.staff)
+
+    def start(self, size, name="photo.png"):
+        body = json.dumps({"name": name, "size": size})
+        return self.client.post("/api/editor/upload/start/", body, "application/json")
+
+    def put(self, upload_id, offset, data):
+        return self.client.put(
+            f"/api/editor/upload/{upload_id}/", data, "application/octet-stream", headers={"Upload-Offset": str(offset)}
+        )
+
+    def upload(self, data):
+        upload_id = self.start(len(data)).json()["upload_id"]
+        for offset in range(0, len(data), 64):
+            response = self.put(upload_id, offset, data[offset : offset + 64])
+        return response
+
+    def test_a_file_arrives_in_chunks(self):
+        buf = BytesIO()
+        Image.new("RGB", (40, 30), "#2F2F2F").save(buf, format="PNG")
+        data = buf.getvalue()
+        self.assertGreater(len(data), 64)
+
+        started = self.start(len(data)).json()
+        self.assertEqual((started["offset"], started["chunk_size"]), (0, 64))
+        upload_id = started["upload_id"]
+        self.assertEqual(self.put(upload_id, 0, data[:64]).json()["offset"], 64)
+        self.assertEqual(self.client.get(f"/api/editor/upload/{upload_id}/").json()["offset"], 64)
+        response = self.put(upload_id, 64, data[64:128])
+        while "location" not in response.json():
+            offset = response.json()["offset"]
+            response = self.put(upload_id, offset, data[offset : offset + 64])
+        self.assertEqual(EditorMedia.objects.get().original_name, "photo.png")
+        self.assertEqual(self.client.get(f"/api/editor/upload/{upload_id}/").status_code, 404)
+
+    def test_oversized_files_are_refused_up_front(self):
+        with self.settings(EDITOR_UPLOAD_MAX_BYTES=1000):
+            self.assertEqual(self.start(1001).status_code, 413)
+            self.assertEqual(self.start(1000).status_code, 200)
+
+    def test_oversized_images_are_refused_from_their_header(self):
+        response = self.upload(_png(8000, 8000))
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("8000x8000", response.json()["error"])
+        self.assertFalse(EditorMedia.objects.exists())
+
+    def test_chunks_longer_than_the_limit_are_refused(self):
+        upload_id = self.start(100).json()["upload_id"]
+        self.assertEqual(self.put(upload_id, 0, b"x" * 65).status_code, 413)
+        self.assertEqual(self.put(upload_id, 0, b"x" * 64).status_code, 200)
+        self.assertEqual(self.put(upload_id, 64, b"x" * 40).status_code, 413)  # past the announced size
+
+    def test_a_wrong_offset_gets_the_current_one(self):
+        upload_id = self.start(100).json()["upload_id"]
+        self.put(upload_id, 0, b"x" * 64)
+        for offset in (0, 80):
+            response = self.put(upload_id, offset, b"x" * 20)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.json()["offset"], 64)
+        self.assertEqual(uploads.status(upload_id, self.staff.pk)["offset"], 64)
+
+    def test_uploads_belong_to_the_user_who_started_them(self):
+        upload_id = self.start(100).json()["upload_id"]
+        other = get_user_model().objects.create_user("other", password="x", is_staff=True)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(f"/api/editor/upload/{upload_id}/").status_code, 404)
+        self.assertEqual(self.put(upload_id, 0, b"x" * 64).status_code, 404)
+        self.assertEqual(uploads.status(upload_id, self.staff.pk)["offset"], 0)
+
+
+class MediaStorageTests(CachedSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        overrides = override_settings(MEDIA_ROOT=temp.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def legacy_file(self, name, data=b"legacy") -> str:
+        path = Path(settings.MEDIA_ROOT, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return name
+
+    def test_identical_uploads_share_one_blob(self):
+        buf = BytesIO()
+        Image.new("RGB", (40, 30), "#2F2F2F").save(buf, format="PNG")
+        first = uploads.save_media(BytesIO(buf.getvalue()), "flag.png")
+        again = uploads.save_media(BytesIO(buf.getvalue()), "copy of flag.png")
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(storage.content_digest(first.file.name), hashlib.sha256(buf.getvalue()).hexdigest())
+
+        names = {default_storage.save(f"editor_uploads/{n}.png", ContentFile(b"same")) for n in ("a", "b")}
+        self.assertEqual(len(names), 1)
+        self.assertEqual(len(list(Path(settings.MEDIA_ROOT, "editor_uploads").rglob("*.png"))), 2)
+
+    def test_deleting_one_row_keeps_a_shared_blob(self):
+        name = default_storage.save("editor_uploads/a.png", ContentFile(b"shared"))
+        kept, dropped = EditorMedia.objects.bulk_create([EditorMedia(file=name), EditorMedia(file=name)])
+        dropped.file.delete(save=False)
+        dropped.delete()
+        self.assertTrue(default_storage.exists(kept.file.name))
+
+        legacy = self.legacy_file("editor_uploads/old.png")
+        default_storage.delete(legacy)
+        self.assertFalse(default_storage.exists(legacy))
+
+    def test_only_content_addressed_media_is_immutable(self):
+        name = default_storage.save("editor_uploads/a.png", ContentFile(b"hashed"))
+        response = self.client.get(f"/media/{name}")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        response.close()
+
+        response = self.client.get(f"/media/{self.legacy_file('editor_uploads/old.png')}")
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        response.close()
+
+    def test_dedupe_media_moves_legacy_files_to_shared_blobs(self):
+        old_variant = self.legacy_file("editor_uploads/variants/old1-320.webp", b"variant")
+        first = EditorMedia(
+            file=self.legacy_file("editor_uploads/old1.png", b"same"),
+            image_variants={"source": "editor_uploads/old1.png", "variants": [[320, old_variant]]},
+        )
+        second = EditorMedia(file=self.legacy_file("editor_uploads/old2.png", b"same"))
+        EditorMedia.objects.bulk_create([first, second])
+        orphan = default_storage.save("editor_uploads/orphan.png", ContentFile(b"orphan"))
+
+        out = StringIO()
+        call_command("dedupe_media", "--dry-run", "--prune", stdout=out)
+        self.assertIn("Would move editor_uploads/old1.png", out.getvalue())
+        self.assertIn(f"Would prune {orphan}", out.getvalue())
+        self.assertEqual(EditorMedia.objects.get(pk=first.pk).file.name, "editor_uploads/old1.png")
+        self.assertTrue(default_storage.exists(orphan))
+
+        call_command("dedupe_media", "--prune", stdout=StringIO())
+        first, second = EditorMedia.objects.get(pk=first.pk), EditorMedia.objects.get(pk=second.pk)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(storage.content_digest(first.file.name), hashlib.sha256(b"same").hexdigest())
+        [[width, variant]] = first.image_variants["variants"]
+        self.assertEqual((width, first.image_variants["source"]), (320, first.file.name))
+        self.assertEqual(storage.content_digest(variant), hashlib.sha256(b"variant").hexdigest())
+        self.assertTrue(default_storage.exists(variant))
+        for name in ("editor_uploads/old1.png", "editor_uploads/old2.png", old_variant, orphan):
+            self.assertFalse(default_storage.exists(name), name)
+
+class CitizenshipBadgeTests(CachedSiteTestCase):
+
+    def test_issuing_a_badge_leaves_the_content_generation_alone(self):
+        before = content_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/citizenship/", {"username": "visitor", "origin": "Eastern Air Temple"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(CitizenshipBadge.objects.filter(username="visitor").exists())
+        self.assertEqual(content_generation(), before)
+
+    def test_missing_badges_are_not_memoized(self):
+        size = len(badges._key_memo)
+        self.assertIsNone(badges.render_key_for(999999))
+        self.assertEqual(len(badges._key_memo), size)
+
+    def test_an_evicted_generation_never_revives_a_memoized_key(self):
+        cache.delete(badges.GENERATION_KEY)
+        badge = CitizenshipBadge.objects.create(username="visitor", origin="Ba Sing Se", **badges.new_design())
+        before = badges.render_key_for(badge.pk)
+        CitizenshipBadge.objects.filter(pk=badge.pk).update(origin="Omashu")
+        cache.delete(badges.GENERATION_KEY)  # culled by the file cache
+        self.assertNotEqual(badges.render_key_for(badge.pk), before)
+        self.assertEqual(self.client.get("/citizenship/badge/999999/").status_code, 404)
+
+
+class EditorHtmlTests(SimpleTestCase):
+    SAMPLES = [
+        '<p class="MsoNormal"><span>Hello</span>&nbsp;<b>wor</b><b>ld</b></p><p></p>',
+        '<div><p>  spaced   \n text </p><ul><li>one<li>two</ul></div>',
+        '<p><a href="jav&#x61;script:alert(1)" onclick="x()">link</a><img src="/a.png" onerror="x()"></p>',
+        "<pre>  keep\n   this  </pre><p>a<br>b</p>",
+        '<table><tr><td colspan="2" style="width: 10px; background: url(x)">cell</td></tr></table>',
+        "<p><b>unclosed <i>tags",
+        "<svg><script>alert(1)</script></svg><style>p{}</style><p>after</p>",
+    ]
+
+    def test_script_urls_are_stripped(self):
+        for href in (
+            "javascript:alert(1)",
+            " JAVASCRIPT:alert(1)",
+            "jav&#x61;script:alert(1)",
+            "&#106;avascript:alert(1)",
+            "java&#9;script:alert(1)",
+            "vbscript:msgbox(1)",
+        ):
+            with self.subTest(href=href):
+                self.assertEqual(normalize(f'<a href="{href}">x</a>'), "<a>x</a>")
+        self.assertEqual(normalize('<img src="data:image/svg+xml,x">'), "")
+        self.assertEqual(normalize('<a href="/about/">x</a>'), '<a href="/about/">x</a>')
+        self.assertEqual(normalize('<a href="https://example.com">x</a>'), '<a href="https://example.com">x</a>')
+
+    def test_event_handlers_and_scripts_are_dropped(self):
+        self.assertEqual(normalize('<p onclick="x()" onMouseOver="y()">t</p>'), "<p>t</p>")
+        self.assertEqual(normalize("<script>alert(1)</script><p>b</p>"), "<p>b</p>")
+        self.assertEqual(normalize("<SCRIPT SRC=x></SCRIPT>hi"), "hi")
+        self.assertEqual(normalize("<svg><script>alert(1)</script></svg>ok"), "ok")
+        self.assertEqual(normalize("<p>a<style>p { color: red }</style>b</p>"), "<p>ab</p>")
+
+    def test_unsafe_styles_are_removed(self):
+        html = '<p style="color: red; background-image: url(x.png); width: expression(alert(1))">t</p>'
+        self.assertEqual(normalize(html), '<p style="color: red">t</p>')
+        self.assertEqual(normalize('<p style="background: url(javascript:x)">t</p>'), "<p>t</p>")
+
+    def test_unclosed_tags_are_closed(self):
+        self.assertEqual(normalize("<p><b>bold"), "<p><b>bold</b></p>")
+        self.assertEqual(normalize("<ul><li>one"), "<ul><li>one</li></ul>")
+
+    def test_only_identical_inline_tags_merge(self):
+        self.assertEqual(normalize("<p><b>wor</b><b>ld</b></p>"), "<p><b>world</b></p>")
+        self.assertEqual(normalize("<p><b><i>a</i></b><b><i>b</i></b></p>"), "<p><b><i>ab</i></b></p>")
+        html = '<p><strong style="color: red">a</strong><strong>b</strong></p>'
+        self.assertEqual(normalize(html), html)
+        html = '<p><em class="x">a</em><em class="y">b</em></p>'
+        self.assertEqual(normalize(html), html)
+
+    def test_whitespace_collapses_except_in_pre(self):
+        self.assertEqual(normalize("<p>a   \n b</p>"), "<p>a b</p>")
+        self.assertEqual(normalize("<pre>  a\n   b  </pre>"), "<pre>  a\n   b  </pre>")
+
+    def test_normalizing_twice_changes_nothing(self):
+        for html in self.SAMPLES:
+            with self.subTest(html=html):
+                once = normalize(html)
+                self.assertEqual(normalize(once), once)
@@ -0,0 +1,257 @@
+"""Bounded, resumable uploads for the editor's inline images.
+
+The client announces an upload (name and total size), then sends the bytes
+in order as raw chunks, each tagged with its offset. Chunks are appended to
+a temp file under ``settings.EDITOR_UPLOAD_TEMP_DIR``, read from the request
+in small pieces, so a worker never holds more than one piece in memory. After a
+dropped connection the client asks for the current offset and carries on
+from there. Each chunk is checked and written under an exclusive lock on
+the temp file (``flock``, or ``msvcrt.locking`` on Windows), so a retried
+chunk racing the original can't be written twice. Once the last byte arrives the file is checked from its header
+alone (format and pixel count, without decoding the image) and only then
+becomes an EditorMedia row.
+"""
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.utils.text import get_valid_filename
+
+ALLOWED_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+READ_SIZE = 64 * 1024
+# Unfinished uploads older than this are deleted.
+STALE_AFTER = 24 * 3600
+# Windows locks byte ranges and blocks reads of them, so the lock is taken
+# on a byte past the largest allowed upload.
+_LOCK_OFFSET = 2**40
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status: int = 400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def _temp_dir() -> Path:
+    path = Path(settings.EDITOR_UPLOAD_TEMP_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _paths(upload_id: str) -> tuple:
+    try:
+        uuid.UUID(hex=upload_id)
+    except ValueError:
+        raise UploadError("Unknown upload", status=404)
+    base = _temp_dir() / upload_id
+    return base.with_suffix(".json"), base.with_suffix(".part")
+
+
+def _load(upload_id: str, user_id: int) -> tuple:
+    meta_path, part_path = _paths(upload_id)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        raise UploadError("Unknown upload", status=404)
+    if meta["user"] != user_id:
+        raise UploadError("Unknown upload", status=404)
+    return meta, part_path
+
+
+def _discard(upload_id: str) -> None:
+    for path in _paths(upload_id):
+        path.unlink(missing_ok=True)
+
+
+def _sweep_stale() -> None:
+    """Delete uploads whose metadata and data have both been idle too long."""
+    temp_dir = _temp_dir()
+    last_touched = {}  # upload_id -> newest mtime of its files
+    for path in temp_dir.iterdir():
+        if path.suffix not in (".json", ".part"):
+            continue
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        last_touched[path.stem] = max(mtime, last_touched.get(path.stem, 0))
+    cutoff = time.time() - STALE_AFTER
+    for upload_id, mtime in last_touched.items():
+        if mtime < cutoff:
+            for suffix in (".json", ".part"):
+                (temp_dir / upload_id).with_suffix(suffix).unlink(missing_ok=True)
+
+
+@contextmanager
+def _locked(fh):
+    """Hold an exclusive lock on the open file ``fh``, blocking until it is free."""
+    if os.name != "nt":
+        import fcntl
+
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+        return  # released when the file is closed
+
+    import msvcrt
+
+    fh.seek(_LOCK_OFFSET)
+    while True:
+        try:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            break
+        except OSError:
+            pass  # LK_LOCK gives up after ten tries; keep waiting
+    try:
+        yield
+    finally:
+        fh.seek(_LOCK_OFFSET)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def check_size(size) -> int:
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("Missing or invalid size")
+    if size <= 0:
+        raise UploadError("Empty upload")
+    if size > settings.EDITOR_UPLOAD_MAX_BYTES:
+        raise UploadError(
+            f"File is larger than {settings.EDITOR_UPLOAD_MAX_BYTES // (1024 * 1024)} MB", status=413
+        )
+    return size
+
+
+def inspect_image(fh) -> str:
+    """Validate an image from its header only; return the file extension to use.
+
+    ``Image.open`` parses the header and stops, so the pixel limit is checked
+    before anything is decoded.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(fh) as image:
+            fmt, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise UploadError("Image dimensions are too large", status=413)
+    except (UnidentifiedImageError, OSError, ValueError):
+        raise UploadError("Not a supported image", status=415)
+    finally:
+        fh.seek(0)
+    if fmt not in ALLOWED_FORMATS:
+        raise UploadError(f"Unsupported image format {fmt}", status=415)
+    if width * height > settings.EDITOR_UPLOAD_MAX_PIXELS:
+        raise UploadError(
+            f"Image is {width}x{height}; the limit is {settings.EDITOR_UPLOAD_MAX_PIXELS:,} pixels", status=413
+        )
+    return ALLOWED_FORMATS[fmt]
+
+
+def _filename(name: str, extension: str) -> str:
+    stem = get_valid_filename(os.path.splitext(os.path.basename(name or ""))[0])[:80] or "image"
+    return stem + extension
+
+
+def save_media(fh, name: str):
+    """Validate ``fh`` and store it as an EditorMedia row.
+
+    Storage is content-addressed, so re-uploading a file that is already in
+    the library returns (and bumps to the top) the existing row instead of
+    adding a duplicate.
+    """
+    from django.utils import timezone
+
+    from .models import EditorMedia
+
+    extension = inspect_image(fh)
+    filename = _filename(name, extension)
+    field = EditorMedia._meta.get_field("file")
+    stored = field.storage.save(field.generate_filename(None, filename), File(fh, name=filename))
+
+    media = EditorMedia.objects.filter(file=stored).order_by("pk").first()
+    if media is None:
+        return EditorMedia.objects.create(file=stored, original_name=filename)
+    media.uploaded_at = timezone.now()
+    media.save(update_fields=["uploaded_at"])
+    return media
+
+
+def start(user_id: int, name: str, size) -> dict:
+    size = check_size(size)
+    _sweep_stale()
+    upload_id = uuid.uuid4().hex
+    meta_path, part_path = _paths(upload_id)
+    part_path.touch()
+    meta_path.write_text(json.dumps({"user": user_id, "name": name or "", "size": size}), encoding="utf-8")
+    return {"upload_id": upload_id, "offset": 0, "chunk_size": settings.EDITOR_UPLOAD_CHUNK_BYTES}
+
+
+def status(upload_id: str, user_id: int) -> dict:
+    meta, part_path = _load(upload_id, user_id)
+    return {"upload_id": upload_id, "offset": part_path.stat().st_size, "size": meta["size"]}
+
+
+def append(upload_id: str, user_id: int, offset, length, stream):
+    """Append one chunk read from ``stream``.
+
+    Returns {"upload_id", "offset"} while bytes are outstanding, and the
+    finished EditorMedia once the last byte is in.
+    """
+    meta, part_path = _load(upload_id, user_id)
+    try:
+        offset, length = int(offset), int(length)
+    except (TypeError, ValueError):
+        raise UploadError("Missing offset or length")
+    if length <= 0 or length > settings.EDITOR_UPLOAD_CHUNK_BYTES:
+        raise UploadError(f"Chunks must be 1..{settings.EDITOR_UPLOAD_CHUNK_BYTES} bytes", status=413)
+    if offset + length > meta["size"]:
+        raise UploadError("Chunk runs past the announced size", status=413)
+
+    try:
+        # No O_CREAT: a finished or swept upload must not be started again.
+        out = open(os.open(part_path, os.O_WRONLY | os.O_APPEND), "ab")
+    except FileNotFoundError:
+        raise UploadError("Unknown upload", status=404)
+    finished = False
+    try:
+        with out, _locked(out):
+            # Held until the chunk is written (and the upload finished), so the
+            # offset check and the write are one step for concurrent requests.
+            stat = os.fstat(out.fileno())
+            if stat.st_nlink == 0:
+                # Finished by the request we waited for.
+                raise UploadError("Unknown upload", status=404)
+            if offset != stat.st_size:
+                # The client resends from where the server actually is.
+                raise UploadError("Offset mismatch", status=409, offset=stat.st_size)
+
+            written = 0
+            while written < length:
+                piece = stream.read(min(READ_SIZE, length - written))
+                if not piece:
+                    break
+                out.write(piece)
+                written += len(piece)
+            out.flush()
+            if written != length:
+                # Dropped mid-chunk: keep what arrived, the client resumes from it.
+                raise UploadError("Incomplete chunk", status=400, offset=offset + written)
+
+            if offset + length < meta["size"]:
+                return {"upload_id": upload_id, "offset": offset + length}
+            finished = True
+            with part_path.open("rb") as fh:
+                return save_media(fh, meta["name"])
+    finally:
+        # After the file is closed: Windows can't delete an open file. A
+        # request that got the lock in between finds the upload full (409).
+        if finished:
+            _discard(upload_id)
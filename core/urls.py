@@ -1,15 +1,32 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
     path("", views.home, name="home"),
     path("culture/", views.culture, name="culture"),
     path("blog/", views.blog_feed, name="blog"),
+    path("blog/after/<str:after>/", views.blog_feed, name="blog_after"),
+    path("blog/feed.atom", views.blog_feed_atom, name="blog_feed_atom"),
+    path("blog/feed.json", views.blog_feed_json, name="blog_feed_json"),
+    path("blog/<int:pk>/", views.blog_post, name="blog_post"),
+    path("search/", views.search_page, name="search"),
+    path("citizenship/", views.citizenship, name="citizenship"),
+    path("citizenship/badge/<int:pk>/", views.citizenship_badge_image, name="citizenship_badge_image"),
+    path("metrics/", views.metrics, name="metrics"),
     path("editable-element/update/", views.editable_element_update, name="editable_element_update"),
+    path("editable-element/batch/", views.editable_element_batch, name="editable_element_batch"),
     path("api/pages/create/", views.create_dynamic_page, name="create_dynamic_page"),
     path("api/editor/upload/", views.editor_file_upload, name="editor_file_upload"),
+    path("api/editor/upload/start/", views.editor_upload_start, name="editor_upload_start"),
+    path("api/editor/upload/<str:upload_id>/", views.editor_upload_chunk, name="editor_upload_chunk"),
     path("api/editor/library/", views.get_media_library, name="get_media_library"),
     path("api/blog/create/", views.api_blog_create, name="api_blog_create"),
     path("api/blog/delete/", views.api_blog_delete, name="api_blog_delete"),
+    re_path(r"^media/(?P<path>.+)$", views.media_file, name="media"),
+    re_path(
+        r"^favicon/(?P<slug>[-\w]+)(?:\.(?P<digest>[0-9a-f]{12}))?\.(?P<ext>svg|png|ico)$",
+        views.favicon,
+        name="favicon",
+    ),
     path("<slug:slug>/", views.dynamic_page, name="dynamic_page"),
 ]
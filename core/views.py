@@ -1,69 +1,297 @@
-import random
-from io import BytesIO
+import hashlib
+from datetime import datetime
 
-from django.http import HttpResponse, JsonResponse
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q, TextField
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.utils import timezone
-from django.views.decorators.http import require_POST
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.csrf import csrf_exempt
-from PIL import Image, ImageDraw, ImageFont
+from django.views.static import serve
 
-from .models import PressRelease, HomeCard, TabSettings, EditableElement, DynamicPage, EditorMedia
+from .favicons import TabMeta, atab_meta, render_icon, tab_meta
+from .images import best_variant
+from .instrumentation import record_miss, render_metrics, timer
+from . import badges, page_index, search, uploads
+from .context_processors import EditableContent
+from .editor_html import looks_like_html, normalize
+from .models import CitizenshipBadge, PressRelease, HomeCard, EditableElement, DynamicPage, EditorMedia
+from .page_cache import acontent_generation, bump_content_generation, cache_public_page
+from .page_index import PageRecord
+from .storage import content_digest
+from .templatetags.editable_extras import editable_keys
+from .uploads import UploadError
 
 
-def _tab_context(slug: str, default_title: str) -> dict:
-    """Return per-page tab metadata (title + computed favicon data URL)."""
+_LOOKUP = object()
 
-    try:
-        settings_obj = TabSettings.objects.get(slug=slug)
-        title = settings_obj.tab_title or default_title
-        icon_text = settings_obj.icon_text or "N"
-        bg = settings_obj.icon_bg_color or "#2F2F2F"
-        fg = settings_obj.icon_text_color or "#FFFFFF"
-    except TabSettings.DoesNotExist:
-        title = default_title
-        icon_text = "N"
-        bg = "#2F2F2F"
-        fg = "#FFFFFF"
 
-    # Build a tiny SVG favicon as a data URL. We keep it simple so it stays editable.
-    from urllib.parse import quote
+def _tab_context(slug: str, default_title: str, meta=_LOOKUP) -> dict:
+    """Return per-page tab metadata (title + favicon URLs).
+
+    Pass ``meta`` when the caller already has the TabSettings (or None).
+    """
+
+    if meta is _LOOKUP:
+        with timer("tab"):
+            meta = tab_meta(slug)
+    title = (meta.tab_title if meta else "") or default_title
+    digest = (meta or TabMeta(tab_title=title)).digest
+    ctx = {"tab_title": title}
+    for ext in ("svg", "png", "ico"):
+        ctx[f"tab_icon_{ext}"] = reverse("favicon", kwargs={"slug": slug, "digest": digest, "ext": ext})
+    return ctx
+
+
+async def _arender(request, template_name: str, ctx: dict, status: int = 200) -> HttpResponse:
+    """``render`` for async views.
+
+    The template's editable snippets are fetched first through the async ORM;
+    the render itself then runs in a worker thread, since context processors
+    and templates may still touch the database synchronously.
+    """
+    editables = EditableContent()
+    await editables.aprefetch(editable_keys(template_name, ctx))
+    ctx["editable_elements"] = editables
+    return await sync_to_async(render)(request, template_name, ctx, status=status)
+
+
+FAVICON_CONTENT_TYPES = {"svg": "image/svg+xml", "png": "image/png", "ico": "image/x-icon"}
+
 
-    svg = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><rect width="100" height="100" rx="20" fill="{bg}"/><text x="50" y="50" dy=".35em" text-anchor="middle" font-family="sans-serif" font-weight="bold" font-size="70" fill="{fg}">{icon_text}</text></svg>'
-    href = "data:image/svg+xml," + quote(svg)
-    return {"tab_title": title, "tab_icon_href": href}
+def favicon(request, slug, ext, digest=None):
+    """Serve the generated tab icon for a page slug.
+
+    Requests for the current content hash are cached forever; anything else
+    (old hash or no hash) gets a short lifetime.
+    """
+    meta = tab_meta(slug) or TabMeta(tab_title="")
+    response = HttpResponse(render_icon(meta, ext), content_type=FAVICON_CONTENT_TYPES[ext])
+    if digest == meta.digest:
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=300)
+    return response
 
 
-def home(request):
-    cards = HomeCard.objects.filter(is_active=True)
+def media_file(request, path):
+    """Serve an uploaded file from MEDIA_ROOT.
+
+    Content-addressed names (see core.storage) can never point at different
+    bytes, so they are cached for a year as immutable; anything else briefly.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    digest = content_digest(path)
+    if digest:
+        response["ETag"] = f'"{digest}"'
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+@staff_member_required
+def metrics(request):
+    """Request timing histograms from all workers, in Prometheus text format."""
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@cache_public_page(scheduled=True)
+async def home(request):
+    cards = [card async for card in HomeCard.objects.filter(is_active=True)]
     ctx = {"home_cards": cards}
-    ctx.update(_tab_context("home", "Nomashae | Democratic Micronation"))
-    return render(request, "core/home.html", ctx)
+    ctx.update(_tab_context("home", "Nomashae | Democratic Micronation", meta=await atab_meta("home")))
+    return await _arender(request, "core/home.html", ctx)
+
+
+@cache_public_page
+async def culture(request):
+    ctx = _tab_context("culture", "Culture | Nomashae", meta=await atab_meta("culture"))
+    return await _arender(request, "core/culture.html", ctx)
+
+
+BLOG_PAGE_SIZE = 10
+
+
+def _encode_cursor(post: PressRelease) -> str:
+    raw = f"{int(post.is_pinned)}|{post.published_at.isoformat()}|{post.pk}"
+    return urlsafe_base64_encode(raw.encode("utf-8"))
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        pinned, published_at, pk = urlsafe_base64_decode(cursor).decode("utf-8").split("|")
+        return pinned == "1", datetime.fromisoformat(published_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Http404("Invalid page cursor")
+
 
+def _posts_after(qs, cursor: str):
+    """Keyset filter for rows after ``cursor`` in (-is_pinned, -published_at, id) order."""
 
-def culture(request):
-    ctx = _tab_context("culture", "Culture | Nomashae")
-    return render(request, "core/culture.html", ctx)
+    pinned, published_at, pk = _decode_cursor(cursor)
+    # Phrased as an equality on is_pinned plus a range on published_at so
+    # SQLite can seek into the feed index instead of scanning from the start.
+    # (is_pinned=False compiles to a bare "NOT is_pinned", which can't seek.)
+    same_pin = Q(published_at__lte=published_at) & ~Q(published_at=published_at, pk__lte=pk)
+    if pinned:
+        return qs.filter(Q(is_pinned__in=[False]) | (Q(is_pinned__in=[True]) & same_pin))
+    return qs.filter(Q(is_pinned__in=[False]) & same_pin)
 
 
-def blog_feed(request):
-    posts = PressRelease.objects.filter(is_published=True)
-    ctx = {"posts": posts}
+@cache_public_page(scheduled=True, query_params=("after",))
+async def blog_feed(request, after=None):
+    posts = PressRelease.objects.visible()
+    # Older pages live at /blog/after/<cursor>/ so they can be exported as
+    # plain files; ?after= is still accepted for old links.
+    cursor = after or request.GET.get("after")
+    if cursor:
+        posts = _posts_after(posts, cursor)
+
+    page = [post async for post in posts[: BLOG_PAGE_SIZE + 1]]
+    next_cursor = _encode_cursor(page[BLOG_PAGE_SIZE - 1]) if len(page) > BLOG_PAGE_SIZE else None
+    ctx = {"posts": page[:BLOG_PAGE_SIZE], "next_cursor": next_cursor, "is_first_page": not cursor}
+    ctx.update(_tab_context("blog", "Blog | Nomashae", meta=await atab_meta("blog")))
+    return await _arender(request, "core/blog.html", ctx)
+
+
+async def _feed_posts() -> list:
+    from . import feeds
+
+    posts = PressRelease.objects.visible().order_by("-published_at", "-id")[: feeds.FEED_SIZE]
+    return [post async for post in posts]
+
+
+@cache_public_page(scheduled=True)
+async def blog_feed_atom(request):
+    """The newest posts as an Atom feed."""
+    from . import feeds
+
+    body = feeds.atom(request, await _feed_posts())
+    return HttpResponse(body, content_type="application/atom+xml; charset=utf-8")
+
+
+@cache_public_page(scheduled=True)
+async def blog_feed_json(request):
+    """The newest posts as a JSON Feed."""
+    from . import feeds
+
+    body = feeds.json_feed(request, await _feed_posts())
+    return HttpResponse(body, content_type="application/feed+json; charset=utf-8")
+
+
+@cache_public_page(scheduled=True)
+def blog_post(request, pk):
+    """Permalink page for a single published post."""
+    post = get_object_or_404(PressRelease.objects.visible(), pk=pk)
+    ctx = {"posts": [post], "single_post": True}
     ctx.update(_tab_context("blog", "Blog | Nomashae"))
+    ctx["tab_title"] = f"{post.title} | {ctx['tab_title']}"
     return render(request, "core/blog.html", ctx)
 
 
+def citizenship(request):
+    """Issue a citizenship badge; the page shows it once created."""
+    ctx = {
+        "origins": CitizenshipBadge.ORIGIN_CHOICES,
+        "username_value": "",
+        "origin_value": "",
+    }
+    ctx.update(_tab_context("citizenship", "Citizenship | Nomashae"))
+    if request.method != "POST":
+        return render(request, "core/citizenship.html", ctx)
+
+    username = request.POST.get("username", "").strip()
+    origin = request.POST.get("origin", "")
+    ctx.update(username_value=username, origin_value=origin)
+    max_length = CitizenshipBadge._meta.get_field("username").max_length
+    if not username or len(username) > max_length:
+        ctx["error"] = f"Please enter a username of at most {max_length} characters."
+    elif origin not in dict(CitizenshipBadge.ORIGIN_CHOICES):
+        ctx["error"] = "Please choose where you come from."
+    elif CitizenshipBadge.objects.filter(username__iexact=username).exists():
+        ctx["error"] = "That username already has a badge."
+    else:
+        try:
+            with transaction.atomic():
+                ctx["badge"] = CitizenshipBadge.objects.create(username=username, origin=origin, **badges.new_design())
+        except IntegrityError:
+            ctx["error"] = "That username already has a badge."
+    return render(request, "core/citizenship.html", ctx, status=400 if "error" in ctx else 200)
+
+
+def citizenship_badge_image(request, pk):
+    """The badge as WebP (when accepted) or PNG, drawn once and then served from disk."""
+    key = badges.render_key_for(pk)
+    if key is None:
+        raise Http404("No such badge")
+    fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "png"
+    etag = f'"{key[:32]}-{fmt}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        path = badges.cache_path(key, fmt)
+        if not path.exists():
+            badge = get_object_or_404(CitizenshipBadge, pk=pk)
+            with timer("badge"):
+                path = badges.render_cached(badge, (fmt,))[fmt]
+        response = FileResponse(path.open("rb"), content_type=badges.FORMATS[fmt])
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept"])
+    # Short-lived: the URL stays the same when a badge is edited.
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+def search_page(request):
+    """Full-text search over published posts and pages.
+
+    Not page-cached: nearly every query is different, so the entries would
+    only push real pages out of the cache, and the FTS5 index answers them cheaply.
+    """
+    query = request.GET.get("q", "").strip()[:200]
+    hits = search.search(query) if query else []
+    ctx = {"query": query, "hits": hits}
+    ctx.update(_tab_context("search", "Search | Nomashae"))
+    return render(request, "core/search.html", ctx)
 
 
-def dynamic_page(request, slug):
-    """Renders a dynamically created page."""
-    page = get_object_or_404(DynamicPage, slug=slug)
-    
+async def dynamic_page(request, slug):
+    """Renders a dynamically created page.
+
+    Published pages come from the in-process slug index, so unknown slugs
+    (mostly bot probes) are a 404 without a query or a page cache lookup.
+    Staff fall back to the database so they can open unpublished pages.
+    """
+    page = await page_index.alookup(slug)
+    if page is None:
+        user = await request.auser()
+        if not user.is_staff:
+            record_miss("dynamic_page", slug)
+            raise Http404("No such page")
+        try:
+            model = await DynamicPage.objects.aget(slug=slug)
+        except DynamicPage.DoesNotExist:
+            raise Http404("No such page")
+        page = PageRecord(pk=model.pk, slug=model.slug, title=model.title, tab=await atab_meta(f"page_{slug}"))
+    return await _render_dynamic_page(request, page)
+
+
+@cache_public_page
+async def _render_dynamic_page(request, page):
     # We use a standard default context for these catch-all pages.
     ctx = {"page": page}
-    ctx.update(_tab_context(f"page_{slug}", f"{page.title} | Nomashae"))
-    return render(request, "core/dynamic_page.html", ctx)
+    ctx.update(_tab_context(page.tab_slug, f"{page.title} | Nomashae", meta=page.tab))
+    return await _arender(request, "core/dynamic_page.html", ctx)
 
 
 @csrf_exempt
@@ -93,38 +321,149 @@ def create_dynamic_page(request) -> JsonResponse:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
+# Widest variant inserted into editor content; blog posts are 900px wide.
+EDITOR_IMAGE_WIDTH = 1280
+MEDIA_LIBRARY_PAGE_SIZE = 60
+# Grid tiles are ~130px wide, so the smallest variant is plenty.
+MEDIA_THUMBNAIL_WIDTH = 320
+
+
+def _media_after(qs, cursor: str):
+    """Keyset filter for rows after ``cursor`` in (-uploaded_at, -id) order."""
+    try:
+        uploaded_at, pk = urlsafe_base64_decode(cursor).decode("utf-8").split("|")
+        uploaded_at, pk = datetime.fromisoformat(uploaded_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Http404("Invalid page cursor")
+    return qs.filter(uploaded_at__lte=uploaded_at).exclude(uploaded_at=uploaded_at, pk__gte=pk)
+
+
 @csrf_exempt
 @staff_member_required
-def get_media_library(request) -> JsonResponse:
-    """Returns a JSON list of all uploaded images for the Editor Media Library."""
-    media_list = EditorMedia.objects.all().order_by("-uploaded_at")
-    files = [
-        {
+async def get_media_library(request) -> HttpResponse:
+    """Returns one page of uploaded images for the Editor Media Library.
+
+    Pages are keyed by an ``after`` cursor; the response's ``next`` is the
+    cursor for the following page (or null on the last one).
+    """
+    cursor = request.GET.get("after")
+    # Any upload or delete bumps the content generation, so this changes
+    # exactly when a page of the library could.
+    etag = f'"media-{await acontent_generation()}-{cursor or ""}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    media_list = EditorMedia.objects.all()
+    if cursor:
+        media_list = _media_after(media_list, cursor)
+    page = [m async for m in media_list[: MEDIA_LIBRARY_PAGE_SIZE + 1]]
+
+    next_cursor = None
+    if len(page) > MEDIA_LIBRARY_PAGE_SIZE:
+        last = page[MEDIA_LIBRARY_PAGE_SIZE - 1]
+        next_cursor = urlsafe_base64_encode(f"{last.uploaded_at.isoformat()}|{last.pk}".encode("utf-8"))
+
+    files = []
+    for m in page[:MEDIA_LIBRARY_PAGE_SIZE]:
+        storage = m.file.storage
+        thumb = best_variant(m.image_variants, MEDIA_THUMBNAIL_WIDTH)
+        display = best_variant(m.image_variants, EDITOR_IMAGE_WIDTH)
+        files.append({
             "id": m.id,
-            "url": m.file.url,
-            "name": m.file.name.split("/")[-1],
+            "url": storage.url(display) if display else m.file.url,
+            "thumb": storage.url(thumb) if thumb else m.file.url,
+            "name": m.original_name or m.file.name.split("/")[-1],
             "date": m.uploaded_at.strftime("%Y-%m-%d")
-        }
-        for m in media_list
-    ]
-    return JsonResponse({"ok": True, "files": files})
+        })
+    response = JsonResponse({"ok": True, "files": files, "next": next_cursor})
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @csrf_exempt
 @staff_member_required
 @require_POST
 def editor_file_upload(request) -> JsonResponse:
-    """Endpoint for TinyMCE to upload inline images."""
+    """Endpoint for TinyMCE to upload inline images in a single request.
+
+    Large files should use the chunked endpoints below; this one rejects
+    anything over EDITOR_UPLOAD_MAX_BYTES before the body is parsed.
+    """
+    # Checked before touching request.FILES, which would spool the whole
+    # body to disk. Allow a little for the multipart framing.
+    if int(request.META.get("CONTENT_LENGTH") or 0) > settings.EDITOR_UPLOAD_MAX_BYTES + 64 * 1024:
+        return JsonResponse({"error": "File is too large"}, status=413)
     if 'file' not in request.FILES:
         return JsonResponse({"error": "No file uploaded"}, status=400)
-    
+
     upload = request.FILES['file']
     try:
-        media = EditorMedia.objects.create(file=upload)
-        # TinyMCE expects a JSON response with a "location" key pointing to the image URL
-        return JsonResponse({"location": media.file.url})
+        uploads.check_size(upload.size)
+        media = uploads.save_media(upload, upload.name)
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+    # TinyMCE expects a JSON response with a "location" key pointing to the image URL
+    return JsonResponse({"location": _editor_image_url(media)})
+
+
+def _editor_image_url(media) -> str:
+    # Point the editor at a resized variant so posts don't embed the raw upload.
+    variant = best_variant(media.image_variants, EDITOR_IMAGE_WIDTH)
+    return media.file.storage.url(variant) if variant else media.file.url
+
+
+@csrf_exempt
+@staff_member_required
+@require_POST
+def editor_upload_start(request) -> JsonResponse:
+    """Begin a chunked upload.
+
+    Expects JSON body: {"name": "photo.jpg", "size": <total bytes>}. Returns
+    {"upload_id", "offset": 0, "chunk_size"}; the client then PUTs raw chunks
+    to editor_upload_chunk.
+    """
+    import json
+
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    try:
+        return JsonResponse(uploads.start(request.user.pk, payload.get("name"), payload.get("size")))
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+
+@csrf_exempt
+@staff_member_required
+@require_http_methods(["GET", "PUT"])
+def editor_upload_chunk(request, upload_id) -> JsonResponse:
+    """Receive one chunk of a chunked upload, or report how far it got.
+
+    GET returns {"offset"} so an interrupted client can resume. PUT takes
+    the raw bytes starting at the ``Upload-Offset`` header and returns the
+    new {"offset"}; the final chunk returns {"location"} instead, like
+    editor_file_upload. A wrong offset gets a 409 carrying the right one.
+    """
+    try:
+        if request.method == "GET":
+            return JsonResponse(uploads.status(upload_id, request.user.pk))
+        result = uploads.append(
+            upload_id,
+            request.user.pk,
+            request.headers.get("Upload-Offset"),
+            request.META.get("CONTENT_LENGTH"),
+            request,
+        )
+    except UploadError as e:
+        return JsonResponse({"error": str(e), **e.extra}, status=e.status)
+    if isinstance(result, dict):
+        return JsonResponse(result)
+    return JsonResponse({"location": _editor_image_url(result)})
 
 
 @csrf_exempt
@@ -172,6 +511,167 @@ def api_blog_delete(request) -> JsonResponse:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
+class EditorChangeError(Exception):
+    """A visual-editor change that can't be applied; reported as a 400.
+
+    ``index`` is the position of the offending change in the batch, if known.
+    """
+
+    def __init__(self, message: str, index: "int | None" = None):
+        super().__init__(message)
+        self.index = index
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _stored_text(obj, field) -> str:
+    value = getattr(obj, field.attname)
+    return "" if value is None else str(value)
+
+
+def _apply_editor_changes(changes: list) -> dict:
+    """Apply visual-editor changes in one transaction, skipping no-op writes.
+
+    Each change is either ``{"key", "content"}`` for an EditableElement or
+    ``{"model", "model_id", "field", "content"}`` for a field on a core model,
+    and may carry ``hash``: the SHA-256 hex of ``content`` computed by the
+    client. HTML is normalized (see ``core.editor_html``) before it is
+    compared and stored; writes that match what is already stored are
+    skipped. ``bytes_saved`` is how much normalization trimmed from the writes.
+    A change that can't be applied raises ``EditorChangeError`` with its index.
+    """
+    from django.apps import apps
+
+    elements = {}  # key -> (content, digest, bytes trimmed)
+    fields = {}  # model class -> {pk: {field: (content, digest, bytes trimmed, index)}}
+
+    for index, change in enumerate(changes):
+        if not isinstance(change, dict):
+            raise EditorChangeError("Each change must be an object", index)
+        content = change.get("content") or ""
+        if change.get("hash") and change["hash"] != _content_hash(content):
+            raise EditorChangeError("Content hash mismatch", index)
+        submitted = len(content.encode("utf-8"))
+
+        model_name = change.get("model")
+        model_id = change.get("model_id")
+        field_name = change.get("field")
+        if model_name and model_id and field_name:
+            try:
+                # We assume models are in the 'core' app for simplicity
+                ModelClass = apps.get_model("core", model_name)
+            except LookupError:
+                raise EditorChangeError(f"Model '{model_name}' not found", index)
+            try:
+                field = ModelClass._meta.get_field(field_name)
+            except Exception:
+                field = None
+            # Basic security check to ensure the field exists and is updatable
+            if field is None or not field.concrete or field.primary_key or not field.editable:
+                raise EditorChangeError(f"Field '{field_name}' not found on {model_name}", index)
+            # Text fields take editor HTML, but may hold Markdown from the admin.
+            if isinstance(field, TextField) and looks_like_html(content):
+                content = normalize(content)
+            trimmed = submitted - len(content.encode("utf-8"))
+            fields.setdefault(ModelClass, {}).setdefault(str(model_id), {})[field] = (
+                content,
+                _content_hash(content),
+                trimmed,
+                index,
+            )
+            continue
+
+        key = (change.get("key") or "").strip()
+        if not key:
+            raise EditorChangeError("Missing key or model details", index)
+        content = normalize(content)
+        elements[key] = (content, _content_hash(content), submitted - len(content.encode("utf-8")))
+
+    saved = skipped = bytes_saved = 0
+    to_create, to_update = [], []
+    with transaction.atomic():
+        if elements:
+            existing = {el.key: el for el in EditableElement.objects.filter(key__in=elements)}
+            for key, (content, digest, trimmed) in elements.items():
+                el = existing.get(key)
+                if el is None:
+                    to_create.append(EditableElement(key=key, content=content))
+                elif _content_hash(el.content) == digest:
+                    skipped += 1
+                    continue
+                else:
+                    el.content = content
+                    to_update.append(el)
+                bytes_saved += trimmed
+            EditableElement.objects.bulk_create(to_create)
+            EditableElement.objects.bulk_update(to_update, ["content"])
+            saved += len(to_create) + len(to_update)
+
+        for ModelClass, rows in fields.items():
+            objs = {str(obj.pk): obj for obj in ModelClass.objects.filter(pk__in=list(rows))}
+            for pk, row in rows.items():
+                obj = objs.get(pk)
+                if obj is None:
+                    index = min(change[3] for change in row.values())
+                    raise EditorChangeError(f"{ModelClass.__name__} {pk} not found", index)
+                changed = []
+                for field, (content, digest, trimmed, index) in row.items():
+                    if _content_hash(_stored_text(obj, field)) == digest:
+                        skipped += 1
+                        continue
+                    try:
+                        setattr(obj, field.attname, field.to_python(content))
+                    except ValidationError as e:
+                        raise EditorChangeError(f"Invalid value for {field.name}: {'; '.join(e.messages)}", index)
+                    changed.append(field.name)
+                    bytes_saved += trimmed
+                if changed:
+                    # save() (rather than a queryset update) so model hooks
+                    # like PressRelease's Markdown rendering still run.
+                    obj.save(update_fields=changed)
+                    saved += len(changed)
+
+        # bulk_create/bulk_update don't send post_save.
+        if to_create or to_update:
+            search.reindex_editable_keys([el.key for el in to_create + to_update])
+            transaction.on_commit(bump_content_generation)
+
+    return {"saved": saved, "skipped": skipped, "bytes_saved": bytes_saved}
+
+
+@csrf_exempt
+@staff_member_required
+@require_POST
+def editable_element_batch(request) -> JsonResponse:
+    """AJAX endpoint used by the visual editor to save many changes at once.
+
+    Expects JSON body: {"changes": [<change>, ...]} where each change has the
+    same shape as an editable_element_update payload plus an optional
+    "hash" of its content. All changes are applied in one transaction; if one
+    can't be, nothing is saved and the 400 response names it with "index".
+    """
+    import json
+
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+
+    changes = payload.get("changes") if isinstance(payload, dict) else None
+    if not isinstance(changes, list):
+        return JsonResponse({"ok": False, "error": "Missing changes"}, status=400)
+
+    try:
+        result = _apply_editor_changes(changes)
+    except EditorChangeError as e:
+        return JsonResponse({"ok": False, "error": str(e), "index": e.index}, status=400)
+    except Exception as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=500)
+    return JsonResponse({"ok": True, **result})
+
+
 @csrf_exempt
 @staff_member_required
 @require_POST
@@ -184,46 +684,19 @@ def editable_element_update(request) -> JsonResponse:
       {"model": "PressRelease", "model_id": 12, "field": "body", "content": "..."}
     """
     import json
-    from django.apps import apps
 
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except json.JSONDecodeError:
         return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
 
-    content = payload.get("content") or ""
-
-    # Direct model update path
-    model_name = payload.get("model")
-    model_id = payload.get("model_id")
-    field_name = payload.get("field")
+    try:
+        result = _apply_editor_changes([payload])
+    except EditorChangeError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
-    if model_name and model_id and field_name:
-        try:
-            # We assume models are in the 'core' app for simplicity
-            ModelClass = apps.get_model('core', model_name)
-            obj = ModelClass.objects.get(pk=model_id)
-            
-            # Basic security check to ensure the field exists and is updatable
-            if not hasattr(obj, field_name):
-                return JsonResponse({"ok": False, "error": f"Field '{field_name}' not found on {model_name}"}, status=400)
-            
-            setattr(obj, field_name, content)
-            obj.save()
-            return JsonResponse({"ok": True, "type": "model_update"})
-        
-        except LookupError:
-            return JsonResponse({"ok": False, "error": f"Model '{model_name}' not found"}, status=400)
-        except Exception as e:
-            return JsonResponse({"ok": False, "error": str(e)}, status=500)
-
-    # Standard EditableElement path
-    key = (payload.get("key") or "").strip()
-    if not key:
-        return JsonResponse({"ok": False, "error": "Missing key or model details"}, status=400)
-
-    obj, _created = EditableElement.objects.update_or_create(
-        key=key,
-        defaults={"content": content},
-    )
-    return JsonResponse({"ok": True, "key": obj.key})
+    if payload.get("model") and payload.get("model_id") and payload.get("field"):
+        return JsonResponse({"ok": True, "type": "model_update", "bytes_saved": result["bytes_saved"]})
+    return JsonResponse({"ok": True, "key": payload["key"].strip(), "bytes_saved": result["bytes_saved"]})
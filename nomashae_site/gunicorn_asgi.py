@@ -0,0 +1,28 @@
+"""gunicorn settings for serving the site over ASGI.
+
+    gunicorn -c nomashae_site/gunicorn_asgi.py
+
+gunicorn manages the processes and each one runs a uvicorn event loop, so a
+slow client costs a socket rather than a whole worker (``uvicorn`` and
+``uvicorn-worker`` are in requirements.txt). ``manage.py benchmark_servers``
+compares it with the WSGI entry point under slow clients. Preloading and warm-up work as for
+``gunicorn_wsgi.py``.
+"""
+
+import os
+
+from nomashae_site.gunicorn_wsgi import post_worker_init, preload_app, when_ready  # noqa: F401
+
+wsgi_app = "nomashae_site.asgi:application"
+worker_class = "uvicorn_worker.UvicornWorker"
+# Each request may run its ORM calls on a different thread, so a persistent
+# connection would stay open on every thread that ever used one.
+raw_env = ["DJANGO_CONN_MAX_AGE=0"]
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+# One event loop per core is enough; concurrency comes from the loop.
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Requests still waiting on a slow client are given this long on reload.
+graceful_timeout = 30
+keepalive = 5
+accesslog = None
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -0,0 +1,36 @@
+"""gunicorn settings for serving the site over WSGI with sync workers.
+
+    gunicorn -c nomashae_site/gunicorn_wsgi.py
+
+By default the application is loaded and warmed (``core.startup.warm``)
+once in the master and then forked, so new workers serve their first request
+without importing or compiling anything and share that memory copy-on-write.
+``GUNICORN_PRELOAD=0`` loads it in each worker instead, which code reloading
+needs; each worker then warms itself before taking requests.
+``manage.py profile_startup`` measures both.
+"""
+
+import os
+
+wsgi_app = "nomashae_site.wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+keepalive = 5
+accesslog = None
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # Runs in the master once the preloaded application is imported.
+    if server.cfg.preload_app:
+        from core.startup import warm
+
+        warm()
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from core.startup import warm
+
+        warm()
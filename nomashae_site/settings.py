@@ -46,17 +46,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Serves /static/ before anything else runs; hashed names are cached forever.
+    "core.middleware.AsyncWhiteNoiseMiddleware",
+    "core.instrumentation.RequestTimingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware"
 ]
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
-
 ROOT_URLCONF = "nomashae_site.urls"
 
 TEMPLATES = [
@@ -81,12 +81,58 @@ WSGI_APPLICATION = "nomashae_site.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite is shared by several gunicorn workers, so every connection is tuned
+# for concurrency: WAL lets readers carry on while a write is in progress,
+# busy_timeout waits out short write locks instead of failing with "database
+# is locked", and IMMEDIATE transactions take the write lock up front so a
+# read transaction never has to be upgraded mid-way (which can't wait and
+# fails straight away). Values can be overridden from the environment.
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 128 * 1024 * 1024)),
+    # Negative values are KiB rather than pages.
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -20000)),
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        # Reuse connections across requests instead of reopening (and
+        # re-running the pragmas) every time.
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": "; ".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+#
+# File-based so the anonymous page cache and its content generation token
+# (core.page_cache) are shared by every gunicorn worker on the instance. Once
+# MAX_ENTRIES is reached a random third of the files is culled, so it is well
+# above the number of pages, and pages expire after PUBLIC_PAGE_CACHE_TIMEOUT.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("DJANGO_CACHE_DIR", str(BASE_DIR / ".cache" / "django")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", 5000))},
     }
 }
+PUBLIC_PAGE_CACHE_TIMEOUT = int(os.environ.get("PUBLIC_PAGE_CACHE_TIMEOUT", 24 * 3600))
+
+# Browser/CDN lifetime (seconds) of cached pages that list blog posts. It is
+# cut short by the next scheduled publish or unpublish (core.scheduling).
+PUBLIC_PAGE_MAX_AGE = int(os.environ.get("PUBLIC_PAGE_MAX_AGE", 300))
 
 
 # Password validation
@@ -133,3 +179,41 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [
     BASE_DIR / "assets",
 ]
+
+# Uploaded media. Files are stored under their content hash (see
+# core.storage), so /media/ URLs are served with immutable cache headers.
+MEDIA_URL = "media/"
+MEDIA_ROOT = Path(os.environ.get("DJANGO_MEDIA_ROOT", BASE_DIR / "media"))
+
+STORAGES = {
+    "default": {"BACKEND": "core.storage.ContentAddressedStorage"},
+    # Hashed names, minified CSS/JS (core.storage) and .gz/.br siblings.
+    "staticfiles": {"BACKEND": "core.storage.MinifiedStaticFilesStorage"},
+}
+
+# Where ``manage.py export_static`` writes the prerendered public pages (with
+# .gz/.br siblings and manifest.json). Serve it with any static file server,
+# or with WhiteNoise via WHITENOISE_ROOT plus WHITENOISE_INDEX_FILE = True.
+STATIC_EXPORT_ROOT = Path(os.environ.get("STATIC_EXPORT_ROOT", BASE_DIR / "export"))
+
+# Per-request phase timings (see core.instrumentation). Staff always get them
+# as a Server-Timing header; SERVER_TIMING (on with DEBUG) adds it for every
+# visitor. Each worker's histograms are snapshotted into METRICS_DIR and
+# summed by the staff-only /metrics/ view.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1" if DEBUG else "0") == "1"
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", BASE_DIR / ".cache" / "metrics"))
+
+# Editor image uploads (see core.uploads). Files arrive in chunks of at most
+# EDITOR_UPLOAD_CHUNK_BYTES, spooled under EDITOR_UPLOAD_TEMP_DIR, and are
+# rejected above EDITOR_UPLOAD_MAX_BYTES or EDITOR_UPLOAD_MAX_PIXELS (checked
+# from the image header, before decoding).
+EDITOR_UPLOAD_MAX_BYTES = int(os.environ.get("EDITOR_UPLOAD_MAX_BYTES", 20 * 1024 * 1024))
+EDITOR_UPLOAD_CHUNK_BYTES = int(os.environ.get("EDITOR_UPLOAD_CHUNK_BYTES", 1024 * 1024))
+EDITOR_UPLOAD_MAX_PIXELS = int(os.environ.get("EDITOR_UPLOAD_MAX_PIXELS", 40_000_000))
+EDITOR_UPLOAD_TEMP_DIR = Path(os.environ.get("EDITOR_UPLOAD_TEMP_DIR", BASE_DIR / ".cache" / "uploads"))
+
+# Citizenship badge images (see core.badges) are rendered once per format and
+# kept under BADGE_CACHE_DIR, keyed by the badge's field values. BADGE_FONT
+# may point at a TrueType font; Pillow's built-in font is used otherwise.
+BADGE_CACHE_DIR = Path(os.environ.get("BADGE_CACHE_DIR", BASE_DIR / ".cache" / "badges"))
+BADGE_FONT = os.environ.get("BADGE_FONT", "")